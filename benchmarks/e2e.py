@@ -0,0 +1,211 @@
+"""
+End-to-end benchmark of parser.py against the local mock SonarQube server.
+
+    python benchmarks/e2e.py [--issues 20000] [--latency 0.01] [--error-rate 0]
+        [--set snippet_workers=16] [--set html_mode=virtual] [--output e2e.json]
+
+Starts benchmarks/mock_sonarqube.py, runs parser.py with a generated config
+and --metrics in a temporary directory and reports wall and CPU time per
+stage, request latencies, API requests per second and peak RSS of the
+parser process
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSER_PATH = os.path.join(os.path.dirname(BENCHMARKS_DIR), "parser.py")
+MOCK_PATH = os.path.join(BENCHMARKS_DIR, "mock_sonarqube.py")
+
+
+def start_mock(args):
+    """Start the mock server on a free port and return (process, url)"""
+    command = [
+        sys.executable,
+        MOCK_PATH,
+        "--port",
+        "0",
+        "--issues",
+        str(args.issues),
+        "--seed",
+        str(args.seed),
+        "--latency",
+        str(args.latency),
+        "--jitter",
+        str(args.jitter),
+        "--error-rate",
+        str(args.error_rate),
+        "--slow-rate",
+        str(args.slow_rate),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    match = re.search(r"http://\S+", line)
+    if not match:
+        process.kill()
+        raise RuntimeError(f"Mock server did not start: {line!r}")
+    print(line.strip())
+    return process, match.group()
+
+
+def mock_stats(url):
+    with urllib.request.urlopen(f"{url}/mock/stats") as response:
+        return json.load(response)
+
+
+def parse_overrides(values):
+    """Parse key=value config overrides, values as JSON when possible"""
+    overrides = {}
+    for item in values:
+        key, _, value = item.partition("=")
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[key] = value
+    return overrides
+
+
+def run_parser(workdir, echo=False):
+    """
+    Run parser.py in `workdir`, return its metrics (None if it failed),
+    wall time, exit code and rusage
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, PARSER_PATH, "config.json", "--metrics", "metrics.json"],
+        cwd=workdir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    for line in process.stdout:
+        if echo:
+            print(f"  | {line}", end="")
+    # wait4 reports the resource usage of this child alone
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall_seconds = time.perf_counter() - started
+
+    metrics = None
+    metrics_path = os.path.join(workdir, "metrics.json")
+    if os.path.exists(metrics_path):
+        with open(metrics_path) as metrics_file:
+            metrics = json.load(metrics_file)
+    return metrics, wall_seconds, process.returncode, rusage
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(
+        description="Run parser.py end to end against the mock SonarQube server"
+    )
+    argument_parser.add_argument("--issues", type=int, default=20000)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--latency", type=float, default=0.0)
+    argument_parser.add_argument("--jitter", type=float, default=0.0)
+    argument_parser.add_argument("--error-rate", type=float, default=0.0)
+    argument_parser.add_argument("--slow-rate", type=float, default=0.0)
+    argument_parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="config override, may be repeated",
+    )
+    argument_parser.add_argument(
+        "--echo", action="store_true", help="print parser.py output"
+    )
+    argument_parser.add_argument("--output", help="write results as JSON")
+    args = argument_parser.parse_args()
+
+    mock, url = start_mock(args)
+    try:
+        with tempfile.TemporaryDirectory(prefix="sonar-e2e-") as workdir:
+            config = {
+                "url": url,
+                "project_id": "bench",
+                "project_name": "Benchmark",
+                "project_version": "1.0",
+                "branch": "main",
+                "JWT-SESSION": "benchmark",
+                "snippet_rate_limit": 0,
+                "snippet_workers": 16,
+                "http_backoff": 0.1,
+            }
+            config.update(parse_overrides(args.set))
+            with open(os.path.join(workdir, "config.json"), "w") as config_file:
+                json.dump(config, config_file)
+
+            metrics, wall_seconds, exit_code, rusage = run_parser(
+                workdir, echo=args.echo
+            )
+            stats = mock_stats(url)
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    requests_total = stats["total_requests"]
+    download_seconds = wall_seconds
+    if metrics and "download" in metrics["phases"]:
+        download_seconds = metrics["phases"]["download"]["wall_seconds"]
+    results = {
+        "issues": args.issues,
+        "config": config,
+        "exit_code": exit_code,
+        "wall_seconds": wall_seconds,
+        "requests": stats["requests"],
+        "requests_per_second": requests_total / download_seconds,
+        "injected_faults": stats["injected"],
+        "bytes_downloaded": stats["bytes_sent"],
+        "peak_rss_mb": rusage.ru_maxrss / 1024,
+        "cpu_seconds": rusage.ru_utime + rusage.ru_stime,
+        "metrics": metrics,
+    }
+
+    print(f"Issues:          {args.issues}")
+    print(f"Wall time:       {wall_seconds:.2f}s")
+    if metrics:
+        for name, phase in metrics["phases"].items():
+            print(f"  {name + ':':<22}{phase['wall_seconds']:8.2f}s wall")
+        for name, stage in metrics["stages"].items():
+            print(
+                f"  {name + ':':<22}{stage['wall_seconds']:8.2f}s wall "
+                f"{stage['busy_seconds']:8.2f}s busy {stage['cpu_seconds']:8.2f}s CPU"
+            )
+    print(
+        f"Requests:        {requests_total} "
+        f"({results['requests_per_second']:.0f}/s during download)"
+    )
+    for endpoint, count in sorted(stats["requests"].items()):
+        latency = ""
+        if metrics and endpoint in metrics["requests"]:
+            endpoint_metrics = metrics["requests"][endpoint]
+            latency = (
+                f" (p50 {endpoint_metrics['p50_seconds'] * 1000:.0f} ms, "
+                f"p99 {endpoint_metrics['p99_seconds'] * 1000:.0f} ms)"
+            )
+        print(f"  {endpoint}: {count}{latency}")
+    if stats["injected"]:
+        print(f"Injected faults: {stats['injected']}")
+    print(f"Downloaded:      {stats['bytes_sent'] / 2**20:.1f} MiB")
+    print(f"Peak RSS:        {results['peak_rss_mb']:.0f} MiB")
+    print(f"CPU time:        {results['cpu_seconds']:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if exit_code:
+        print(f"parser.py exited with code {exit_code}")
+        sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
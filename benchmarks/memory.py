@@ -0,0 +1,81 @@
+"""
+Compare memory used by raw parsed issues and by compact records.
+
+    python benchmarks/memory.py [--issues 100000] [--context 3]
+
+Issues are serialized and parsed page by page like the API responses,
+so repeated strings are not shared between pages unless interned
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser as sonar_parser  # noqa: E402
+from synthetic import generate_issues  # noqa: E402
+
+PAGE_SIZE = 500
+
+
+def write_pages(pages_file, count, context):
+    """Write API-like JSON text of issue pages, one page per line"""
+    page = []
+    for issue in generate_issues(count, context=context):
+        page.append(issue)
+        if len(page) == PAGE_SIZE:
+            pages_file.write(json.dumps({"issues": page}) + "\n")
+            page = []
+    if page:
+        pages_file.write(json.dumps({"issues": page}) + "\n")
+
+
+def measure(pages_file, compact):
+    pages_file.seek(0)
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    issues = []
+    for page_text in pages_file:
+        page = json.loads(page_text)["issues"]
+        issues.extend(sonar_parser.compact_issues(page) if compact else page)
+        del page, page_text
+
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    del issues
+    gc.collect()
+    return current, elapsed
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--issues", type=int, default=100000)
+    argument_parser.add_argument("--context", type=int, default=3)
+    args = argument_parser.parse_args()
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as pages_file:
+        write_pages(pages_file, args.issues, args.context)
+        raw_bytes, raw_time = measure(pages_file, compact=False)
+        compact_bytes, compact_time = measure(pages_file, compact=True)
+
+    print(f"Issues: {args.issues}, snippet lines per issue: {2 * args.context + 1}")
+    print(f"Raw dicts:       {raw_bytes / 2**20:9.1f} MiB (parsed in {raw_time:.1f}s)")
+    print(
+        f"Compact records: {compact_bytes / 2**20:9.1f} MiB (parsed in {compact_time:.1f}s)"
+    )
+    print(f"Reduction:       {1 - compact_bytes / raw_bytes:9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Local stand-in for the SonarQube Web API serving synthetic issues.
+
+    python benchmarks/mock_sonarqube.py --issues 50000 [--port 9000]
+        [--latency 0.02] [--jitter 0.01] [--error-rate 0.01]
+        [--slow-rate 0.001 --slow-seconds 5]
+
+Implements /api/issues/search (p/ps paging with the 10000 result limit,
+createdAfter/createdBefore, rules, severities, types, additionalFields,
+CREATION_DATE/UPDATE_DATE sorting and the rules, severities and types facets,
+optionally capped to the most frequent --facet-limit values), /api/sources/issue_snippets, /api/sources/lines,
+/api/rules/search (rule_keys with p/ps paging) and /api/components/show
+(analysisDate of the project). Issues are generated on
+demand from their index, so only creation dates, update dates and rules are
+kept in memory. Request counts are served at /mock/stats
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from synthetic import issue_snippet, make_issue, make_rule, source_lines
+
+SEARCH_RESULT_LIMIT = 10000
+MAX_PAGE_SIZE = 500
+# Issue fields returned only when requested through additionalFields
+ADDITIONAL_ISSUE_FIELDS = ("comments", "transitions", "actions")
+
+
+class MockSonarQube:
+    """Synthetic issue index and API handlers with latency and error injection"""
+
+    def __init__(
+        self,
+        issue_count,
+        seed=0,
+        file_count=None,
+        rule_count=200,
+        context=3,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        slow_rate=0.0,
+        slow_seconds=5.0,
+        project="bench",
+        facet_limit=0,
+    ):
+        self.issue_count = issue_count
+        self.seed = seed
+        self.context = context
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.facet_limit = facet_limit
+        self.issue_options = {
+            "project": project,
+            "file_count": file_count or max(50, issue_count // 20),
+            "rule_count": rule_count,
+            "seed": seed,
+        }
+
+        # Creation dates grow with the index, so date filters are bisections
+        self.created = []
+        self.updated = []
+        self.rules = []
+        self.severities = []
+        self.types = []
+        for index in range(issue_count):
+            issue = make_issue(index, **self.issue_options)
+            self.created.append(issue["creationDate"])
+            self.updated.append(issue["updateDate"])
+            self.rules.append(issue["rule"])
+            self.severities.append(issue["severity"])
+            self.types.append(issue["type"])
+        # Filter and facet name -> value of every issue
+        self.fields = {
+            "rules": self.rules,
+            "severities": self.severities,
+            "types": self.types,
+        }
+        self.by_update = sorted(range(issue_count), key=self.updated.__getitem__)
+        self.rule_keys = sorted(set(self.rules))
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.injected = Counter()
+        self.bytes_sent = 0
+
+    def issue(self, index):
+        return make_issue(index, **self.issue_options)
+
+    def issue_index(self, issue_key):
+        """Return index of a synthetic issue key or None"""
+        prefix = f"AY{self.seed:02d}"
+        if not issue_key.startswith(prefix) or not issue_key[len(prefix) :].isdigit():
+            return None
+        index = int(issue_key[len(prefix) :])
+        return index if index < self.issue_count else None
+
+    def search(self, query):
+        page = int(query.get("p", 1))
+        page_size = min(int(query.get("ps", 100)), MAX_PAGE_SIZE)
+        if page * page_size > SEARCH_RESULT_LIMIT:
+            return 400, {
+                "errors": [
+                    {
+                        "msg": f"Can return only the first {SEARCH_RESULT_LIMIT} "
+                        f"results. {page * page_size}th result asked."
+                    }
+                ]
+            }
+
+        first = 0
+        last = self.issue_count
+        if "createdAfter" in query:
+            first = bisect_left(self.created, query["createdAfter"])
+        if "createdBefore" in query:
+            last = bisect_left(self.created, query["createdBefore"])
+        indices = range(first, max(first, last))
+
+        for name, values in self.fields.items():
+            if name in query:
+                wanted = set(query[name].split(","))
+                indices = [index for index in indices if values[index] in wanted]
+        if query.get("s") == "UPDATE_DATE":
+            if len(indices) == self.issue_count:
+                indices = self.by_update
+            else:
+                indices = sorted(indices, key=self.updated.__getitem__)
+        if query.get("asc", "true") == "false":
+            indices = indices[::-1]
+
+        total = len(indices)
+        page_indices = indices[(page - 1) * page_size : page * page_size]
+        issues = [self.issue(index) for index in page_indices]
+        additional_fields = query.get("additionalFields", "").split(",")
+        if "_all" not in additional_fields:
+            for issue in issues:
+                for field in ADDITIONAL_ISSUE_FIELDS:
+                    if field not in additional_fields:
+                        issue.pop(field, None)
+        response = {
+            "total": total,
+            "p": page,
+            "ps": page_size,
+            "paging": {"pageIndex": page, "pageSize": page_size, "total": total},
+            "effortTotal": 0,
+            "issues": issues,
+            "components": [],
+            "facets": [],
+        }
+        for name in query.get("facets", "").split(","):
+            if name not in self.fields:
+                continue
+            values = self.fields[name]
+            counts = Counter(values[index] for index in indices)
+            response["facets"].append(
+                {
+                    "property": name,
+                    "values": [
+                        {"val": value, "count": count}
+                        for value, count in counts.most_common(self.facet_limit or None)
+                    ],
+                }
+            )
+        return 200, response
+
+    def rules_search(self, query):
+        page = int(query.get("p", 1))
+        page_size = min(int(query.get("ps", 100)), MAX_PAGE_SIZE)
+        rule_keys = self.rule_keys
+        if "rule_keys" in query:
+            requested = set(query["rule_keys"].split(","))
+            rule_keys = [key for key in rule_keys if key in requested]
+        page_keys = rule_keys[(page - 1) * page_size : page * page_size]
+        return 200, {
+            "total": len(rule_keys),
+            "p": page,
+            "ps": page_size,
+            "paging": {
+                "pageIndex": page,
+                "pageSize": page_size,
+                "total": len(rule_keys),
+            },
+            "rules": [make_rule(key) for key in page_keys],
+        }
+
+    def component_show(self, query):
+        # The project was last analyzed when its newest issue was updated
+        return 200, {
+            "component": {
+                "key": query.get("component", ""),
+                "qualifier": "TRK",
+                "analysisDate": max(self.updated, default=None),
+            }
+        }
+
+    def issue_snippets(self, query):
+        index = self.issue_index(query.get("issueKey", ""))
+        if index is None:
+            return 404, {"errors": [{"msg": "Issue not found"}]}
+        return 200, issue_snippet(self.issue(index), self.context)
+
+    def source_lines(self, query):
+        first_line = int(query.get("from", 1))
+        last_line = int(query.get("to", first_line))
+        return 200, {
+            "sources": source_lines(query.get("key", ""), first_line, last_line)
+        }
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "total_requests": sum(self.requests.values()),
+                "injected": dict(self.injected),
+                "bytes_sent": self.bytes_sent,
+            }
+
+    def injected_fault(self):
+        """Return injected status code, "slow" or None"""
+        roll = self.random.random()
+        if roll < self.error_rate:
+            return 429 if roll < self.error_rate / 2 else 503
+        if roll < self.error_rate + self.slow_rate:
+            return "slow"
+        return None
+
+    def handle(self, path, query):
+        """Return status code, JSON body and extra headers of an API request"""
+        if path == "/mock/stats":
+            return 200, self.stats(), {}
+
+        with self.lock:
+            self.requests[path] += 1
+            fault = self.injected_fault()
+            if fault:
+                self.injected[str(fault)] += 1
+
+        delay = self.latency + (
+            self.random.uniform(0, self.jitter) if self.jitter else 0
+        )
+        if fault == "slow":
+            delay += self.slow_seconds
+        if delay:
+            time.sleep(delay)
+
+        if fault == 429:
+            return 429, {"errors": [{"msg": "Too many requests"}]}, {"Retry-After": "1"}
+        if fault == 503:
+            return 503, {"errors": [{"msg": "Service unavailable"}]}, {}
+
+        handlers = {
+            "/api/issues/search": self.search,
+            "/api/sources/issue_snippets": self.issue_snippets,
+            "/api/sources/lines": self.source_lines,
+            "/api/rules/search": self.rules_search,
+            "/api/components/show": self.component_show,
+        }
+        handler = handlers.get(path)
+        if handler is None:
+            return 404, {"errors": [{"msg": f"Unknown url: {path}"}]}, {}
+        status, body = handler(query)
+        return status, body, {}
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            status, body, headers = mock.handle(url.path, query)
+
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+            with mock.lock:
+                mock.bytes_sent += len(data)
+
+    return Handler
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(
+        description="Serve synthetic issues through a SonarQube-like API"
+    )
+    argument_parser.add_argument("--issues", type=int, default=10000)
+    argument_parser.add_argument(
+        "--port", type=int, default=9000, help="0 picks a free port"
+    )
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--files", type=int, default=None)
+    argument_parser.add_argument("--rules", type=int, default=200)
+    argument_parser.add_argument("--context", type=int, default=3)
+    argument_parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to every request"
+    )
+    argument_parser.add_argument(
+        "--jitter", type=float, default=0.0, help="random extra latency in seconds"
+    )
+    argument_parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of 429/503 responses"
+    )
+    argument_parser.add_argument(
+        "--slow-rate", type=float, default=0.0, help="share of slow responses"
+    )
+    argument_parser.add_argument("--slow-seconds", type=float, default=5.0)
+    argument_parser.add_argument(
+        "--facet-limit",
+        type=int,
+        default=0,
+        help="values returned per facet, 0 returns all",
+    )
+    args = argument_parser.parse_args()
+
+    started = time.perf_counter()
+    mock = MockSonarQube(
+        args.issues,
+        seed=args.seed,
+        file_count=args.files,
+        rule_count=args.rules,
+        context=args.context,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_seconds=args.slow_seconds,
+        facet_limit=args.facet_limit,
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(mock))
+    server.daemon_threads = True
+    print(
+        f"Mock SonarQube listening on http://127.0.0.1:{server.server_port} "
+        f"with {args.issues} issues (indexed in {time.perf_counter() - started:.1f}s)",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
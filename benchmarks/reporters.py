@@ -0,0 +1,210 @@
+"""
+Time and peak memory of the report writers on synthetic catalogs.
+
+    python benchmarks/reporters.py [--sizes 1000 10000 100000]
+        [--baseline benchmarks/reporters_baseline.json] [--update-baseline]
+        [--output reporters.json]
+
+Benchmarks extract_sources_from_response, the JSON dump,
+generate_excel_report and generate_single_html_report at each size.
+Each one runs twice: once for wall time and once under tracemalloc for
+the peak. Growth faster than linear (log-log slope over the sizes above
+--max-slope), regressions against the baseline and a missing baseline
+fail the run. The committed reporters_baseline.json was produced with
+--update-baseline, refresh it the same way when the writers get faster
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser as sonar_parser  # noqa: E402
+from synthetic import generate_issues, issue_snippet  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "reporters_baseline.json"
+)
+
+# Differences below these are noise and never count as regressions
+TIME_NOISE_FLOOR = 0.05
+MEMORY_NOISE_FLOOR = 256 * 1024
+
+
+def make_catalog_input(count, context):
+    """Return synthetic issues and their issue_snippets responses"""
+    issues = list(generate_issues(count, with_sources=False))
+    snippets = [issue_snippet(issue, context) for issue in issues]
+    return issues, snippets
+
+
+def attach_sources(issues, snippets):
+    for issue, snippet in zip(issues, snippets):
+        issue["sources"] = sonar_parser.extract_sources_from_response(snippet)
+
+
+def benchmarks(issues, snippets, workdir):
+    """Return benchmark name -> callable, all sharing one catalog"""
+    attach_sources(issues, snippets)
+    catalog = sonar_parser.IssueCatalog(sonar_parser.compact_issues(issues))
+    return {
+        "extract_sources": lambda: attach_sources(issues, snippets),
+        "json_dump": lambda: sonar_parser.write_json_dump(
+            catalog.issues, os.path.join(workdir, "dump.json")
+        ),
+        "excel": lambda: sonar_parser.generate_excel_report(
+            catalog, os.path.join(workdir, "report.xlsx")
+        ),
+        "html": lambda: sonar_parser.generate_single_html_report(
+            "Benchmark", "1.0", catalog, os.path.join(workdir, "report.html")
+        ),
+    }
+
+
+def measure(function):
+    """Return wall time and tracemalloc peak of `function` in separate runs"""
+    gc.collect()
+    started = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def scaling_slope(points):
+    """Least squares slope of log(time) over log(size), 1.0 is linear"""
+    logs = [(math.log(size), math.log(max(seconds, 1e-9))) for size, seconds in points]
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    spread = sum((x - mean_x) ** 2 for x, _ in logs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in logs) / spread
+
+
+def compare_with_baseline(results, baseline, time_tolerance, memory_tolerance):
+    """Return messages for every measurement worse than the baseline"""
+    regressions = []
+    for name, sizes in results["benchmarks"].items():
+        for size, measured in sizes.items():
+            expected = baseline["benchmarks"].get(name, {}).get(size)
+            if expected is None:
+                continue
+            seconds = measured["seconds"]
+            if (
+                seconds > expected["seconds"] * (1 + time_tolerance)
+                and seconds - expected["seconds"] > TIME_NOISE_FLOOR
+            ):
+                regressions.append(
+                    f"{name} at {size} issues: {seconds:.3f}s, "
+                    f"baseline {expected['seconds']:.3f}s"
+                )
+            peak = measured["peak_bytes"]
+            if (
+                peak > expected["peak_bytes"] * (1 + memory_tolerance)
+                and peak - expected["peak_bytes"] > MEMORY_NOISE_FLOOR
+            ):
+                regressions.append(
+                    f"{name} at {size} issues: peak {peak / 2**20:.1f} MiB, baseline "
+                    f"{expected['peak_bytes'] / 2**20:.1f} MiB"
+                )
+    return regressions
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    argument_parser.add_argument("--context", type=int, default=3)
+    argument_parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    argument_parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="save this run as the baseline instead of comparing",
+    )
+    argument_parser.add_argument("--time-tolerance", type=float, default=0.25)
+    argument_parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    argument_parser.add_argument("--max-slope", type=float, default=1.25)
+    argument_parser.add_argument("--output", help="write results as JSON")
+    args = argument_parser.parse_args()
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "code_version": sonar_parser.code_version(),
+        "context": args.context,
+        "benchmarks": {},
+        "slopes": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="sonar-reporters-") as workdir:
+        for size in sorted(args.sizes):
+            issues, snippets = make_catalog_input(size, args.context)
+            for name, function in benchmarks(issues, snippets, workdir).items():
+                seconds, peak = measure(function)
+                results["benchmarks"].setdefault(name, {})[str(size)] = {
+                    "seconds": seconds,
+                    "peak_bytes": peak,
+                }
+                print(
+                    f"{name:<16}{size:>8} issues {seconds:9.3f}s "
+                    f"{peak / 2**20:9.1f} MiB peak"
+                )
+            del issues, snippets
+
+    failures = []
+    if len(args.sizes) > 1:
+        for name, sizes in results["benchmarks"].items():
+            slope = scaling_slope(
+                [(int(size), measured["seconds"]) for size, measured in sizes.items()]
+            )
+            results["slopes"][name] = slope
+            print(f"{name:<16}scaling slope {slope:.2f}")
+            if slope > args.max_slope:
+                failures.append(f"{name} grows super-linearly (slope {slope:.2f})")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        failures.extend(
+            compare_with_baseline(
+                results, baseline, args.time_tolerance, args.memory_tolerance
+            )
+        )
+    else:
+        failures.append(
+            f"no baseline at {args.baseline}, run with --update-baseline to save one"
+        )
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if failures:
+        print("Regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
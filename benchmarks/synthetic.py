@@ -0,0 +1,157 @@
+"""
+Synthetic SonarQube issues in the shape returned by /api/issues/search
+(additionalFields=_all) and /api/sources/issue_snippets, used by the
+benchmarks and the mock server
+"""
+
+import random
+from datetime import datetime, timedelta
+
+SEVERITIES = ["BLOCKER", "CRITICAL", "MAJOR", "MINOR", "INFO"]
+TYPES = ["VULNERABILITY", "BUG", "CODE_SMELL"]
+STATUSES = ["OPEN", "CONFIRMED", "REOPENED", "RESOLVED"]
+EXTENSIONS = [".java", ".py", ".js", ".ts", ".cs", ".go", ".cpp", ".xml"]
+SONAR_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+START_DATE = datetime.fromisoformat("2020-01-01T00:00:00+00:00")
+
+
+def make_issue(index, project="bench", file_count=None, rule_count=200, seed=0):
+    """Return one synthetic issue, deterministic for the index and seed"""
+    rng = random.Random(seed * 1_000_003 + index)
+    file_count = file_count or 500
+    file_index = rng.randrange(file_count)
+    extension = EXTENSIONS[file_index % len(EXTENSIONS)]
+    component = f"{project}:src/module{file_index % 40}/File{file_index}{extension}"
+    line = rng.randint(1, 800)
+    created = START_DATE + timedelta(minutes=index * 7 + rng.randrange(7))
+    updated = created + timedelta(days=rng.randrange(30))
+    author = f"developer{rng.randrange(60)}@example.com"
+
+    comments = []
+    if rng.random() < 0.2:
+        comments.append(
+            {
+                "key": f"C{index:08d}",
+                "login": f"reviewer{rng.randrange(10)}",
+                "htmlText": "Checked, this is <strong>not</strong> exploitable",
+                "markdown": "Checked, this is **not** exploitable",
+                "updatable": True,
+                "createdAt": updated.strftime(SONAR_DATE_FORMAT),
+            }
+        )
+
+    return {
+        "key": f"AY{seed:02d}{index:010d}",
+        "rule": f"java:S{1000 + rng.randrange(rule_count)}",
+        "severity": rng.choice(SEVERITIES),
+        "component": component,
+        "project": project,
+        "line": line,
+        "hash": f"{rng.getrandbits(128):032x}",
+        "textRange": {
+            "startLine": line,
+            "endLine": line,
+            "startOffset": 4,
+            "endOffset": 30,
+        },
+        "flows": [],
+        "status": rng.choice(STATUSES),
+        "message": f"Make sure that using this pseudorandom number generator is safe here (rule {rng.randrange(rule_count)}).",
+        "effort": "10min",
+        "debt": "10min",
+        "author": author,
+        "tags": ["cwe", "owasp-a3"],
+        "transitions": ["confirm", "resolve", "falsepositive", "wontfix"],
+        "actions": ["set_tags", "comment", "assign"],
+        "comments": comments,
+        "creationDate": created.strftime(SONAR_DATE_FORMAT),
+        "updateDate": updated.strftime(SONAR_DATE_FORMAT),
+        "type": TYPES[rng.randrange(len(TYPES))],
+        "scope": "MAIN",
+        "quickFixAvailable": False,
+        "messageFormattings": [],
+        "codeVariants": [],
+        "cleanCodeAttribute": "COMPLETE",
+        "cleanCodeAttributeCategory": "INTENTIONAL",
+        "impacts": [{"softwareQuality": "SECURITY", "severity": "HIGH"}],
+        "issueStatus": "OPEN",
+        "prioritizedRule": False,
+    }
+
+
+def source_line(component, line):
+    """Return one source line with SonarQube server-side highlighting markup"""
+    return {
+        "line": line,
+        "code": (
+            f'<span class="k">public</span> <span class="k">void</span> '
+            f'handle{line}(<span class="k">String</span> value) {{ '
+            f'<span class="cd">// {component.rsplit("/", 1)[-1]}</span> '
+            f'log(<span class="s">&quot;value {line}&quot;</span>); }}'
+        ),
+        "scmAuthor": f"developer{line % 60}@example.com",
+        "scmDate": "2023-05-04T10:00:00+0000",
+        "scmRevision": f"{line * 2654435761 % 2**32:08x}",
+        "isNew": False,
+        "duplicated": False,
+    }
+
+
+def source_lines(component, first_line, last_line):
+    """Return source lines of a component as /api/sources/lines returns them"""
+    return [source_line(component, line) for line in range(first_line, last_line + 1)]
+
+
+def issue_snippet(issue, context=3):
+    """Return /api/sources/issue_snippets response for an issue"""
+    line = issue["textRange"]["startLine"]
+    component = issue["component"]
+    return {
+        component: {
+            "component": {"key": component, "path": component.split(":", 1)[1]},
+            "sources": source_lines(component, max(1, line - context), line + context),
+        }
+    }
+
+
+def make_rule(rule_key):
+    """Return rule metadata as /api/rules/search returns it (SonarQube 10)"""
+    number = int(rule_key.rsplit("S", 1)[-1]) if rule_key[-1:].isdigit() else 0
+    return {
+        "key": rule_key,
+        "repo": rule_key.split(":", 1)[0],
+        "name": f"Pseudorandom number generators should be used safely ({number})",
+        "severity": SEVERITIES[number % len(SEVERITIES)],
+        "status": "READY",
+        "isTemplate": False,
+        "sysTags": ["cwe", "owasp-a3"],
+        "lang": "java",
+        "langName": "Java",
+        "type": TYPES[number % len(TYPES)],
+        "remFnType": "CONSTANT_ISSUE",
+        "remFnBaseEffort": f"{5 + number % 4 * 5}min",
+        "defaultRemFnType": "CONSTANT_ISSUE",
+        "defaultRemFnBaseEffort": f"{5 + number % 4 * 5}min",
+        "descriptionSections": [
+            {
+                "key": "root_cause",
+                "content": "<p>Predictable pseudorandom values can be "
+                "<strong>guessed</strong> by an attacker.</p>",
+            },
+            {
+                "key": "how_to_fix",
+                "content": "<p>Use <code>java.security.SecureRandom</code> "
+                "instead.</p>",
+            },
+        ],
+    }
+
+
+def generate_issues(count, seed=0, with_sources=True, context=3, **kwargs):
+    """Generate `count` issues, optionally with snippet sources attached"""
+    for index in range(count):
+        issue = make_issue(index, seed=seed, **kwargs)
+        if with_sources:
+            snippet = issue_snippet(issue, context)
+            issue["sources"] = snippet[issue["component"]]["sources"]
+        yield issue
@@ -1,22 +1,54 @@
+import argparse
+import hashlib
 import json
+import pickle
+import random
 import sys
 import requests
+from requests.adapters import HTTPAdapter
 import openpyxl
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
 from urllib3.exceptions import InsecureRequestWarning
 import os.path
 import time
 from bs4 import BeautifulSoup
 import re
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import os
 import html
+import queue
+import base64
+import gzip
+import lzma
+import sqlite3
+import shutil
+import tempfile
+import threading
+import tracemalloc
+import cProfile
+import pstats
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # Disable SSL warnings
 requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 
 
+def print_line(message):
+    """
+    Print a message with its newline in a single write, so lines printed
+    by concurrent worker threads do not interleave
+    """
+    sys.stdout.write(f"{message}\n")
+
+
 def get_language_from_extension(file_path):
     """Determine programming language based on file extension"""
     if not file_path:
@@ -70,121 +102,274 @@ def extract_filename(component):
     return component
 
 
-def generate_single_html_report(
-    project_name,
-    project_version,
-    all_issues,
-    output_filename="sonarqube_issues_report.html",
-):
+CATEGORY_NAMES = {
+    "VULNERABILITY": "VULNERABILITIES",
+    "BUG": "BUGS",
+    "CODE_SMELL": "CODE SMELLS",
+}
+
+# Source lines of a snippet shown in the reports
+SNIPPET_MAX_LINES = 15
+
+# Language to Highlight.js mapping
+HLJS_LANGUAGE_MAP = {
+    "Java": "java",
+    "Python": "python",
+    "JavaScript": "javascript",
+    "TypeScript": "typescript",
+    "React JSX": "javascript",  # Highlight.js uses jsx for JSX
+    "React TSX": "typescript",  # Highlight.js uses tsx for TSX
+    "C++": "cpp",
+    "C": "c",
+    "C#": "csharp",
+    "PHP": "php",
+    "Ruby": "ruby",
+    "Go": "go",
+    "Rust": "rust",
+    "Swift": "swift",
+    "Kotlin": "kotlin",
+    "Scala": "scala",
+    "HTML": "html",
+    "CSS": "css",
+    "XML": "xml",
+    "JSON": "json",
+    "YAML": "yaml",
+    "SQL": "sql",
+    "Shell": "bash",
+    "Batch": "batch",
+    "PowerShell": "powershell",
+    "Markdown": "markdown",
+    "Docker": "dockerfile",
+    "Terraform": "hcl",  # Terraform uses HCL syntax
+    "Unknown": "plaintext",
+}
+
+# Shared key layouts of compact records: tuple of keys -> {key: position}
+_RECORD_SHAPES = {}
+
+
+def _record_shape(keys):
+    keys = tuple(keys)
+    shape = _RECORD_SHAPES.get(keys)
+    if shape is None:
+        keys = tuple(sys.intern(key) for key in keys)
+        shape = {key: index for index, key in enumerate(keys)}
+        _RECORD_SHAPES[keys] = shape
+    return shape
+
+
+def compact_value(value, intern=sys.intern):
+    """Convert parsed JSON value to its compact form with interned strings"""
+    value_type = type(value)
+    if value_type is str:
+        return intern(value)
+    if value_type is dict:
+        return CompactRecord(value)
+    if value_type is list:
+        return tuple([compact_value(item) for item in value])
+    return value
+
+
+class CompactRecord:
     """
-    Generate a single HTML report with all issues and source code snippets
-    with syntax highlighting using Highlight.js
+    Compact read-mostly replacement of a parsed JSON object.
+
+    Keys are kept in a layout shared by all records with the same keys,
+    values in a tuple, strings are interned, nested objects are compact
+    records and lists are tuples. Supports the dict methods used by the
+    reporters, and to_dict() restores the original JSON shape
     """
-    try:
-        # Generate comprehensive statistics
-        def generate_statistics():
-            severity_counts = {}
-            status_counts = {}
-            type_counts = {
-                "VULNERABILITY": len(
-                    [
-                        i
-                        for i in all_issues
-                        if i.get("type", "").upper() == "VULNERABILITY"
-                    ]
-                ),
-                "BUG": len(
-                    [i for i in all_issues if i.get("type", "").upper() == "BUG"]
-                ),
-                "CODE_SMELL": len(
-                    [i for i in all_issues if i.get("type", "").upper() == "CODE_SMELL"]
-                ),
-            }
 
-            for issue in all_issues:
-                severity = issue.get("severity", "UNKNOWN")
-                status = issue.get("status", "UNKNOWN")
+    __slots__ = ("_shape", "_values")
 
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-                status_counts[status] = status_counts.get(status, 0) + 1
+    def __init__(self, mapping):
+        self._shape = _record_shape(mapping.keys())
+        self._values = tuple([compact_value(value) for value in mapping.values()])
 
-            return severity_counts, status_counts, type_counts
+    def get(self, key, default=None):
+        index = self._shape.get(key)
+        return default if index is None else self._values[index]
 
-        severity_counts, status_counts, type_counts = generate_statistics()
-        total_issues = len(all_issues)
+    def __getitem__(self, key):
+        return self._values[self._shape[key]]
 
-        # Categorize issues
-        vulnerabilities = [
-            issue
-            for issue in all_issues
-            if issue.get("type", "").upper() == "VULNERABILITY"
-        ]
-        bugs = [issue for issue in all_issues if issue.get("type", "").upper() == "BUG"]
-        code_smells = [
-            issue
-            for issue in all_issues
-            if issue.get("type", "").upper() == "CODE_SMELL"
-        ]
+    def __setitem__(self, key, value):
+        value = compact_value(value)
+        index = self._shape.get(key)
+        if index is None:
+            self._shape = _record_shape(list(self._shape) + [key])
+            self._values = self._values + (value,)
+        else:
+            self._values = self._values[:index] + (value,) + self._values[index + 1 :]
 
-        # HTML template with CSS styling and Highlight.js syntax highlighting
-        html_template = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{project_name} - SonarQube Security Report</title>
-    
-    <!-- Highlight.js for syntax highlighting -->
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/github-dark.min.css">
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js"></script>
-    
-    <!-- Load additional languages -->
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/java.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/python.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/javascript.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/typescript.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/cpp.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/csharp.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/php.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/ruby.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/go.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/rust.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/swift.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/kotlin.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/scala.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/css.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/sql.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/bash.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/yaml.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/json.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/markdown.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/xml.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/dockerfile.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/plaintext.min.js"></script>
-    
-    <style>
-        * {{
+    def __contains__(self, key):
+        return key in self._shape
+
+    def __iter__(self):
+        return iter(self._shape)
+
+    def __len__(self):
+        return len(self._values)
+
+    def keys(self):
+        return self._shape.keys()
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return zip(self._shape, self._values)
+
+    def to_dict(self):
+        """Return the record as plain JSON data"""
+        return {key: _plain_value(value) for key, value in self.items()}
+
+    def __getstate__(self):
+        return (tuple(self._shape), self._values)
+
+    def __setstate__(self, state):
+        keys, values = state
+        self._shape = _record_shape(keys)
+        self._values = tuple([compact_value(value) for value in values])
+
+    def __repr__(self):
+        return f"CompactRecord({self.to_dict()!r})"
+
+
+def _plain_value(value):
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain_value(item) for item in value]
+    return value
+
+
+def compact_json_default(value):
+    """json.dump `default` hook serializing compact records"""
+    if isinstance(value, CompactRecord):
+        return dict(value.items())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def compact_issues(issues):
+    """Convert parsed issues to compact records"""
+    return [
+        issue if isinstance(issue, CompactRecord) else CompactRecord(issue)
+        for issue in issues
+    ]
+
+
+ISSUE_TYPES = ["VULNERABILITY", "BUG", "CODE_SMELL"]
+
+# Derived metadata of a source file, shared by all issues in it
+ComponentInfo = namedtuple("ComponentInfo", ["file_path", "language", "hljs_language"])
+
+
+class IssueCatalog:
+    """
+    Issues partitioned by type together with severity/status statistics and
+    per-component metadata. It is built in a single pass right after the
+    download and shared by all reporters, so per-issue preprocessing is
+    done once. `rules` maps rule keys of the issues to rule metadata
+    """
+
+    def __init__(self, issues=(), rules=None):
+        self.issues = []
+        self.partitions = {issue_type: [] for issue_type in ISSUE_TYPES}
+        self.severity_counts = {}
+        self.status_counts = {}
+        self.components = {}
+        self.rules = rules or {}
+
+        for issue in issues:
+            self.add(issue)
+
+    def add(self, issue):
+        """Add an issue to the catalog"""
+        self.issues.append(issue)
+
+        partition = self.partitions.get(issue.get("type", "").upper())
+        if partition is not None:
+            partition.append(issue)
+
+        severity = issue.get("severity", "UNKNOWN")
+        status = issue.get("status", "UNKNOWN")
+        self.severity_counts[severity] = self.severity_counts.get(severity, 0) + 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+        self.component_info(issue.get("component", ""))
+
+    def component_info(self, component):
+        """Return file path and language of a component"""
+        info = self.components.get(component)
+        if info is None:
+            file_path = extract_filename(component)
+            language = get_language_from_extension(file_path)
+            info = ComponentInfo(
+                file_path, language, HLJS_LANGUAGE_MAP.get(language, "plaintext")
+            )
+            self.components[component] = info
+        return info
+
+    @property
+    def type_counts(self):
+        return {
+            issue_type: len(issues) for issue_type, issues in self.partitions.items()
+        }
+
+    def __len__(self):
+        return len(self.issues)
+
+
+HLJS_CDN_URL = "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0"
+
+# Highlight.js languages loaded by the HTML report
+HLJS_LANGUAGES = [
+    "java",
+    "python",
+    "javascript",
+    "typescript",
+    "cpp",
+    "csharp",
+    "php",
+    "ruby",
+    "go",
+    "rust",
+    "swift",
+    "kotlin",
+    "scala",
+    "css",
+    "sql",
+    "bash",
+    "yaml",
+    "json",
+    "markdown",
+    "xml",
+    "dockerfile",
+    "plaintext",
+]
+
+HTML_REPORT_STYLE = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             line-height: 1.6;
             color: #333;
             background-color: #f8f9fa;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
-        }}
+        }
         
         /* Header Styles */
-        .header {{
+        .header {
             background: linear-gradient(135deg, #2C3E50, #4CA1AF);
             color: white;
             padding: 40px 0;
@@ -192,145 +377,145 @@ def generate_single_html_report(
             margin-bottom: 30px;
             border-radius: 10px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             font-weight: 300;
-        }}
+        }
         
-        .header .subtitle {{
+        .header .subtitle {
             font-size: 1.2em;
             opacity: 0.9;
             margin-bottom: 15px;
             font-size: 2em;
-        }}
+        }
         
-        .header .project-version {{
+        .header .project-version {
             margin-bottom: 15px;
             opacity: 0.9;
-        }}
+        }
         
-        .header .date {{
+        .header .date {
             font-size: 0.9em;
             opacity: 0.8;
-        }}
+        }
         
         /* Summary Cards */
-        .summary-cards {{
+        .summary-cards {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .card {{
+        .card {
             background: white;
             padding: 25px;
             border-radius: 10px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             text-align: center;
             transition: transform 0.3s ease;
-        }}
+        }
         
-        .card:hover {{
+        .card:hover {
             transform: translateY(-5px);
-        }}
+        }
         
-        .card h3 {{
+        .card h3 {
             color: #2C3E50;
             margin-bottom: 10px;
             font-size: 1.1em;
-        }}
+        }
         
-        .card .count {{
+        .card .count {
             font-size: 2.5em;
             font-weight: bold;
             margin-bottom: 5px;
-        }}
+        }
         
-        .card.total .count {{ color: #2C3E50; }}
-        .card.vulnerabilities .count {{ color: #E74C3C; }}
-        .card.bugs .count {{ color: #F39C12; }}
-        .card.code-smells .count {{ color: #3498DB; }}
+        .card.total .count { color: #2C3E50; }
+        .card.vulnerabilities .count { color: #E74C3C; }
+        .card.bugs .count { color: #F39C12; }
+        .card.code-smells .count { color: #3498DB; }
         
         /* Statistics Tables */
-        .statistics {{
+        .statistics {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .stat-table {{
+        .stat-table {
             background: white;
             border-radius: 10px;
             overflow: hidden;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .stat-table h3 {{
+        .stat-table h3 {
             background: #34495E;
             color: white;
             padding: 15px 20px;
             margin: 0;
             font-size: 1.1em;
-        }}
+        }
         
-        .stat-table table {{
+        .stat-table table {
             width: 100%;
             border-collapse: collapse;
-        }}
+        }
         
         .stat-table th,
-        .stat-table td {{
+        .stat-table td {
             padding: 12px 15px;
             text-align: left;
             border-bottom: 1px solid #ECF0F1;
-        }}
+        }
         
-        .stat-table th {{
+        .stat-table th {
             background: #ECF0F1;
             font-weight: 600;
             color: #2C3E50;
-        }}
+        }
         
-        .stat-table tr:hover {{
+        .stat-table tr:hover {
             background: #F8F9FA;
-        }}
+        }
         
         /* Issues Section */
-        .category-section {{
+        .category-section {
             margin-bottom: 40px;
-        }}
+        }
         
-        .category-header {{
+        .category-header {
             background: linear-gradient(135deg, #34495E, #2C3E50);
             color: white;
             padding: 20px;
             border-radius: 10px;
             margin-bottom: 10px;
-        }}
+        }
         
-        .issue-card {{
+        .issue-card {
             background: white;
             margin-bottom: 20px;
             border-radius:10px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
+        }
         
-        .issue-header {{
+        .issue-header {
             background: #a1caf9;
             color: #2C3E50;
             padding: 15px 20px;
             font-weight: bold;
             padding-left: 0;
             border-bottom: 0;
-        }}
+        }
         
-        .issue-number {{
+        .issue-number {
             background: #ffffff00;
             color: #f4f8fb;
             padding: 10px 15px;
@@ -338,9 +523,9 @@ def generate_single_html_report(
             border-radius: 11px;
             margin-left: 15px;
             font-size: 1.5rem;
-        }}
+        }
         
-        .issue-source-file {{
+        .issue-source-file {
             font-size: 1.1rem;
             padding: 5px 5px;
             background: #f4f8fb;
@@ -352,73 +537,73 @@ def generate_single_html_report(
             margin-top: 5px;
             max-width: 800px;
             word-break: break-all;
-        }}
+        }
         
-        .issue-details {{
+        .issue-details {
             padding: 20px;
-        }}
+        }
         
         /* Enhanced Error Message Block */
-        .error-message-block {{
+        .error-message-block {
             border-radius: 8px;
             padding: 20px;
             margin: 15px 0;
             background: #c3080808;
             border: 1px solid #ffc5c5;
             border-radius: 5px;
-        }}
+        }
         
-        .error-message-header {{
+        .error-message-header {
             display: flex;
             align-items: center;
             margin-bottom: 0;
-        }}
+        }
         
-        .error-message-title {{
+        .error-message-title {
             font-weight: bold;
             font-size: 1.1em;
-        }}
+        }
         
-        .error-message-content {{
+        .error-message-content {
             color: #3a3a3a;
             font-size: 1.1em;
             line-height: 1.5;
             padding: 15px 0;
             border-radius: 5px;
-        }}
+        }
         
-        .detail-grid {{
+        .detail-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 15px;
             padding: 15px;
             border: 1px solid #d5d5d5;
             border-radius: 5px;
-        }}
+        }
         
-        .detail-item {{
+        .detail-item {
             margin-bottom: 8px;
             border-right: 1px solid #d5d5d5;
             padding: 0 5px;
-        }}
-        .detail-item:last-child {{
+        }
+        .detail-item:last-child {
             margin-bottom: 8px;
             border-right: none;
-        }}
+        }
         
-        .detail-label {{
+        .detail-label {
             font-weight: bold;
             color: #2C3E50;
             margin-bottom: 3px;
-        }}
+        }
         
-        .detail-value {{
+        .detail-value {
             color: #555;
             word-wrap: break-word;
-        }}
+        }
         
         /* Enhanced Source Code with Highlight.js Syntax Highlighting */
-        .source-code {{
+        .source-code {
             background: #2d2d2d;
             color: #f8f8f2;
             border-radius: 8px;
@@ -426,9 +611,9 @@ def generate_single_html_report(
             margin: 20px 0;
             font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
             box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-        }}
+        }
         
-        .code-header {{
+        .code-header {
             background: #1a1a1a;
             color: #f8f8f2;
             padding: 12px 20px;
@@ -437,36 +622,36 @@ def generate_single_html_report(
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        .code-language {{
+        .code-language {
             background: #E74C3C;
             color: white;
             padding: 4px 8px;
             border-radius: 4px;
             font-size: 0.8em;
-        }}
+        }
         
-        .code-content {{
+        .code-content {
             padding: 0;
             overflow-x: auto;
-        }}
+        }
         
-        .code-table {{
+        .code-table {
             width: 100%;
             border-collapse: collapse;
-        }}
+        }
         
-        .code-table td {{
+        .code-table td {
             padding: 6px 12px;
             vertical-align: top;
             border: none;
             font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
             font-size: 13px;
             line-height: 1.4;
-        }}
+        }
         
-        .line-number {{
+        .line-number {
             background: #1a1a1a;
             color: #6c6c6c;
             text-align: right;
@@ -474,416 +659,204 @@ def generate_single_html_report(
             border-right: 1px solid #444;
             user-select: none;
             padding-right: 15px;
-        }}
+        }
         
-        .line-content {{
+        .line-content {
             white-space: normal;
             word-break: keep-all;
             overflow-wrap: normal;
             padding-left: 15px;
-        }}
+        }
         
-        .highlighted-line {{
+        .highlighted-line {
             background: #3a3a3a !important;
             border-left: 4px solid #569CD6;
-        }}
+        }
         
-        .highlighted-line .line-number {{
+        .highlighted-line .line-number {
             background: #3a3a3a !important;
             color: #569CD6;
             font-weight: bold;
-        }}
+        }
         
         /* Highlight.js overrides for better integration */
-        .hljs {{
+        .hljs {
             background: transparent !important;
             padding: 0 !important;
-        }}
+        }
         
-        .source-code pre {{
+        .source-code pre {
             margin: 0 !important;
             background: transparent !important;
-        }}
+        }
         
-        .source-code code {{
+        .source-code code {
             background: transparent !important;
             font-family: 'Consolas', 'Monaco', 'Courier New', monospace !important;
             font-size: 13px !important;
             line-height: 1.4 !important;
-        }}
+        }
         
         /* Comments */
-        .comment {{
+        .comment {
             border: 1px solid #2ecc71;
             border-radius: 5px;
             padding: 15px;
             margin: 10px 0;
             background: #fafdfbad;
-        }}
+        }
         
-        .comment-header {{
+        .comment-header {
             font-weight: bold;
             color: #2C3E50;
             margin-bottom: 8px;
             display: flex;
             justify-content: space-between;
-        }}
+        }
         
-        .comment-content {{
+        .comment-content {
             color: #555;
             line-height: 1.5;
-        }}
+        }
         
         /* Severity badges */
-        .severity-badge {{
+        .severity-badge {
             display: inline-block;
             padding: 3px 8px;
             border-radius: 12px;
             font-size: 0.8em;
             font-weight: bold;
             margin-left: 10px;
-        }}
+        }
         
-        .severity-BLOCKER {{ background: #E74C3C; color: white; }}
-        .severity-CRITICAL {{ background: #E67E22; color: white; }}
-        .severity-MAJOR {{ background: #F39C12; color: white; }}
-        .severity-MINOR {{ background: #3498DB; color: white; }}
-        .severity-INFO {{ background: #2ECC71; color: white; }}
+        .severity-BLOCKER { background: #E74C3C; color: white; }
+        .severity-CRITICAL { background: #E67E22; color: white; }
+        .severity-MAJOR { background: #F39C12; color: white; }
+        .severity-MINOR { background: #3498DB; color: white; }
+        .severity-INFO { background: #2ECC71; color: white; }
         
         /* Status badges */
-        .status-badge {{
+        .status-badge {
             display: inline-block;
             padding: 3px 8px;
             border-radius: 12px;
             font-size: 0.8em;
             font-weight: bold;
             margin-left: 10px;
-        }}
+        }
         
-        .status-OPEN {{ background: #E74C3C; color: white; }}
-        .status-CONFIRMED {{ background: #3498DB; color: white; }}
-        .status-REOPENED {{ background: #9B59B6; color: white; }}
-        .status-RESOLVED {{ background: #2ECC71; color: white; }}
-        .status-CLOSED {{ background: #95A5A6; color: white; }}
+        .status-OPEN { background: #E74C3C; color: white; }
+        .status-CONFIRMED { background: #3498DB; color: white; }
+        .status-REOPENED { background: #9B59B6; color: white; }
+        .status-RESOLVED { background: #2ECC71; color: white; }
+        .status-CLOSED { background: #95A5A6; color: white; }
         
-        /* Print styles */
-        @media print {{
-            body {{ background: white; }}
-            .header {{ background: #2C3E50 !important; }}
-            .card {{ break-inside: avoid; }}
-            .issue-card {{ break-inside: avoid; }}
-        }}
-    </style>
-</head>
-<body>
-    <div style="position: fixed; top: 20px; right: 20px; z-index: 1000;">
-        <button onclick="switchLanguage()" style="padding: 10px 15px; background: #34495E; color: white; border: none; border-radius: 5px; cursor: pointer; font-size: 14px;">
-            Русский / English
-        </button>
-    </div>
-    <div class="container">
-        <!-- Header Section -->
-        <div class="header">
-            <h1>{project_name}</h1>
-            <div class="project-version">version {project_version}</div>
-            <div class="subtitle" data-i18n-key="report-title">SonarQube Security Report</div>
-            <div class="date"><span data-i18n-key="report-date-title">Generated on:</span> {datetime.now().strftime('%Y-%m-%d %H:%M')}</div>
-        </div>
+        /* Page navigation of the sharded report */
+        .pager {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 10px;
+            margin: 20px 0;
+        }
         
-        <!-- Summary Cards -->
-        <div class="summary-cards">
-            <div class="card total">
-                <h3 data-i18n-key="total-issues">Total Issues</h3>
-                <div class="count">{total_issues}</div>
-            </div>
-            <div class="card vulnerabilities">
-                <h3 data-i18n-key="vulnerabilities">Vulnerabilities</h3>
-                <div class="count">{type_counts['VULNERABILITY']}</div>
-            </div>
-            <div class="card bugs">
-                <h3 data-i18n-key="bugs">Bugs</h3>
-                <div class="count">{type_counts['BUG']}</div>
-            </div>
-            <div class="card code-smells">
-                <h3 data-i18n-key="code-smells">Code Smells</h3>
-                <div class="count">{type_counts['CODE_SMELL']}</div>
-            </div>
-        </div>
+        .pager a {
+            padding: 6px 12px;
+            background: #34495E;
+            color: white;
+            border-radius: 5px;
+            text-decoration: none;
+        }
         
-        <!-- Statistics Section -->
-        <div class="statistics">
-            <!-- Severity Distribution -->
-            <div class="stat-table">
-                <h3 data-i18n-key="severity-distribution">Severity Distribution</h3>
-                <table>
-                    <thead>
-                        <tr>
-                            <th data-i18n-key="severity">Severity</th>
-                            <th data-i18n-key="count">Count</th>
-                            <th data-i18n-key="percentage">Percentage</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-        """
-
-        # Add severity rows
-        severity_order = ["BLOCKER", "CRITICAL", "MAJOR", "MINOR", "INFO"]
-        for severity in severity_order:
-            if severity in severity_counts:
-                count = severity_counts[severity]
-                percentage = (count / total_issues) * 100 if total_issues else 0
-                html_template += f"""
-                        <tr>
-                            <td data-i18n-key="severity-{severity}">{severity}</td>
-                            <td>{count}</td>
-                            <td>{percentage:.1f}%</td>
-                        </tr>
-                """
-
-        html_template += """
-                    </tbody>
-                </table>
-            </div>
-            
-            <!-- Status Distribution -->
-            <div class="stat-table">
-                <h3 data-i18n-key="status-distribution">Status Distribution</h3>
-                <table>
-                    <thead>
-                        <tr>
-                            <th data-i18n-key="status">Status</th>
-                            <th data-i18n-key="count">Count</th>
-                            <th data-i18n-key="percentage">Percentage</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-        """
-
-        # Add status rows
-        for status, count in sorted(status_counts.items()):
-            percentage = (count / total_issues) * 100 if total_issues else 0
-            html_template += f"""
-                        <tr>
-                            <td data-i18n-key="status-{status}">{status}</td>
-                            <td>{count}</td>
-                            <td>{percentage:.1f}%</td>
-                        </tr>
-            """
-
-        html_template += """
-                    </tbody>
-                </table>
-            </div>
-        </div>
+        .pager .current {
+            padding: 6px 12px;
+            font-weight: bold;
+        }
         
-        <!-- Detailed Issues Section -->
-        <div class="issues-section">
-        """
-
-        # Process each category
-        categorized_issues = {
-            "VULNERABILITY": vulnerabilities,
-            "BUG": bugs,
-            "CODE_SMELL": code_smells,
-        }
-
-        category_names = {
-            "VULNERABILITY": "VULNERABILITIES",
-            "BUG": "BUGS",
-            "CODE_SMELL": "CODE SMELLS",
-        }
-
-        # Language to Highlight.js mapping
-        hljs_language_map = {
-            "Java": "java",
-            "Python": "python",
-            "JavaScript": "javascript",
-            "TypeScript": "typescript",
-            "React JSX": "javascript",  # Highlight.js uses jsx for JSX
-            "React TSX": "typescript",  # Highlight.js uses tsx for TSX
-            "C++": "cpp",
-            "C": "c",
-            "C#": "csharp",
-            "PHP": "php",
-            "Ruby": "ruby",
-            "Go": "go",
-            "Rust": "rust",
-            "Swift": "swift",
-            "Kotlin": "kotlin",
-            "Scala": "scala",
-            "HTML": "html",
-            "CSS": "css",
-            "XML": "xml",
-            "JSON": "json",
-            "YAML": "yaml",
-            "SQL": "sql",
-            "Shell": "bash",
-            "Batch": "batch",
-            "PowerShell": "powershell",
-            "Markdown": "markdown",
-            "Docker": "dockerfile",
-            "Terraform": "hcl",  # Terraform uses HCL syntax
-            "Unknown": "plaintext",
-        }
-
-        for category, issues in categorized_issues.items():
-            if not issues:
-                continue
-
-            html_template += f"""
-            <div class="category-section">
-                <h2 class="category-header"><span data-i18n-key="category-header-{category}">{category_names[category]}</span> ({len(issues)})</h2>
-            """
-
-            # Process each issue in this category
-            for i, issue in enumerate(issues, 1):
-                component = issue.get("component", "")
-                file_path = extract_filename(component)
-                line_info = issue.get("textRange", {})
-                start_line = line_info.get("startLine", "")
-                status = issue.get("status", "")
-                severity = issue.get("severity", "")
-                message = html.escape(issue.get("message", ""))
-
-                language = get_language_from_extension(file_path)
-                hljs_lang = hljs_language_map.get(language, "plaintext")
-
-                html_template += f"""
-                <div class="issue-card">
-                    <div class="issue-header">
-                        <span class="issue-number">{i}</span> <span class="issue-source-file">{file_path} : <span>{start_line}</span></span>
-                        <span class="severity-badge severity-{severity}" data-i18n-key="severity-{severity}">{severity}</span>
-                        <span class="status-badge status-{status}" data-i18n-key="status-{status}">{status}</span>
-                    </div>
-                    
-                    <div class="issue-details">
-                        <!-- Enhanced Error Message Block -->
-                        
-                        <div class="detail-grid">
-                            <div class="detail-item">
-                                <div class="detail-label" data-i18n-key="key">Key</div>
-                                <div class="detail-value">{issue.get('key', 'N/A')}</div>
-                            </div>
-                            <div class="detail-item">
-                                <div class="detail-label" data-i18n-key="type">Type</div>
-                                <div class="detail-value">{issue.get('type', 'N/A')}</div>
-                            </div>
-                            <div class="detail-item">
-                                <div class="detail-label" data-i18n-key="author">Author</div>
-                                <div class="detail-value">{issue.get('author', 'N/A')}</div>
-                            </div>
-                            <div class="detail-item">
-                                <div class="detail-label" data-i18n-key="rule">Rule</div>
-                                <div class="detail-value">{issue.get('rule', 'N/A')}</div>
-                            </div>
-                            <div class="detail-item">
-                                <div class="detail-label" data-i18n-key="language">Language</div>
-                                <div class="detail-value">{language}</div>
-                            </div>
-                        </div>
-                        
-                        <div class="error-message-block">
-                            <div class="error-message-header">
-                                <span class="error-message-title" data-i18n-key="issue-description">Issue Description</span>
-                            </div>
-                            <div class="error-message-content">
-                                {message}
-                            </div>
-                        </div>
-                """
-
-                # Source code section with Highlight.js syntax highlighting
-                sources = issue.get("sources", [])
-                if sources:
-                    html_template += f"""
-                        <div class="source-code">
-                            <div class="code-header">
-                                <span data-i18n-key="source-code">Source Code</span>
-                                <span class="code-language">{language}</span>
-                            </div>
-                            <div class="code-content">
-                                <table class="code-table">
-                    """
-
-                    highlight_line = str(start_line)
-
-                    for source in sources[:15]:  # Limit to first 15 lines
-                        line_num = str(source.get("line", ""))
-                        code = source.get("code", "")
-
-                        line_class = (
-                            "highlighted-line" if line_num == highlight_line else ""
-                        )
-
-                        html_template += f"""
-                                <tr class="{line_class}">
-                                    <td class="line-number">{line_num}</td>
-                                    <td class="line-content">
-                                        <pre><code class="language-{hljs_lang}">{code}</code></pre>
-                                    </td>
-                                </tr>
-                        """
-
-                    html_template += """
-                                </table>
-                            </div>
-                        </div>
-                    """
-
-                # Comments section
-                comments = issue.get("comments", [])
-                if comments:
-                    html_template += """
-                        <div class="comments-section">
-                            <div class="detail-label" data-i18n-key="comments">Comments</div>
-                    """
-
-                    for comment in comments:
-                        author = comment.get("login", "Unknown")
-                        created_at = comment.get("createdAt", "")
-                        html_text = comment.get("htmlText", "")
-
-                        # Format date
-                        if created_at:
-                            try:
-                                dt = datetime.fromisoformat(
-                                    created_at.replace("Z", "+00:00")
-                                )
-                                formatted_date = dt.strftime("%d.%m.%y %H:%M")
-                            except:
-                                formatted_date = created_at
-                        else:
-                            formatted_date = "Unknown date"
-
-                        html_template += f"""
-                            <div class="comment">
-                                <div class="comment-header">
-                                    <span>{author}</span>
-                                    <span>{formatted_date}</span>
-                                </div>
-                                <div class="comment-content">{html_text}</div>
-                            </div>
-                        """
-
-                    html_template += """
-                        </div>
-                    """
-
-                html_template += """
-                    </div>
-                </div>
-                """
-
-            html_template += """
-            </div>
-            """
+        /* Filters of the virtual report */
+        .filters {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 15px;
+            align-items: flex-end;
+            background: white;
+            padding: 15px 20px;
+            margin-bottom: 20px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        
+        .filters label {
+            display: flex;
+            flex-direction: column;
+            font-size: 0.85em;
+            color: #7F8C8D;
+            gap: 4px;
+        }
+        
+        .filters select, .filters input {
+            padding: 6px 8px;
+            border: 1px solid #BDC3C7;
+            border-radius: 5px;
+            font-size: 14px;
+        }
+        
+        .virtual-row {
+            display: flow-root;
+        }
+        
+        /* Rule details */
+        .rule-key {
+            color: #7F8C8D;
+            font-size: 0.85em;
+        }
+        
+        .rule-card {
+            background: white;
+            margin-bottom: 15px;
+            padding: 15px 20px;
+            border-radius: 10px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        
+        .rule-card:target {
+            outline: 2px solid #3498DB;
+        }
+        
+        .rule-name {
+            font-weight: bold;
+            color: #2C3E50;
+        }
+        
+        .rule-meta {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 15px;
+            margin: 8px 0;
+            color: #555;
+            font-size: 0.9em;
+        }
+        
+        .rule-description {
+            color: #555;
+            line-height: 1.5;
+        }
+        
+        .rule-description summary {
+            cursor: pointer;
+            font-weight: bold;
+            color: #2C3E50;
+        }
+        
+        /* Print styles */
+        @media print {
+            body { background: white; }
+            .header { background: #2C3E50 !important; }
+            .card { break-inside: avoid; }
+            .issue-card { break-inside: avoid; }
+        }
+"""
 
-        html_template += """
-        </div>
-    </div>
-    
-    <script>
-        // Translation dictionary
+HTML_REPORT_SCRIPT = """        // Translation dictionary
         const translations = {
             'en': {
                 'report-title': 'SonarQube Security Report',
@@ -917,7 +890,19 @@ def generate_single_html_report(
                 'rule': 'Rule',
                 'language': 'Language',
                 'source-code': 'Source Code',
-                'comments': 'Comments'
+                'comments': 'Comments',
+                'index-page': 'Summary',
+                'previous-page': 'Previous',
+                'next-page': 'Next',
+                'issues-pages': 'Issues',
+                'filter-all': 'All',
+                'filter-rule': 'Rule',
+                'filter-file': 'File',
+                'filter-shown': 'Shown',
+                'rules': 'Rules',
+                'remediation': 'Remediation',
+                'rule-issues': 'Issues',
+                'rule-description': 'Rule description'
                 // Add more English translations as needed
             },
             'ru': {
@@ -951,7 +936,19 @@ def generate_single_html_report(
                 'rule': 'Правило',
                 'language': 'Язык',
                 'source-code': 'Исходный код',
-                'comments': 'Комментарии'
+                'comments': 'Комментарии',
+                'index-page': 'Сводка',
+                'previous-page': 'Назад',
+                'next-page': 'Далее',
+                'issues-pages': 'Ошибки',
+                'filter-all': 'Все',
+                'filter-rule': 'Правило',
+                'filter-file': 'Файл',
+                'filter-shown': 'Показано',
+                'rules': 'Правила',
+                'remediation': 'Время исправления',
+                'rule-issues': 'Ошибок',
+                'rule-description': 'Описание правила'
                 // Add more Russian translations as needed
             }
         };
@@ -983,390 +980,5260 @@ def generate_single_html_report(
         document.addEventListener('DOMContentLoaded', function() {
             applyTranslations();
         });
-    </script>
-    <script>hljs.highlightAll();</script>
-</body>
-</html>
-        """
-
-        # Write HTML to file
-        with open(output_filename, "w", encoding="utf-8") as f:
-            f.write(html_template)
-
-        print(f"Enhanced HTML report with Highlight.js generated: {output_filename}")
+"""
 
-        return {
-            "total_issues": total_issues,
-            "vulnerabilities": type_counts["VULNERABILITY"],
-            "bugs": type_counts["BUG"],
-            "code_smells": type_counts["CODE_SMELL"],
-            "severity_counts": severity_counts,
-            "status_counts": status_counts,
-            "html_file": output_filename,
-        }
 
-    except Exception as e:
-        print(f"Error generating enhanced HTML report: {e}")
-        import traceback
+# Colors of highlight.js token classes (github-dark theme) for reports
+# highlighted on the server, which do not load highlight.js
+SERVER_HIGHLIGHT_STYLE = """
+        .source-code code { color: #c9d1d9; }
+        .hljs-keyword { color: #ff7b72; }
+        .hljs-built_in { color: #ffa657; }
+        .hljs-number, .hljs-meta { color: #79c0ff; }
+        .hljs-string { color: #a5d6ff; }
+        .hljs-comment { color: #8b949e; }
+"""
 
-        traceback.print_exc()
-        return None
+# Highlight.js language files of report languages with a different file name
+HLJS_LANGUAGE_FILES = {"html": "xml"}
+# Directory where highlight.js assets are cached for inlining
+HLJS_ASSETS_CACHE = ".sonar_assets"
+# Asset caches already reported as incomplete in offline runs
+_uncached_assets_warned = set()
 
 
-def extract_sources_from_response(snippet_data):
+def hljs_language_files(languages):
     """
-    Extract sources from the nested structure where the top key is dynamic
-    and clean HTML from code content while preserving formatting
+    Return highlight.js language files needed for the report languages.
+    Plain text and languages without a language file are skipped
     """
-    try:
-        if not snippet_data or not isinstance(snippet_data, dict):
-            return []
-
-        # Get the first top-level key
-        first_key = list(snippet_data.keys())[0]
-        component_data = snippet_data[first_key]
+    wanted = {HLJS_LANGUAGE_FILES.get(language, language) for language in languages}
+    return [name for name in HLJS_LANGUAGES if name in wanted and name != "plaintext"]
 
-        # Extract sources if available
-        if (
-            isinstance(component_data, dict)
-            and "sources" in component_data
-            and isinstance(component_data["sources"], list)
-        ):
 
-            # Clean HTML from each source's code content while preserving formatting
-            sources = []
-            for source in component_data["sources"]:
-                sources.append(source)
+def hljs_asset_cache_path(path, cache_dir=HLJS_ASSETS_CACHE):
+    """Return path of the cached copy of a highlight.js CDN file"""
+    version = HLJS_CDN_URL.rsplit("/", 1)[-1]
+    return os.path.join(cache_dir, version, *path.split("/"))
 
-            return sources
 
-        return []
+def fetch_hljs_asset(path, cache_dir=HLJS_ASSETS_CACHE):
+    """
+    Return content of a highlight.js CDN file. Files are cached on disk,
+    so reports with inlined assets can be generated offline afterwards
+    """
+    cache_path = hljs_asset_cache_path(path, cache_dir)
+    if not os.path.exists(cache_path):
+        response = requests.get(f"{HLJS_CDN_URL}/{path}", timeout=60)
+        response.raise_for_status()
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        os.replace(temp_path, cache_path)
 
-    except (IndexError, KeyError, TypeError) as e:
-        print(f"Warning: Could not extract sources from response: {e}")
-        return []
+    with open(cache_path, "r", encoding="utf-8") as f:
+        return f.read()
 
 
-def fetch_issue_snippets(all_issues, base_url, cookies, headers):
+def html_highlight_assets(
+    languages,
+    inline_assets=False,
+    cache_dir=HLJS_ASSETS_CACHE,
+    highlighting="client",
+    offline=False,
+):
     """
-    Fetch source code snippets for issues that have textRange
-    and add them to the corresponding issue objects
+    Return head tags of highlight.js, its theme and the language files, or
+    only the token colors when code is highlighted on the server. `offline`
+    reports inline only cached assets and otherwise load them from the CDN
+    """
+    if highlighting == "server":
+        return f"""
+    <style>{SERVER_HIGHLIGHT_STYLE}    </style>
     """
-    print("Fetching source code snippets for issues...")
 
-    issues_with_snippets = 0
-    total_issues = len(all_issues)
+    paths = [f"languages/{name}.min.js" for name in hljs_language_files(languages)]
 
-    for index, issue in enumerate(all_issues):
-        # Check if issue has textRange
-        if issue.get("textRange"):
-            issue_key = issue.get("key", "")
-            if issue_key:
-                try:
-                    # Build the URL for snippet API
-                    snippet_url = (
-                        f"{base_url}/api/sources/issue_snippets?issueKey={issue_key}"
-                    )
+    if inline_assets and offline:
+        missing = [
+            path
+            for path in ["highlight.min.js", "styles/github-dark.min.css"] + paths
+            if not os.path.exists(hljs_asset_cache_path(path, cache_dir))
+        ]
+        if missing:
+            inline_assets = False
+            if cache_dir not in _uncached_assets_warned:
+                _uncached_assets_warned.add(cache_dir)
+                print_line(
+                    f"Warning: {', '.join(missing)} not cached in {cache_dir}, "
+                    "the offline HTML report loads highlight.js from the CDN"
+                )
 
-                    # Send GET request
-                    response = requests.get(
-                        url=snippet_url, headers=headers, cookies=cookies, verify=False
-                    )
+    if inline_assets:
+        scripts = "".join(
+            "\n    <script>{}</script>".format(
+                fetch_hljs_asset(path, cache_dir).replace("</script", "<\\/script")
+            )
+            for path in ["highlight.min.js"] + paths
+        )
+        return f"""
+    <!-- Highlight.js for syntax highlighting -->
+    <style>{fetch_hljs_asset("styles/github-dark.min.css", cache_dir)}</style>{scripts}
+    """
 
-                    # Check if request was successful
-                    if response.status_code == 200:
-                        snippet_data = response.json()
+    language_scripts = "".join(
+        f"""
+    <script src="{HLJS_CDN_URL}/{path}"></script>"""
+        for path in paths
+    )
+    return f"""
+    <!-- Highlight.js for syntax highlighting -->
+    <link rel="stylesheet" href="{HLJS_CDN_URL}/styles/github-dark.min.css">
+    <script src="{HLJS_CDN_URL}/highlight.min.js"></script>
+    
+    <!-- Load additional languages -->{language_scripts}
+    """
 
-                        # Extract sources using the new function
-                        sources = extract_sources_from_response(snippet_data)
 
-                        # Add sources to the issue
-                        issue["sources"] = sources
-                        issues_with_snippets += 1
+def html_report_head(project_name, languages=HLJS_LANGUAGES, highlight_assets=None):
+    """
+    Return the HTML document start up to the end of <head>. Language files
+    are loaded for `languages`; `highlight_assets` replaces the highlight.js
+    tags (an empty string leaves highlight.js out)
+    """
+    if highlight_assets is None:
+        highlight_assets = html_highlight_assets(languages)
 
-                        # Print progress
-                        if (index + 1) % 50 == 0 or (index + 1) == total_issues:
-                            print(
-                                f"Processed {index + 1}/{total_issues} issues, fetched snippets for {issues_with_snippets} issues"
-                            )
+    return f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{project_name} - SonarQube Security Report</title>
+    {highlight_assets}
+    <style>
+{HTML_REPORT_STYLE}    </style>
+</head>
+"""
 
-                    else:
-                        print(
-                            f"Warning: Failed to fetch snippets for issue {issue_key}, status: {response.status_code}"
-                        )
-                        issue["sources"] = []
 
-                    # Add small delay to avoid overwhelming the server
-                    time.sleep(0.1)
+def html_report_header(project_name, project_version):
+    """Return the language switch and the report title block"""
+    return f"""<body>
+    <div style="position: fixed; top: 20px; right: 20px; z-index: 1000;">
+        <button onclick="switchLanguage()" style="padding: 10px 15px; background: #34495E; color: white; border: none; border-radius: 5px; cursor: pointer; font-size: 14px;">
+            Русский / English
+        </button>
+    </div>
+    <div class="container">
+        <!-- Header Section -->
+        <div class="header">
+            <h1>{project_name}</h1>
+            <div class="project-version">version {project_version}</div>
+            <div class="subtitle" data-i18n-key="report-title">SonarQube Security Report</div>
+            <div class="date"><span data-i18n-key="report-date-title">Generated on:</span> {datetime.now().strftime('%Y-%m-%d %H:%M')}</div>
+        </div>
+        """
 
-                except requests.exceptions.RequestException as e:
-                    print(f"Error fetching snippets for issue {issue_key}: {e}")
-                    issue["sources"] = []
-                except Exception as e:
-                    print(f"Unexpected error for issue {issue_key}: {e}")
-                    issue["sources"] = []
-        else:
-            # No textRange, no sources
-            issue["sources"] = []
 
-    print(
-        f"Successfully fetched snippets for {issues_with_snippets} out of {total_issues} issues"
+def write_html_summary(
+    write, total_issues, type_counts, severity_counts, status_counts
+):
+    """Write summary cards and severity/status distribution tables"""
+    write(
+        f"""
+        <!-- Summary Cards -->
+        <div class="summary-cards">
+            <div class="card total">
+                <h3 data-i18n-key="total-issues">Total Issues</h3>
+                <div class="count">{total_issues}</div>
+            </div>
+            <div class="card vulnerabilities">
+                <h3 data-i18n-key="vulnerabilities">Vulnerabilities</h3>
+                <div class="count">{type_counts['VULNERABILITY']}</div>
+            </div>
+            <div class="card bugs">
+                <h3 data-i18n-key="bugs">Bugs</h3>
+                <div class="count">{type_counts['BUG']}</div>
+            </div>
+            <div class="card code-smells">
+                <h3 data-i18n-key="code-smells">Code Smells</h3>
+                <div class="count">{type_counts['CODE_SMELL']}</div>
+            </div>
+        </div>
+        
+        <!-- Statistics Section -->
+        <div class="statistics">
+            <!-- Severity Distribution -->
+            <div class="stat-table">
+                <h3 data-i18n-key="severity-distribution">Severity Distribution</h3>
+                <table>
+                    <thead>
+                        <tr>
+                            <th data-i18n-key="severity">Severity</th>
+                            <th data-i18n-key="count">Count</th>
+                            <th data-i18n-key="percentage">Percentage</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+        """
     )
-    return all_issues
 
+    # Add severity rows
+    severity_order = ["BLOCKER", "CRITICAL", "MAJOR", "MINOR", "INFO"]
+    for severity in severity_order:
+        if severity in severity_counts:
+            count = severity_counts[severity]
+            percentage = (count / total_issues) * 100 if total_issues else 0
+            write(
+                f"""
+                        <tr>
+                            <td data-i18n-key="severity-{severity}">{severity}</td>
+                            <td>{count}</td>
+                            <td>{percentage:.1f}%</td>
+                        </tr>
+                """
+            )
 
-def generate_excel_report(all_issues, output_filename="sonarqube_report.xlsx"):
-    """Generate Excel report with issues categorized by type"""
-
-    # Categorize issues
-    vulnerabilities = []
-    bugs = []
-    code_smells = []
-
-    for issue in all_issues:
-        issue_type = issue.get("type", "").upper()
-
-        if issue_type == "VULNERABILITY":
-            vulnerabilities.append(issue)
-        elif issue_type == "BUG":
-            bugs.append(issue)
-        elif issue_type == "CODE_SMELL":
-            code_smells.append(issue)
-
-    # Create workbook and sheets
-    wb = Workbook()
-
-    # Remove default sheet
-    wb.remove(wb.active)
-
-    # Create sheets for each issue type
-    vuln_sheet = wb.create_sheet("VULNERABILITIES")
-    bug_sheet = wb.create_sheet("BUGS")
-    smell_sheet = wb.create_sheet("CODE_SMELLS")
-
-    # Define headers
-    headers = [
-        "Key",
-        "External Rule Engine",
-        "File",
-        "Line",
-        "Language",
-        "Message",
-        "Status",
-        "Severity",
-        "Resolution",
-        "Comment",
-        "Comment Author",
-        "Code Author",
-    ]
+    write(
+        """
+                    </tbody>
+                </table>
+            </div>
+            
+            <!-- Status Distribution -->
+            <div class="stat-table">
+                <h3 data-i18n-key="status-distribution">Status Distribution</h3>
+                <table>
+                    <thead>
+                        <tr>
+                            <th data-i18n-key="status">Status</th>
+                            <th data-i18n-key="count">Count</th>
+                            <th data-i18n-key="percentage">Percentage</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+        """
+    )
+
+    # Add status rows
+    for status, count in sorted(status_counts.items()):
+        percentage = (count / total_issues) * 100 if total_issues else 0
+        write(
+            f"""
+                        <tr>
+                            <td data-i18n-key="status-{status}">{status}</td>
+                            <td>{count}</td>
+                            <td>{percentage:.1f}%</td>
+                        </tr>
+            """
+        )
+
+    write(
+        """
+                    </tbody>
+                </table>
+            </div>
+        </div>
+        """
+    )
+
+
+def html_category_header(category, count):
+    """Return opening of a category section"""
+    return f"""
+            <div class="category-section">
+                <h2 class="category-header"><span data-i18n-key="category-header-{category}">{CATEGORY_NAMES[category]}</span> ({count})</h2>
+            """
+
+
+def format_comment_date(created_at):
+    """Return comment date in the report format"""
+    if created_at:
+        try:
+            dt = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+            return dt.strftime("%d.%m.%y %H:%M")
+        except:
+            return created_at
+    return "Unknown date"
+
+
+def html_rule_anchor(rule_key):
+    """Return id of the rule entry in the rules section"""
+    return "rule-" + html.escape(rule_key)
+
+
+def render_rule_details(rule_key, rule, rules_page=""):
+    """
+    Return detail items of the issue rule: its name linking to the rule
+    entry on `rules_page` and the remediation effort, or the bare rule key
+    when the rule is not known
+    """
+    if rule is None:
+        return f"""
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="rule">Rule</div>
+                                <div class="detail-value">{rule_key}</div>
+                            </div>"""
+
+    details = f"""
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="rule">Rule</div>
+                                <div class="detail-value"><a href="{rules_page}#{html_rule_anchor(rule_key)}">{html.escape(rule["name"])}</a>
+                                    <div class="rule-key">{html.escape(rule_key)}</div>
+                                </div>
+                            </div>"""
+    if rule["remediation"]:
+        details += f"""
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="remediation">Remediation</div>
+                                <div class="detail-value">{html.escape(rule["remediation"])}</div>
+                            </div>"""
+    return details
+
+
+def html_rules_section(rules, rule_counts):
+    """
+    Return the section describing each rule of the report once, ordered by
+    the number of issues. `rules` maps rule keys to rule metadata and rules
+    missing from it are left out
+    """
+    entries = [
+        (rules.get(rule_key), rule_key, count)
+        for rule_key, count in sorted(
+            rule_counts.items(), key=lambda item: (-item[1], item[0])
+        )
+    ]
+    entries = [entry for entry in entries if entry[0] is not None]
+    if not entries:
+        return ""
+
+    parts = [
+        f"""
+        <!-- Rules Section -->
+        <div class="issues-section">
+            <div class="category-section">
+                <h2 class="category-header"><span data-i18n-key="rules">Rules</span> ({len(entries)})</h2>
+            """
+    ]
+    for rule, rule_key, count in entries:
+        severity = html.escape(rule["severity"])
+        meta = []
+        if rule["type"]:
+            meta.append(
+                f'<span><span data-i18n-key="type">Type</span>: {html.escape(rule["type"])}</span>'
+            )
+        if rule["language"]:
+            meta.append(
+                f'<span><span data-i18n-key="language">Language</span>: {html.escape(rule["language"])}</span>'
+            )
+        if rule["remediation"]:
+            meta.append(
+                f'<span><span data-i18n-key="remediation">Remediation</span>: {html.escape(rule["remediation"])}</span>'
+            )
+        meta.append(
+            f'<span><span data-i18n-key="rule-issues">Issues</span>: {count}</span>'
+        )
+        badge = ""
+        if severity:
+            badge = f'<span class="severity-badge severity-{severity}" data-i18n-key="severity-{severity}">{severity}</span>'
+        # Rule descriptions are HTML rendered by SonarQube, like comments
+        description = ""
+        if rule["description"]:
+            description = f"""
+                    <details class="rule-description">
+                        <summary data-i18n-key="rule-description">Rule description</summary>
+                        {rule["description"]}
+                    </details>"""
+
+        parts.append(
+            f"""
+                <div class="rule-card" id="{html_rule_anchor(rule_key)}">
+                    <div class="rule-header">
+                        <span class="rule-name">{html.escape(rule["name"])}</span>
+                        <span class="rule-key">{html.escape(rule_key)}</span>
+                        {badge}
+                    </div>
+                    <div class="rule-meta">
+                        {" ".join(meta)}
+                    </div>{description}
+                </div>
+            """
+        )
+    parts.append(
+        """
+            </div>
+        </div>
+        """
+    )
+    return "".join(parts)
+
+
+def render_issue_card(
+    index,
+    issue,
+    file_path,
+    language,
+    hljs_lang,
+    server_highlighting=False,
+    rule=None,
+    rules_page="",
+):
+    """
+    Return HTML of one issue card with source code and comments. With
+    `server_highlighting` the code keeps SonarQube's own highlighting.
+    Metadata of the issue `rule` links to its entry on `rules_page`
+    """
+    parts = []
+    line_info = issue.get("textRange", {})
+    start_line = line_info.get("startLine", "")
+    status = issue.get("status", "")
+    severity = issue.get("severity", "")
+    message = html.escape(issue.get("message", ""))
+    rule_details = render_rule_details(issue.get("rule", "N/A"), rule, rules_page)
+
+    parts.append(
+        f"""
+                <div class="issue-card">
+                    <div class="issue-header">
+                        <span class="issue-number">{index}</span> <span class="issue-source-file">{file_path} : <span>{start_line}</span></span>
+                        <span class="severity-badge severity-{severity}" data-i18n-key="severity-{severity}">{severity}</span>
+                        <span class="status-badge status-{status}" data-i18n-key="status-{status}">{status}</span>
+                    </div>
+                    
+                    <div class="issue-details">
+                        <!-- Enhanced Error Message Block -->
+                        
+                        <div class="detail-grid">
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="key">Key</div>
+                                <div class="detail-value">{issue.get('key', 'N/A')}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="type">Type</div>
+                                <div class="detail-value">{issue.get('type', 'N/A')}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="author">Author</div>
+                                <div class="detail-value">{issue.get('author', 'N/A')}</div>
+                            </div>{rule_details}
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="language">Language</div>
+                                <div class="detail-value">{language}</div>
+                            </div>
+                        </div>
+                        
+                        <div class="error-message-block">
+                            <div class="error-message-header">
+                                <span class="error-message-title" data-i18n-key="issue-description">Issue Description</span>
+                            </div>
+                            <div class="error-message-content">
+                                {message}
+                            </div>
+                        </div>
+                """
+    )
+
+    # Source code section with Highlight.js syntax highlighting
+    sources = issue.get("sources", [])
+    if sources:
+        parts.append(
+            f"""
+                        <div class="source-code">
+                            <div class="code-header">
+                                <span data-i18n-key="source-code">Source Code</span>
+                                <span class="code-language">{language}</span>
+                            </div>
+                            <div class="code-content">
+                                <table class="code-table">
+                    """
+        )
+
+        highlight_line = str(start_line)
+
+        for source in sources[:SNIPPET_MAX_LINES]:
+            line_num = str(source.get("line", ""))
+            code = source.get("code", "")
+            if server_highlighting:
+                code = convert_sonar_highlighting(code)
+
+            line_class = "highlighted-line" if line_num == highlight_line else ""
+
+            parts.append(
+                f"""
+                                <tr class="{line_class}">
+                                    <td class="line-number">{line_num}</td>
+                                    <td class="line-content">
+                                        <pre><code class="language-{hljs_lang}">{code}</code></pre>
+                                    </td>
+                                </tr>
+                        """
+            )
+
+        parts.append(
+            """
+                                </table>
+                            </div>
+                        </div>
+                    """
+        )
+
+    # Comments section
+    comments = issue.get("comments", [])
+    if comments:
+        parts.append(
+            """
+                        <div class="comments-section">
+                            <div class="detail-label" data-i18n-key="comments">Comments</div>
+                    """
+        )
+
+        for comment in comments:
+            author = comment.get("login", "Unknown")
+            created_at = comment.get("createdAt", "")
+            html_text = comment.get("htmlText", "")
+
+            formatted_date = format_comment_date(created_at)
+
+            parts.append(
+                f"""
+                            <div class="comment">
+                                <div class="comment-header">
+                                    <span>{author}</span>
+                                    <span>{formatted_date}</span>
+                                </div>
+                                <div class="comment-content">{html_text}</div>
+                            </div>
+                        """
+            )
+
+        parts.append(
+            """
+                        </div>
+                    """
+        )
+
+    parts.append(
+        """
+                    </div>
+                </div>
+                """
+    )
+
+    return "".join(parts)
+
+
+# Keeps the selected language when moving between pages of a sharded report
+HTML_PAGES_SCRIPT = """
+        const savedLanguage = localStorage.getItem('sonar-report-language');
+        if (savedLanguage) {
+            currentLanguage = savedLanguage;
+        }
+
+        const switchPageLanguage = switchLanguage;
+        switchLanguage = function() {
+            switchPageLanguage();
+            localStorage.setItem('sonar-report-language', currentLanguage);
+        };
+"""
+
+
+# Renders issue cards of the virtual report from the embedded payload.
+# Only the rows around the viewport are kept in the DOM, the rest of the
+# list is replaced by spacers sized from measured or estimated row heights
+HTML_VIRTUAL_SCRIPT = """
+        const OVERSCAN_PX = 1500;
+        const SEVERITY_ORDER = ['BLOCKER', 'CRITICAL', 'MAJOR', 'MINOR', 'INFO'];
+        const virtualList = {
+            issues: [],
+            rows: [],
+            heights: [],
+            estimate: 500,
+            first: -1,
+            last: -1,
+            scheduled: false
+        };
+
+        function escapeHtml(value) {
+            return String(value === undefined || value === null ? '' : value).replace(
+                /[&<>"']/g,
+                c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c])
+            );
+        }
+
+        async function loadIssues() {
+            const element = document.getElementById('issues-data');
+            if (element.dataset.encoding !== 'gzip-base64') {
+                return JSON.parse(element.textContent);
+            }
+            const bytes = Uint8Array.from(atob(element.textContent.trim()), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            return await new Response(stream).json();
+        }
+
+        function renderRuleDetails(rule) {
+            const details = ruleDetails[rule];
+            if (!details) {
+                return `
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="rule">Rule</div>
+                                <div class="detail-value">${escapeHtml(rule)}</div>
+                            </div>`;
+            }
+            const [name, remediation] = details;
+            let html = `
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="rule">Rule</div>
+                                <div class="detail-value"><a href="#rule-${escapeHtml(rule)}">${escapeHtml(name)}</a>
+                                    <div class="rule-key">${escapeHtml(rule)}</div>
+                                </div>
+                            </div>`;
+            if (remediation) {
+                html += `
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="remediation">Remediation</div>
+                                <div class="detail-value">${escapeHtml(remediation)}</div>
+                            </div>`;
+            }
+            return html;
+        }
+
+        function renderIssueCard(issue) {
+            const [type, number, key, severity, status, rule, author, file, language,
+                hljsLanguage, message, line, sources, comments] = issue;
+            const parts = [`
+                <div class="issue-card">
+                    <div class="issue-header">
+                        <span class="issue-number">${number}</span> <span class="issue-source-file">${escapeHtml(file)} : <span>${escapeHtml(line)}</span></span>
+                        <span class="severity-badge severity-${escapeHtml(severity)}" data-i18n-key="severity-${escapeHtml(severity)}">${escapeHtml(severity)}</span>
+                        <span class="status-badge status-${escapeHtml(status)}" data-i18n-key="status-${escapeHtml(status)}">${escapeHtml(status)}</span>
+                    </div>
+                    <div class="issue-details">
+                        <div class="detail-grid">
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="key">Key</div>
+                                <div class="detail-value">${escapeHtml(key)}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="type">Type</div>
+                                <div class="detail-value">${escapeHtml(type)}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="author">Author</div>
+                                <div class="detail-value">${escapeHtml(author)}</div>
+                            </div>${renderRuleDetails(rule)}
+                            <div class="detail-item">
+                                <div class="detail-label" data-i18n-key="language">Language</div>
+                                <div class="detail-value">${escapeHtml(language)}</div>
+                            </div>
+                        </div>
+                        <div class="error-message-block">
+                            <div class="error-message-header">
+                                <span class="error-message-title" data-i18n-key="issue-description">Issue Description</span>
+                            </div>
+                            <div class="error-message-content">${escapeHtml(message)}</div>
+                        </div>`];
+
+            if (sources.length) {
+                parts.push(`
+                        <div class="source-code">
+                            <div class="code-header">
+                                <span data-i18n-key="source-code">Source Code</span>
+                                <span class="code-language">${escapeHtml(language)}</span>
+                            </div>
+                            <div class="code-content">
+                                <table class="code-table">`);
+                for (const [lineNumber, code] of sources) {
+                    const lineClass = String(lineNumber) === String(line) ? 'highlighted-line' : '';
+                    // Code keeps the markup SonarQube returned, as in the static report
+                    parts.push(`
+                                <tr class="${lineClass}">
+                                    <td class="line-number">${lineNumber}</td>
+                                    <td class="line-content"><pre><code class="language-${escapeHtml(hljsLanguage)}">${code}</code></pre></td>
+                                </tr>`);
+                }
+                parts.push(`
+                                </table>
+                            </div>
+                        </div>`);
+            }
+
+            if (comments.length) {
+                parts.push(`
+                        <div class="comments-section">
+                            <div class="detail-label" data-i18n-key="comments">Comments</div>`);
+                for (const [login, date, htmlText] of comments) {
+                    parts.push(`
+                            <div class="comment">
+                                <div class="comment-header">
+                                    <span>${escapeHtml(login)}</span>
+                                    <span>${escapeHtml(date)}</span>
+                                </div>
+                                <div class="comment-content">${htmlText}</div>
+                            </div>`);
+                }
+                parts.push(`
+                        </div>`);
+            }
+
+            parts.push(`
+                    </div>
+                </div>`);
+            return parts.join('');
+        }
+
+        function renderRow(row) {
+            if (row.category !== undefined) {
+                return `<h2 class="category-header"><span data-i18n-key="category-header-${row.category}">${categoryNames[row.category]}</span> (${row.count})</h2>`;
+            }
+            return renderIssueCard(virtualList.issues[row.issue]);
+        }
+
+        function rowHeight(index) {
+            const height = virtualList.heights[index];
+            if (height > 0) {
+                return height;
+            }
+            return virtualList.rows[index].category !== undefined ? 80 : virtualList.estimate;
+        }
+
+        function renderVisibleRows(force) {
+            virtualList.scheduled = false;
+            const list = document.getElementById('virtual-issues');
+            const rows = virtualList.rows;
+            const listTop = list.getBoundingClientRect().top + window.scrollY;
+            const viewTop = window.scrollY - listTop - OVERSCAN_PX;
+            const viewBottom = window.scrollY - listTop + window.innerHeight + OVERSCAN_PX;
+
+            let first = 0;
+            let offset = 0;
+            while (first < rows.length && offset + rowHeight(first) < viewTop) {
+                offset += rowHeight(first);
+                first++;
+            }
+            let last = first;
+            let end = offset;
+            while (last < rows.length && end < viewBottom) {
+                end += rowHeight(last);
+                last++;
+            }
+            if (!force && first === virtualList.first && last === virtualList.last) {
+                return;
+            }
+            virtualList.first = first;
+            virtualList.last = last;
+
+            let rest = 0;
+            for (let index = last; index < rows.length; index++) {
+                rest += rowHeight(index);
+            }
+
+            const content = document.getElementById('virtual-content');
+            document.getElementById('virtual-top').style.height = offset + 'px';
+            document.getElementById('virtual-bottom').style.height = rest + 'px';
+            content.innerHTML = rows.slice(first, last)
+                .map(row => `<div class="virtual-row">${renderRow(row)}</div>`)
+                .join('');
+
+            // Measure rendered rows to place the spacers precisely next time
+            let measured = 0;
+            let measuredCount = 0;
+            Array.from(content.children).forEach((element, index) => {
+                virtualList.heights[first + index] = element.offsetHeight;
+                if (rows[first + index].category === undefined) {
+                    measured += element.offsetHeight;
+                    measuredCount++;
+                }
+            });
+            if (measuredCount) {
+                virtualList.estimate = measured / measuredCount;
+            }
+
+            applyTranslations();
+            observeCodeBlocks(content);
+        }
+
+        function scheduleRender() {
+            if (!virtualList.scheduled) {
+                virtualList.scheduled = true;
+                requestAnimationFrame(() => renderVisibleRows(false));
+            }
+        }
+
+        function applyFilters() {
+            const severity = document.getElementById('filter-severity').value;
+            const status = document.getElementById('filter-status').value;
+            const rule = document.getElementById('filter-rule').value.trim().toLowerCase();
+            // Rules are matched by key and by name
+            const ruleText = key => (key + ' ' + (ruleDetails[key] ? ruleDetails[key][0] : '')).toLowerCase();
+            const file = document.getElementById('filter-file').value.trim().toLowerCase();
+
+            const groups = {};
+            virtualList.issues.forEach((issue, index) => {
+                if ((severity && issue[3] !== severity)
+                    || (status && issue[4] !== status)
+                    || (rule && !ruleText(issue[5]).includes(rule))
+                    || (file && !String(issue[7]).toLowerCase().includes(file))) {
+                    return;
+                }
+                (groups[issue[0]] = groups[issue[0]] || []).push(index);
+            });
+
+            const rows = [];
+            let shown = 0;
+            for (const category of Object.keys(categoryNames)) {
+                const indexes = groups[category];
+                if (!indexes) {
+                    continue;
+                }
+                rows.push({category: category, count: indexes.length});
+                indexes.forEach(index => rows.push({issue: index}));
+                shown += indexes.length;
+            }
+
+            virtualList.rows = rows;
+            virtualList.heights = new Array(rows.length).fill(0);
+            document.getElementById('filter-shown-count').textContent = shown;
+            renderVisibleRows(true);
+        }
+
+        function fillSelect(id, values) {
+            const select = document.getElementById(id);
+            const prefix = id === 'filter-severity' ? 'severity-' : 'status-';
+            values.forEach(value => {
+                const option = document.createElement('option');
+                option.value = value;
+                option.textContent = value;
+                option.setAttribute('data-i18n-key', prefix + value);
+                select.appendChild(option);
+            });
+        }
+
+        document.addEventListener('DOMContentLoaded', async function() {
+            virtualList.issues = await loadIssues();
+            const severities = new Set(virtualList.issues.map(issue => issue[3]));
+            const statuses = new Set(virtualList.issues.map(issue => issue[4]));
+            fillSelect('filter-severity', SEVERITY_ORDER.filter(value => severities.has(value)));
+            fillSelect('filter-status', Array.from(statuses).sort());
+
+            document.querySelectorAll('.filters select').forEach(element =>
+                element.addEventListener('change', applyFilters));
+            document.querySelectorAll('.filters input').forEach(element =>
+                element.addEventListener('input', applyFilters));
+            window.addEventListener('scroll', scheduleRender, {passive: true});
+            window.addEventListener('resize', () => renderVisibleRows(true));
+            applyFilters();
+        });
+"""
+
+
+# Highlights source code tables only when they come close to the viewport,
+# so the time to open a report does not depend on the number of snippets
+HTML_HIGHLIGHT_SCRIPT = """
+        const highlightObserver = window.hljs && 'IntersectionObserver' in window
+            ? new IntersectionObserver(entries => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        highlightObserver.unobserve(entry.target);
+                        highlightCodeTable(entry.target);
+                    }
+                });
+            }, {rootMargin: '600px 0px'})
+            : null;
+
+        function highlightCodeTable(table) {
+            table.querySelectorAll('pre code').forEach(block => {
+                if (!block.dataset.highlighted) {
+                    hljs.highlightElement(block);
+                }
+            });
+        }
+
+        function observeCodeBlocks(root) {
+            if (!window.hljs) {
+                return;
+            }
+            root.querySelectorAll('.code-table').forEach(table => {
+                if (highlightObserver) {
+                    highlightObserver.observe(table);
+                } else {
+                    highlightCodeTable(table);
+                }
+            });
+        }
+
+        document.addEventListener('DOMContentLoaded', function() {
+            observeCodeBlocks(document);
+        });
+"""
+
+
+def html_report_footer(extra_script=""):
+    """Return the translation and highlighting scripts and the document end"""
+    return f"""
+    <script>
+{HTML_REPORT_SCRIPT}{extra_script}    </script>
+    <script>
+{HTML_HIGHLIGHT_SCRIPT}    </script>
+</body>
+</html>
+        """
+
+
+class HtmlReportWriter:
+    """
+    Streaming single-file HTML report writer.
+
+    Issue cards can be added as issues arrive; they are rendered at once
+    and spooled to a temporary file per category. close() writes the head
+    and statistics, which need the final counts, and then copies the
+    spooled cards to the output (a path or any writable text stream).
+    With `rules` (a RuleCatalog or a mapping of rule keys to metadata) the
+    cards show rule names and close() adds the rules section
+    """
+
+    def __init__(
+        self,
+        output_filename,
+        project_name,
+        project_version,
+        inline_assets=False,
+        assets_cache=HLJS_ASSETS_CACHE,
+        highlighting="client",
+        rules=None,
+        offline=False,
+    ):
+        self.output_filename = output_filename
+        self.project_name = project_name
+        self.project_version = project_version
+        self.inline_assets = inline_assets
+        self.assets_cache = assets_cache
+        self.highlighting = highlighting
+        self.offline = offline
+        self.rules = rules or {}
+        self.spools = {
+            category: tempfile.TemporaryFile("w+", encoding="utf-8")
+            for category in ISSUE_TYPES
+        }
+        self.counts = {category: 0 for category in ISSUE_TYPES}
+        self.rule_counts = {}
+        # Highlight.js languages of the snippets in the report
+        self.languages = set()
+
+    def add_issue(self, issue, info):
+        """Render the issue card into its category spool"""
+        category = issue.get("type", "").upper()
+        if category not in self.spools:
+            return
+
+        self.counts[category] += 1
+        rule_key = issue.get("rule", "N/A")
+        self.rule_counts[rule_key] = self.rule_counts.get(rule_key, 0) + 1
+        if issue.get("sources"):
+            self.languages.add(info.hljs_language)
+        self.spools[category].write(
+            render_issue_card(
+                self.counts[category],
+                issue,
+                info.file_path,
+                info.language,
+                info.hljs_language,
+                self.highlighting == "server",
+                self.rules.get(rule_key),
+            )
+        )
+
+    def close(self, catalog):
+        """Write the document using statistics of the catalog"""
+        owns_output = not hasattr(self.output_filename, "write")
+        if owns_output:
+            output = open(self.output_filename, "w", encoding="utf-8")
+        else:
+            output = self.output_filename
+            self.output_filename = getattr(output, "name", "<stream>")
+
+        try:
+            write = output.write
+
+            write(
+                html_report_head(
+                    self.project_name,
+                    highlight_assets=html_highlight_assets(
+                        self.languages,
+                        self.inline_assets,
+                        self.assets_cache,
+                        self.highlighting,
+                        self.offline,
+                    ),
+                )
+            )
+            write(html_report_header(self.project_name, self.project_version))
+            write_html_summary(
+                write,
+                len(catalog),
+                catalog.type_counts,
+                catalog.severity_counts,
+                catalog.status_counts,
+            )
+
+            write(
+                """
+        <!-- Detailed Issues Section -->
+        <div class="issues-section">
+        """
+            )
+
+            # Process each category
+            for category, spool in self.spools.items():
+                if not self.counts[category]:
+                    continue
+
+                write(html_category_header(category, self.counts[category]))
+
+                spool.seek(0)
+                shutil.copyfileobj(spool, output)
+
+                write(
+                    """
+            </div>
+            """
+                )
+
+            write(
+                """
+        </div>"""
+            )
+            write(html_rules_section(self.rules, self.rule_counts))
+            write(
+                """
+    </div>
+    """
+            )
+            write(html_report_footer())
+        finally:
+            if owns_output:
+                output.close()
+            for spool in self.spools.values():
+                spool.close()
+
+        return {
+            "total_issues": len(catalog),
+            "vulnerabilities": self.counts["VULNERABILITY"],
+            "bugs": self.counts["BUG"],
+            "code_smells": self.counts["CODE_SMELL"],
+            "severity_counts": catalog.severity_counts,
+            "status_counts": catalog.status_counts,
+            "html_file": self.output_filename,
+        }
+
+
+def html_shard_filename(category, page):
+    """Return file name of a sharded report page"""
+    return f"{category.lower()}-{page}.html"
+
+
+def html_pager(category, page, pages):
+    """Return navigation links of a sharded report page"""
+    links = ['<a href="index.html" data-i18n-key="index-page">Summary</a>']
+    if page > 1:
+        links.append(
+            f'<a href="{html_shard_filename(category, page - 1)}" '
+            'data-i18n-key="previous-page">Previous</a>'
+        )
+    links.append(f'<span class="current">{page} / {pages}</span>')
+    if page < pages:
+        links.append(
+            f'<a href="{html_shard_filename(category, page + 1)}" '
+            'data-i18n-key="next-page">Next</a>'
+        )
+    return f"""
+            <div class="pager">
+                {" ".join(links)}
+            </div>
+            """
+
+
+class ShardedHtmlReportWriter:
+    """
+    Streaming multi-page HTML report writer.
+
+    Writes an index page with the summary and statistics and splits issue
+    cards of every category into pages of `shard_size` issues, so each page
+    stays small whatever the project size. Cards are spooled per category
+    and cut into pages at close(), when the page count is known. Rule names
+    on the cards link to the rules section of the index page
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        project_name,
+        project_version,
+        shard_size=200,
+        inline_assets=False,
+        assets_cache=HLJS_ASSETS_CACHE,
+        highlighting="client",
+        rules=None,
+        offline=False,
+    ):
+        self.output_dir = output_dir
+        self.project_name = project_name
+        self.project_version = project_version
+        self.shard_size = max(1, shard_size)
+        self.inline_assets = inline_assets
+        self.assets_cache = assets_cache
+        self.highlighting = highlighting
+        self.offline = offline
+        self.rules = rules or {}
+        self.rule_counts = {}
+        self.spools = {
+            category: tempfile.TemporaryFile("w+b") for category in ISSUE_TYPES
+        }
+        # Spool offsets where the pages of each category start
+        self.page_offsets = {category: [] for category in ISSUE_TYPES}
+        # Highlight.js languages of the snippets on each page
+        self.page_languages = {category: [] for category in ISSUE_TYPES}
+        self.counts = {category: 0 for category in ISSUE_TYPES}
+
+    def add_issue(self, issue, info):
+        """Render the issue card into its category spool"""
+        category = issue.get("type", "").upper()
+        if category not in self.spools:
+            return
+
+        spool = self.spools[category]
+        if self.counts[category] % self.shard_size == 0:
+            self.page_offsets[category].append(spool.tell())
+            self.page_languages[category].append(set())
+        self.counts[category] += 1
+        rule_key = issue.get("rule", "N/A")
+        self.rule_counts[rule_key] = self.rule_counts.get(rule_key, 0) + 1
+        if issue.get("sources"):
+            self.page_languages[category][-1].add(info.hljs_language)
+        spool.write(
+            render_issue_card(
+                self.counts[category],
+                issue,
+                info.file_path,
+                info.language,
+                info.hljs_language,
+                self.highlighting == "server",
+                self.rules.get(rule_key),
+                "index.html",
+            ).encode("utf-8")
+        )
+
+    def _write_page(self, category, page, start, end):
+        pages = len(self.page_offsets[category])
+        first = (page - 1) * self.shard_size + 1
+        last = min(page * self.shard_size, self.counts[category])
+        path = os.path.join(self.output_dir, html_shard_filename(category, page))
+
+        with open(path, "w", encoding="utf-8") as output:
+            write = output.write
+            write(
+                html_report_head(
+                    self.project_name,
+                    highlight_assets=html_highlight_assets(
+                        self.page_languages[category][page - 1],
+                        self.inline_assets,
+                        self.assets_cache,
+                        self.highlighting,
+                        self.offline,
+                    ),
+                )
+            )
+            write(html_report_header(self.project_name, self.project_version))
+            write(
+                f"""
+        <div class="issues-section">
+            <div class="category-section">
+                <h2 class="category-header"><span data-i18n-key="category-header-{category}">{CATEGORY_NAMES[category]}</span> ({first}-{last} / {self.counts[category]})</h2>
+            """
+            )
+            pager = html_pager(category, page, pages)
+            write(pager)
+
+            spool = self.spools[category]
+            spool.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = spool.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                write(chunk.decode("utf-8"))
+                remaining -= len(chunk)
+
+            write(pager)
+            write(
+                """
+            </div>
+        </div>
+    </div>
+    """
+            )
+            write(html_report_footer(HTML_PAGES_SCRIPT))
+
+    def _write_index(self, catalog):
+        path = os.path.join(self.output_dir, "index.html")
+        with open(path, "w", encoding="utf-8") as output:
+            write = output.write
+            # The index has no code snippets
+            write(html_report_head(self.project_name, highlight_assets=""))
+            write(html_report_header(self.project_name, self.project_version))
+            write_html_summary(
+                write,
+                len(catalog),
+                catalog.type_counts,
+                catalog.severity_counts,
+                catalog.status_counts,
+            )
+
+            write(
+                """
+        <!-- Issue pages -->
+        <div class="issues-section">
+        """
+            )
+            for category in ISSUE_TYPES:
+                count = self.counts[category]
+                if not count:
+                    continue
+
+                write(html_category_header(category, count))
+                links = []
+                for page in range(1, len(self.page_offsets[category]) + 1):
+                    first = (page - 1) * self.shard_size + 1
+                    last = min(page * self.shard_size, count)
+                    links.append(
+                        f'<a href="{html_shard_filename(category, page)}">'
+                        f"{first}-{last}</a>"
+                    )
+                write(
+                    f"""
+                <div class="pager">
+                    {" ".join(links)}
+                </div>
+            </div>
+            """
+                )
+
+            write(
+                """
+        </div>"""
+            )
+            write(html_rules_section(self.rules, self.rule_counts))
+            write(
+                """
+    </div>
+    """
+            )
+            write(html_report_footer(HTML_PAGES_SCRIPT))
+        return path
+
+    def close(self, catalog):
+        """Write the index and all issue pages using statistics of the catalog"""
+        pages = 0
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            index_path = self._write_index(catalog)
+
+            for category, spool in self.spools.items():
+                offsets = self.page_offsets[category]
+                spool.seek(0, os.SEEK_END)
+                ends = offsets[1:] + [spool.tell()]
+                for page, (start, end) in enumerate(zip(offsets, ends), 1):
+                    self._write_page(category, page, start, end)
+                    pages += 1
+        finally:
+            for spool in self.spools.values():
+                spool.close()
+
+        return {
+            "total_issues": len(catalog),
+            "vulnerabilities": self.counts["VULNERABILITY"],
+            "bugs": self.counts["BUG"],
+            "code_smells": self.counts["CODE_SMELL"],
+            "severity_counts": catalog.severity_counts,
+            "status_counts": catalog.status_counts,
+            "html_file": index_path,
+            "pages": pages,
+        }
+
+
+def virtual_issue_row(number, issue, info, server_highlighting=False):
+    """Return the compact payload row of an issue in the virtual report"""
+    convert = convert_sonar_highlighting if server_highlighting else str
+    return [
+        issue.get("type", ""),
+        number,
+        issue.get("key", "N/A"),
+        issue.get("severity", ""),
+        issue.get("status", ""),
+        issue.get("rule", "N/A"),
+        issue.get("author", "N/A"),
+        info.file_path,
+        info.language,
+        info.hljs_language,
+        issue.get("message", ""),
+        issue.get("textRange", {}).get("startLine", ""),
+        [
+            [source.get("line", ""), convert(source.get("code", ""))]
+            for source in issue.get("sources", [])[:SNIPPET_MAX_LINES]
+        ],
+        [
+            [
+                comment.get("login", "Unknown"),
+                format_comment_date(comment.get("createdAt", "")),
+                comment.get("htmlText", ""),
+            ]
+            for comment in issue.get("comments", [])
+        ],
+    ]
+
+
+def html_virtual_filters():
+    """Return the filter bar and the containers of the virtual issue list"""
+    return """
+        <!-- Detailed Issues Section -->
+        <div class="issues-section">
+            <div class="filters">
+                <label><span data-i18n-key="severity">Severity</span>
+                    <select id="filter-severity"><option value="" data-i18n-key="filter-all">All</option></select>
+                </label>
+                <label><span data-i18n-key="status">Status</span>
+                    <select id="filter-status"><option value="" data-i18n-key="filter-all">All</option></select>
+                </label>
+                <label><span data-i18n-key="filter-rule">Rule</span>
+                    <input id="filter-rule" type="search">
+                </label>
+                <label><span data-i18n-key="filter-file">File</span>
+                    <input id="filter-file" type="search">
+                </label>
+                <label><span data-i18n-key="filter-shown">Shown</span>
+                    <span id="filter-shown-count"></span>
+                </label>
+            </div>
+            <div id="virtual-issues" class="category-section">
+                <div id="virtual-top"></div>
+                <div id="virtual-content"></div>
+                <div id="virtual-bottom"></div>
+            </div>
+        </div>"""
+
+
+class VirtualHtmlReportWriter:
+    """
+    Streaming single-file HTML report writer with virtual scrolling.
+
+    Issues are embedded once as a JSON payload (gzip and base64 encoded
+    when `compress` is set) and the inline script renders only the cards
+    near the viewport, so the DOM size does not depend on the issue count.
+    Payload rows are spooled per category until close(). Names of the
+    `rules` are embedded once per rule, next to the rules section
+    """
+
+    def __init__(
+        self,
+        output_filename,
+        project_name,
+        project_version,
+        compress=True,
+        inline_assets=False,
+        assets_cache=HLJS_ASSETS_CACHE,
+        highlighting="client",
+        rules=None,
+        offline=False,
+    ):
+        self.output_filename = output_filename
+        self.project_name = project_name
+        self.project_version = project_version
+        self.compress = compress
+        self.inline_assets = inline_assets
+        self.assets_cache = assets_cache
+        self.highlighting = highlighting
+        self.offline = offline
+        self.rules = rules or {}
+        self.languages = set()
+        self.spools = {
+            category: tempfile.TemporaryFile("w+", encoding="utf-8")
+            for category in ISSUE_TYPES
+        }
+        self.counts = {category: 0 for category in ISSUE_TYPES}
+        self.rule_counts = {}
+
+    def add_issue(self, issue, info):
+        """Add the issue row to its category spool"""
+        category = issue.get("type", "").upper()
+        if category not in self.spools:
+            return
+
+        self.counts[category] += 1
+        rule_key = issue.get("rule", "N/A")
+        self.rule_counts[rule_key] = self.rule_counts.get(rule_key, 0) + 1
+        if issue.get("sources"):
+            self.languages.add(info.hljs_language)
+        row = virtual_issue_row(
+            self.counts[category], issue, info, self.highlighting == "server"
+        )
+        self.spools[category].write(
+            json.dumps(
+                row,
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=compact_json_default,
+            )
+        )
+        self.spools[category].write("\n")
+
+    def _payload_parts(self):
+        """Yield the JSON array of all rows in category order"""
+        yield "["
+        separator = ""
+        for spool in self.spools.values():
+            spool.seek(0)
+            for line in spool:
+                yield separator
+                yield line.rstrip("\n")
+                separator = ","
+        yield "]"
+
+    def _write_payload(self, write):
+        if not self.compress:
+            write('<script type="application/json" id="issues-data">')
+            for part in self._payload_parts():
+                # "<" only occurs inside JSON strings, escaping it keeps the
+                # payload from closing the script element
+                write(part.replace("<", "\\u003c"))
+            write("</script>\n")
+            return
+
+        with tempfile.TemporaryFile("w+b") as compressed:
+            with gzip.GzipFile(fileobj=compressed, mode="wb", mtime=0) as gz:
+                for part in self._payload_parts():
+                    gz.write(part.encode("utf-8"))
+            compressed.seek(0)
+
+            write(
+                '<script type="application/octet-stream" id="issues-data" '
+                'data-encoding="gzip-base64">'
+            )
+            # Multiple of 3 bytes so the base64 chunks concatenate cleanly
+            for chunk in iter(lambda: compressed.read(3 * 256 * 1024), b""):
+                write(base64.b64encode(chunk).decode("ascii"))
+            write("</script>\n")
+
+    def close(self, catalog):
+        """Write the document using statistics of the catalog"""
+        owns_output = not hasattr(self.output_filename, "write")
+        if owns_output:
+            output = open(self.output_filename, "w", encoding="utf-8")
+        else:
+            output = self.output_filename
+            self.output_filename = getattr(output, "name", "<stream>")
+
+        try:
+            write = output.write
+
+            write(
+                html_report_head(
+                    self.project_name,
+                    highlight_assets=html_highlight_assets(
+                        self.languages,
+                        self.inline_assets,
+                        self.assets_cache,
+                        self.highlighting,
+                        self.offline,
+                    ),
+                )
+            )
+            write(html_report_header(self.project_name, self.project_version))
+            write_html_summary(
+                write,
+                len(catalog),
+                catalog.type_counts,
+                catalog.severity_counts,
+                catalog.status_counts,
+            )
+            write(html_virtual_filters())
+            write(html_rules_section(self.rules, self.rule_counts))
+            write(
+                """
+    </div>
+    """
+            )
+            self._write_payload(write)
+            rule_details = {}
+            for rule_key in self.rule_counts:
+                rule = self.rules.get(rule_key)
+                if rule is not None:
+                    rule_details[rule_key] = [rule["name"], rule["remediation"]]
+            # "<" is escaped as in the payload, rule names are plain text
+            rule_details = json.dumps(rule_details, ensure_ascii=False).replace(
+                "<", "\\u003c"
+            )
+            write(
+                f"""    <script>
+        const categoryNames = {json.dumps(CATEGORY_NAMES)};
+        const ruleDetails = {rule_details};
+{HTML_VIRTUAL_SCRIPT}    </script>"""
+            )
+            write(html_report_footer())
+        finally:
+            if owns_output:
+                output.close()
+            for spool in self.spools.values():
+                spool.close()
+
+        return {
+            "total_issues": len(catalog),
+            "vulnerabilities": self.counts["VULNERABILITY"],
+            "bugs": self.counts["BUG"],
+            "code_smells": self.counts["CODE_SMELL"],
+            "severity_counts": catalog.severity_counts,
+            "status_counts": catalog.status_counts,
+            "html_file": self.output_filename,
+        }
+
+
+HTML_MODES = ("single", "sharded", "virtual")
+HTML_HIGHLIGHTING = ("client", "server")
+
+
+def html_report_options(config):
+    """Return HTML report options of the config"""
+    mode = config.get("html_mode", "single")
+    if mode not in HTML_MODES:
+        raise ConfigError(
+            f"html_mode must be one of {', '.join(HTML_MODES)}, got '{mode}'"
+        )
+    highlighting = config.get("html_highlighting", "client")
+    if highlighting not in HTML_HIGHLIGHTING:
+        raise ConfigError(
+            f"html_highlighting must be one of {', '.join(HTML_HIGHLIGHTING)}, "
+            f"got '{highlighting}'"
+        )
+    return {
+        "mode": mode,
+        "highlighting": highlighting,
+        "shard_size": int(config.get("html_shard_size", 200)),
+        "compress": bool(config.get("html_compress", True)),
+        "inline_assets": bool(config.get("html_inline_assets", False)),
+        "assets_cache": config.get("html_assets_cache", HLJS_ASSETS_CACHE),
+    }
+
+
+def create_html_writer(project_name, project_version, options, rules=None):
+    """Return the HTML report writer for the report options and rules"""
+    assets = {
+        "inline_assets": options["inline_assets"],
+        "assets_cache": options["assets_cache"],
+        "highlighting": options["highlighting"],
+        "rules": rules,
+        "offline": options.get("offline", False),
+    }
+    if options["mode"] == "sharded":
+        return ShardedHtmlReportWriter(
+            HTML_REPORT_DIR,
+            project_name,
+            project_version,
+            options["shard_size"],
+            **assets,
+        )
+    if options["mode"] == "virtual":
+        return VirtualHtmlReportWriter(
+            HTML_REPORT_FILE,
+            project_name,
+            project_version,
+            options["compress"],
+            **assets,
+        )
+    return HtmlReportWriter(HTML_REPORT_FILE, project_name, project_version, **assets)
+
+
+def html_report_path(options):
+    """Return the main file of the HTML report"""
+    if options["mode"] == "sharded":
+        return os.path.join(HTML_REPORT_DIR, "index.html")
+    return HTML_REPORT_FILE
+
+
+def generate_html_report(project_name, project_version, catalog, options):
+    """
+    Generate the HTML report in the configured mode from an IssueCatalog,
+    returns report summary or None on failure
+    """
+    writer = create_html_writer(project_name, project_version, options, catalog.rules)
+    for issues in catalog.partitions.values():
+        for issue in issues:
+            writer.add_issue(issue, catalog.component_info(issue.get("component", "")))
+
+    return finish_html_report(writer, catalog)
+
+
+def generate_single_html_report(
+    project_name,
+    project_version,
+    catalog,
+    output_filename="sonarqube_issues_report.html",
+):
+    """
+    Generate a single HTML report with all issues and source code snippets
+    with syntax highlighting using Highlight.js.
+
+    The document is streamed to `output_filename` (a path or any writable
+    text stream) card by card, so memory use does not grow with the number
+    of issues. `catalog` is an IssueCatalog or a list of issues
+    """
+    if not isinstance(catalog, IssueCatalog):
+        catalog = IssueCatalog(catalog)
+
+    writer = HtmlReportWriter(
+        output_filename, project_name, project_version, rules=catalog.rules
+    )
+    for issues in catalog.partitions.values():
+        for issue in issues:
+            writer.add_issue(issue, catalog.component_info(issue.get("component", "")))
+
+    return finish_html_report(writer, catalog)
+
+
+def finish_html_report(writer, catalog):
+    """Close an HTML report writer, returns report summary or None on failure"""
+    try:
+        html_result = writer.close(catalog)
+
+        print_line(
+            f"Enhanced HTML report with Highlight.js generated: {html_result['html_file']}"
+        )
+
+        return html_result
+
+    except Exception as e:
+        print_line(f"Error generating enhanced HTML report: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return None
+
+
+# SonarQube server-side highlighting classes and the matching
+# highlight.js classes. Symbol references (sym-*) are dropped
+SONAR_TOKEN_CLASSES = {
+    "a": "hljs-meta",  # annotation
+    "c": "hljs-number",  # constant
+    "cd": "hljs-comment",  # comment
+    "cppd": "hljs-comment",  # C++ doc comment
+    "j": "hljs-comment",  # structured comment
+    "k": "hljs-keyword",  # keyword
+    "h": "hljs-built_in",  # light keyword
+    "s": "hljs-string",  # string
+    "p": "hljs-meta",  # preprocessor directive
+}
+
+
+# Sonar markup tokens: span with classes, span end and any other tag
+SONAR_MARKUP_PATTERN = re.compile(r'<span class="([^"]*)">|(</span>)|<[^>]*>')
+_token_tags = {}
+
+
+def _token_tag(classes):
+    """Return the highlight.js span start for SonarQube classes or ''"""
+    tag = _token_tags.get(classes)
+    if tag is None:
+        token = next(
+            (
+                SONAR_TOKEN_CLASSES[name]
+                for name in classes.split()
+                if name in SONAR_TOKEN_CLASSES
+            ),
+            None,
+        )
+        tag = _token_tags[classes] = f'<span class="{token}">' if token else ""
+    return tag
+
+
+def convert_sonar_highlighting(code):
+    """
+    Return source line code with SonarQube highlighting markup mapped to
+    highlight.js token classes. The text is already escaped by SonarQube;
+    unknown markup is dropped and unclosed spans are closed
+    """
+    if "<" not in code:
+        return code
+
+    # Whether each open span was kept in the output
+    open_spans = []
+
+    def replace(match):
+        classes = match.group(1)
+        if classes is not None:
+            tag = _token_tag(classes)
+            open_spans.append(bool(tag))
+            return tag
+        if match.group(2) and open_spans and open_spans.pop():
+            return "</span>"
+        return ""
+
+    converted = SONAR_MARKUP_PATTERN.sub(replace, code)
+    return converted + "</span>" * sum(open_spans)
+
+
+def extract_sources_from_response(snippet_data):
+    """
+    Extract sources from the nested structure where the top key is dynamic.
+    Code keeps SonarQube highlighting markup; reports convert it with
+    convert_sonar_highlighting when server-side highlighting is used
+    """
+    try:
+        if not snippet_data or not isinstance(snippet_data, dict):
+            return []
+
+        # Get the first top-level key
+        first_key = list(snippet_data.keys())[0]
+        component_data = snippet_data[first_key]
+
+        # Extract sources if available
+        if (
+            isinstance(component_data, dict)
+            and "sources" in component_data
+            and isinstance(component_data["sources"], list)
+        ):
+
+            sources = []
+            for source in component_data["sources"]:
+                sources.append(source)
+
+            return sources
+
+        return []
+
+    except (IndexError, KeyError, TypeError) as e:
+        print_line(f"Warning: Could not extract sources from response: {e}")
+        return []
+
+
+# Responses that mean the server is overloaded or temporarily unavailable
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Longest Retry-After delay that is honored, in seconds
+MAX_RETRY_AFTER = 300
+
+
+def retry_after_delay(response):
+    """Return Retry-After delay of the response in seconds or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            # HTTP-dates ending in "-0000" parse as naive UTC datetimes
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    return min(max(0.0, delay), MAX_RETRY_AFTER)
+
+
+class SonarQubeSession:
+    """
+    Pooled keep-alive HTTP session shared by every SonarQube API call.
+    Headers, the JWT-SESSION cookie and the request timeout are set once,
+    and connections are reused across requests and worker threads.
+
+    Timeouts, connection errors and 429/5xx responses are retried up to
+    `max_retries` times with exponential backoff and full jitter, honoring
+    Retry-After. Every retried request is reported to the pushback
+    listeners so adaptive limiters can slow down, and every attempt is
+    reported to the request listeners with the API path, its latency and
+    the response (None if it raised)
+    """
+
+    def __init__(
+        self,
+        base_url,
+        jwt_session,
+        pool_size=10,
+        timeout=60,
+        max_retries=4,
+        backoff=0.5,
+        max_backoff=30,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pushback_listeners = []
+        self.request_listeners = []
+        self.retries = {}
+        self.failures = {}
+        self.stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/json"})
+        self.session.cookies.set("JWT-SESSION", jwt_session)
+        self.session.verify = False  # Disable SSL verification
+
+        # Block instead of opening throwaway connections when all pooled
+        # connections are busy
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def get(self, path, params=None):
+        """
+        Send GET request to the SonarQube API path relative to the base URL.
+        Returns the last response or raises the last error once retries
+        are exhausted
+        """
+        url = self.base_url + path
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+            ) as e:
+                self._report_request(path, started, None)
+                reason = type(e).__name__
+                if attempt >= self.max_retries:
+                    self._count(self.failures, reason)
+                    raise
+                delay = self.backoff_delay(attempt)
+            else:
+                self._report_request(path, started, response)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+
+                reason = str(response.status_code)
+                if attempt >= self.max_retries:
+                    self._count(self.failures, reason)
+                    return response
+                delay = retry_after_delay(response)
+                if delay is None:
+                    delay = self.backoff_delay(attempt)
+                response.close()
+
+            self._count(self.retries, reason)
+            for listener in self.pushback_listeners:
+                listener()
+            time.sleep(delay)
+            attempt += 1
+
+    def _report_request(self, path, started, response):
+        if self.request_listeners:
+            seconds = time.perf_counter() - started
+            for listener in self.request_listeners:
+                listener(path, seconds, response)
+
+    def backoff_delay(self, attempt):
+        """Return exponential backoff delay with full jitter"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def _count(self, counter, reason):
+        with self.stats_lock:
+            counter[reason] = counter.get(reason, 0) + 1
+
+    def reset_retry_stats(self):
+        with self.stats_lock:
+            self.retries = {}
+            self.failures = {}
+
+    def retry_stats(self):
+        """Return retries and requests that failed after all retries, by reason"""
+        with self.stats_lock:
+            return {
+                "retries": sum(self.retries.values()),
+                "retries_by_reason": dict(self.retries),
+                "failed_requests": sum(self.failures.values()),
+                "failures_by_reason": dict(self.failures),
+            }
+
+    def connection_stats(self):
+        """Return number of requests, new connections and reused connections"""
+        requests_sent = 0
+        new_connections = 0
+        pools = self.adapter.poolmanager.pools
+        for pool_key in list(pools.keys()):
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            requests_sent += pool.num_requests
+            new_connections += pool.num_connections
+
+        return {
+            "requests": requests_sent,
+            "new_connections": new_connections,
+            "reused_connections": requests_sent - new_connections,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class AdaptiveConcurrency:
+    """
+    Thread-safe AIMD limit on concurrent requests. The limit grows by about
+    one request per `limit` successful requests up to `maximum` and is
+    halved (at most once per `cooldown` seconds) when the server pushes
+    back with throttling, errors or timeouts
+    """
+
+    def __init__(self, maximum, initial=None, minimum=1, cooldown=1.0):
+        self.maximum = max(1, maximum)
+        self.minimum = min(minimum, self.maximum)
+        self.limit = float(initial or self.maximum)
+        self.cooldown = cooldown
+        self.active = 0
+        self.decreases = 0
+        self.lowest = self.limit
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a request slot is free and take it"""
+        with self.condition:
+            while self.active >= int(self.limit):
+                self.condition.wait()
+            self.active += 1
+
+    def release(self, success=True):
+        """Free a request slot; successful requests raise the limit"""
+        with self.condition:
+            self.active -= 1
+            if success:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def on_pushback(self):
+        """Halve the limit when the server pushes back"""
+        with self.condition:
+            now = time.monotonic()
+            if now - self.last_decrease < self.cooldown:
+                return
+            self.last_decrease = now
+            self.limit = max(self.minimum, self.limit / 2)
+            self.lowest = min(self.lowest, self.limit)
+            self.decreases += 1
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting how many requests per second
+    are sent to SonarQube. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate or 0)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and consume it"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+# SonarQube API refuses to return more than 10000 results for one query
+SEARCH_RESULT_LIMIT = 10000
+SONAR_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+
+FIELD_PROFILES = ("full", "reports")
+
+# Issue fields read by the reports, the snippet cache and the issue store sync
+REPORT_ISSUE_FIELDS = (
+    "key",
+    "rule",
+    "severity",
+    "component",
+    "textRange",
+    "hash",
+    "status",
+    "resolution",
+    "message",
+    "author",
+    "comments",
+    "updateDate",
+    "type",
+    "externalRuleEngine",
+)
+REPORT_COMMENT_FIELDS = ("login", "htmlText", "createdAt")
+REPORT_SOURCE_FIELDS = ("line", "code")
+# additionalFields values that add fields to every issue
+ISSUE_ADDITIONAL_FIELDS = ("comments", "transitions", "actions")
+
+
+class FieldProfile:
+    """
+    Issue fields requested from /api/issues/search and kept once an issue
+    or its snippet is parsed. The full profile keeps the API data as it is
+    (additionalFields=_all). The reports profile requests only the
+    additional fields it keeps and strips everything the reports, the
+    snippet cache and the issue store do not read (except `extra_fields`),
+    so less is downloaded, held in memory and dumped
+    """
+
+    def __init__(self, name="full", extra_fields=()):
+        if name not in FIELD_PROFILES:
+            raise ConfigError(
+                f"field_profile must be one of {', '.join(FIELD_PROFILES)}, "
+                f"got '{name}'"
+            )
+        self.name = name
+        self.issue_fields = None
+        if name == "reports":
+            self.issue_fields = frozenset(REPORT_ISSUE_FIELDS).union(extra_fields)
+
+    @property
+    def additional_fields(self):
+        if self.issue_fields is None:
+            return "_all"
+        return ",".join(
+            field for field in ISSUE_ADDITIONAL_FIELDS if field in self.issue_fields
+        )
+
+    def trim_issue(self, issue):
+        """Return the issue with the profile fields only"""
+        if self.issue_fields is None:
+            return issue
+        trimmed = {
+            key: value for key, value in issue.items() if key in self.issue_fields
+        }
+        if trimmed.get("comments"):
+            trimmed["comments"] = [
+                {key: comment[key] for key in REPORT_COMMENT_FIELDS if key in comment}
+                for comment in trimmed["comments"]
+            ]
+        return trimmed
+
+    def trim_sources(self, sources):
+        """Return source lines with the fields shown in the reports only"""
+        if self.issue_fields is None or not sources:
+            return sources
+        return [
+            {key: line[key] for key in REPORT_SOURCE_FIELDS if key in line}
+            for line in sources
+        ]
+
+
+def field_profile(config):
+    """Return FieldProfile of the config"""
+    extra_fields = config.get("issue_fields", [])
+    if not isinstance(extra_fields, list):
+        raise ConfigError("issue_fields must be a list of issue field names")
+    return FieldProfile(config.get("field_profile", "full"), extra_fields)
+
+
+def build_search_params(project_id, branch, additional_fields="_all"):
+    """Build /api/issues/search query parameters for Security and Reliability issues"""
+    return {
+        "components": project_id,
+        "branch": branch,
+        "scopes": "MAIN",
+        "impactSeverities": "BLOCKER,HIGH,MEDIUM,INFO,LOW",
+        "impactSoftwareQualities": "RELIABILITY,SECURITY",
+        "issueStatuses": "CONFIRMED,FALSE_POSITIVE,FIXED,OPEN",
+        "additionalFields": additional_fields,
+    }
+
+
+def fetch_analysis_date(session, project, branch=None):
+    """Return date of the last analysis of the project branch or None"""
+    params = {"component": project}
+    if branch:
+        params["branch"] = branch
+    try:
+        response = session.get("/api/components/show", params=params)
+    except requests.exceptions.RequestException as e:
+        print(f"Warning: Could not fetch the last analysis of {project}: {e}")
+        return None
+    if response.status_code != 200:
+        print(
+            f"Warning: Could not fetch the last analysis of {project}, "
+            f"status: {response.status_code}"
+        )
+        return None
+    return response.json().get("component", {}).get("analysisDate")
+
+
+def search_issues(session, params):
+    """Send a single /api/issues/search request and return parsed JSON"""
+    response = session.get("/api/issues/search", params=params)
+    # Check if request was successful
+    response.raise_for_status()
+    return response.json()
+
+
+def count_issues(session, params):
+    """Return number of issues matching the query without downloading them"""
+    return search_issues(session, {**params, "ps": 1, "p": 1}).get("total", 0)
+
+
+def fetch_issue_pages(
+    session,
+    params,
+    issues_per_page=500,
+    label="",
+    compact=False,
+    on_page=None,
+    fields=None,
+    limit=SEARCH_RESULT_LIMIT,
+):
+    """
+    Download all pages of a query, at most the first `limit` issues when
+    the query matches more. Issues are trimmed to the optional FieldProfile
+    as soon as a page is parsed. With `compact` issues are converted to
+    CompactRecord page by page. If `on_page` is given, it is called with
+    the issues of each page as soon as the page arrives instead of
+    collecting them
+    """
+    issues = []
+    total_issues = 0
+    page = 1
+
+    while True:
+        response_data = search_issues(
+            session, {**params, "ps": issues_per_page, "p": page}
+        )
+
+        # Extract issues from the current page
+        issues_on_page = response_data.get("issues", [])
+        print_line(f"Processing {len(issues_on_page)} issues from page: {page}{label}")
+
+        page_issues = issues_on_page
+        if fields:
+            page_issues = [fields.trim_issue(issue) for issue in page_issues]
+        if compact:
+            page_issues = compact_issues(page_issues)
+        if on_page:
+            on_page(page_issues)
+        else:
+            issues.extend(page_issues)
+
+        # Update total issues from the first response
+        if page == 1:
+            total_issues = response_data.get("total", 0)
+
+        if not issues_on_page or page * issues_per_page >= total_issues:
+            break  # Exit loop if no more issues are returned
+
+        if (page + 1) * issues_per_page > limit:
+            # The API rejects pages past the result limit
+            print_line(
+                f"Warning: downloaded {page * issues_per_page} of {total_issues} "
+                f"issues{label}, the API returns only the first {limit}"
+            )
+            break
+
+        page += 1
+
+    return issues
+
+
+def _creation_date_bound(session, params, ascending):
+    """Return creation date of the oldest or the newest issue matching the query"""
+    response_data = search_issues(
+        session,
+        {
+            **params,
+            "s": "CREATION_DATE",
+            "asc": "true" if ascending else "false",
+            "ps": 1,
+            "p": 1,
+        },
+    )
+    issues = response_data.get("issues", [])
+    if not issues:
+        return None
+    return datetime.strptime(issues[0]["creationDate"], SONAR_DATE_FORMAT)
+
+
+# Facets that narrow a query whose rules facet does not list every rule
+NARROWING_FACETS = ("severities", "types")
+
+
+def _facet_values(session, params, facet_name):
+    """Return values and issue counts of a facet of the query"""
+    response_data = search_issues(
+        session, {**params, "facets": facet_name, "ps": 1, "p": 1}
+    )
+    for facet in response_data.get("facets", []):
+        if facet.get("property") == facet_name:
+            return facet.get("values", [])
+    return []
+
+
+def _split_by_rules(session, params, total, limit):
+    """
+    Split a query by the rules facet into groups of rules
+    whose issue counts add up to less than the limit.
+
+    The server may list only the most frequent rules in the facet. When the
+    listed counts do not add up to `total`, the query is narrowed by
+    severity, then by type, and every narrower query is split on its own
+    """
+    facet_values = _facet_values(session, params, "rules")
+
+    listed = sum(value.get("count", 0) for value in facet_values)
+    if facet_values and listed < total:
+        narrowing_facet = next(
+            (facet for facet in NARROWING_FACETS if facet not in params), None
+        )
+        narrowing_values = []
+        if narrowing_facet:
+            narrowing_values = _facet_values(session, params, narrowing_facet)
+        if narrowing_values:
+            partitions = []
+            for value in narrowing_values:
+                count = value.get("count", 0)
+                if not count:
+                    continue
+                narrow_params = {**params, narrowing_facet: value["val"]}
+                if count <= limit:
+                    partitions.append((narrow_params, count))
+                else:
+                    partitions.extend(
+                        _split_by_rules(session, narrow_params, count, limit)
+                    )
+            return partitions
+        print_line(
+            f"Warning: the rules facet lists only {listed} of {total} issues, "
+            "issues of the rules it leaves out are not downloaded"
+        )
+
+    partitions = []
+    group, group_count = [], 0
+    for value in sorted(facet_values, key=lambda v: v.get("count", 0)):
+        count = value.get("count", 0)
+        if count > limit:
+            print_line(
+                f"Warning: rule {value['val']} alone has {count} issues in one second, "
+                f"only the first {limit} of them can be downloaded"
+            )
+            partitions.append(({**params, "rules": value["val"]}, limit))
+            continue
+        if group and group_count + count > limit:
+            partitions.append(({**params, "rules": ",".join(group)}, group_count))
+            group, group_count = [], 0
+        group.append(value["val"])
+        group_count += count
+
+    if group:
+        partitions.append(({**params, "rules": ",".join(group)}, group_count))
+
+    if not partitions:
+        # Facet is not available, download as much as the API allows
+        partitions.append((params, min(total, limit)))
+
+    return partitions
+
+
+def plan_issue_partitions(session, params, limit=SEARCH_RESULT_LIMIT):
+    """
+    Split an issue query into slices that each return at most `limit` issues.
+
+    The query is bisected on creation date (createdAfter is inclusive,
+    createdBefore is exclusive), and slices that cannot be split further
+    by date are split by the rules facet
+    """
+    total = count_issues(session, params)
+    if total <= limit:
+        return [(params, total)]
+
+    print_line(
+        f"Query matches {total} issues, splitting it into slices of at most {limit}"
+    )
+
+    oldest = _creation_date_bound(session, params, ascending=True)
+    newest = _creation_date_bound(session, params, ascending=False)
+    if oldest is None or newest is None:
+        return _split_by_rules(session, params, total, limit)
+
+    partitions = []
+    # Half-open intervals [start, end) of creation dates to check
+    pending = [(oldest, newest + timedelta(seconds=1))]
+    while pending:
+        start, end = pending.pop()
+        slice_params = {
+            **params,
+            "createdAfter": start.strftime(SONAR_DATE_FORMAT),
+            "createdBefore": end.strftime(SONAR_DATE_FORMAT),
+        }
+        slice_total = count_issues(session, slice_params)
+        if slice_total == 0:
+            continue
+        if slice_total <= limit:
+            partitions.append((slice_params, slice_total))
+        elif end - start <= timedelta(seconds=1):
+            partitions.extend(
+                _split_by_rules(session, slice_params, slice_total, limit)
+            )
+        else:
+            middle = start + timedelta(seconds=(end - start).total_seconds() // 2)
+            # Newer half is pushed first, so slices come out oldest first
+            pending.append((middle, end))
+            pending.append((start, middle))
+
+    print_line(f"Issue query split into {len(partitions)} slices")
+    return partitions
+
+
+def fetch_all_issues(
+    session, params, workers=4, limit=SEARCH_RESULT_LIMIT, compact=False, fields=None
+):
+    """
+    Download all issues matching the query. Queries above the API result
+    limit are partitioned, slices are fetched in parallel and merged
+    without duplicates
+    """
+    partitions = plan_issue_partitions(session, params, limit)
+    if len(partitions) == 1:
+        return fetch_issue_pages(
+            session, partitions[0][0], compact=compact, fields=fields
+        )
+
+    slice_results = [None] * len(partitions)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(
+                fetch_issue_pages,
+                session,
+                slice_params,
+                label=f" of slice {index + 1}/{len(partitions)}",
+                compact=compact,
+                fields=fields,
+            ): index
+            for index, (slice_params, _) in enumerate(partitions)
+        }
+        for future in as_completed(futures):
+            slice_results[futures[future]] = future.result()
+
+    all_issues = []
+    seen_keys = set()
+    for issues in slice_results:
+        for issue in issues:
+            issue_key = issue.get("key")
+            if issue_key in seen_keys:
+                continue
+            seen_keys.add(issue_key)
+            all_issues.append(issue)
+
+    print(f"Downloaded {len(all_issues)} unique issues from {len(partitions)} slices")
+    return all_issues
+
+
+def fetch_snippet_sources(issue_key, session):
+    """Fetch and extract source code lines for a single issue"""
+    response = session.get(
+        "/api/sources/issue_snippets", params={"issueKey": issue_key}
+    )
+
+    # Check if request was successful
+    if response.status_code != 200:
+        print_line(
+            f"Warning: Failed to fetch snippets for issue {issue_key}, status: {response.status_code}"
+        )
+        return None
+
+    # Extract sources using the new function
+    return extract_sources_from_response(response.json())
+
+
+def limited_snippet_request(concurrency, rate_limiter, metrics, function, *args):
+    """
+    Call the snippet request `function` in a slot of the AdaptiveConcurrency
+    and under the TokenBucket rate, timed as the snippets stage. Requests
+    that fail or return None do not raise the concurrency limit
+    """
+    concurrency.acquire()
+    result = None
+    try:
+        rate_limiter.acquire()
+        with metrics.stage("snippets"):
+            result = function(*args)
+    finally:
+        concurrency.release(success=result is not None)
+    return result
+
+
+def apply_snippet_result(
+    issue, future, cache=None, cache_key=None, failed_snippet_keys=None
+):
+    """
+    Set issue sources from a finished snippet request.
+    Keys of issues whose request failed are added to `failed_snippet_keys`.
+    Returns True if snippets were fetched
+    """
+    issue_key = issue.get("key", "")
+    try:
+        sources = future.result()
+        if sources is not None:
+            # Add sources to the issue
+            issue["sources"] = sources
+            if cache_key:
+                cache.put(cache_key, sources)
+            return True
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching snippets for issue {issue_key}: {e}")
+    except Exception as e:
+        print(f"Unexpected error for issue {issue_key}: {e}")
+
+    issue["sources"] = []
+    if failed_snippet_keys is not None:
+        failed_snippet_keys.append(issue_key)
+    return False
+
+
+SnippetRange = namedtuple(
+    "SnippetRange", ["component", "first_line", "last_line", "members"]
+)
+# Issue waiting for a snippet range, with the lines it shows
+SnippetRangeMember = namedtuple(
+    "SnippetRangeMember", ["issue", "cache_key", "tag", "first_line", "last_line"]
+)
+
+
+SNIPPET_STRATEGIES = ("issue", "lines")
+
+
+class SnippetRangePlanner:
+    """
+    Plans snippet requests per file instead of per issue: context windows
+    of issues in the same component are merged into line ranges that are
+    fetched once via /api/sources/lines and sliced for every issue.
+
+    A window spans `context` lines around the issue text range and at most
+    SNIPPET_MAX_LINES lines. Windows closer than `merge_gap` lines are
+    merged as long as the range stays within `max_range_lines`
+    """
+
+    def __init__(self, context=3, merge_gap=10, max_range_lines=500, branch=None):
+        self.context = context
+        self.merge_gap = merge_gap
+        self.max_range_lines = max_range_lines
+        self.branch = branch
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def window(self, issue):
+        """Return (first, last) lines shown for the issue or None"""
+        text_range = issue.get("textRange") or {}
+        start_line = text_range.get("startLine")
+        if not start_line:
+            return None
+
+        end_line = text_range.get("endLine") or start_line
+        first_line = max(1, start_line - self.context)
+        last_line = min(end_line + self.context, first_line + SNIPPET_MAX_LINES - 1)
+        return first_line, max(first_line, last_line)
+
+    def plan(self, entries):
+        """
+        Group (issue, cache_key, tag) entries into SnippetRanges. Issues
+        without a line range are returned as members of no range
+        """
+        windows = {}
+        unplanned = []
+        for issue, cache_key, tag in entries:
+            window = self.window(issue)
+            if window is None:
+                unplanned.append(SnippetRangeMember(issue, cache_key, tag, 0, 0))
+                continue
+            windows.setdefault(issue.get("component", ""), []).append(
+                SnippetRangeMember(issue, cache_key, tag, *window)
+            )
+
+        ranges = []
+        for component, members in windows.items():
+            members.sort(key=lambda member: member.first_line)
+            current = [members[0]]
+            first_line = members[0].first_line
+            last_line = members[0].last_line
+            for member in members[1:]:
+                merged_last = max(last_line, member.last_line)
+                if (
+                    member.first_line <= last_line + self.merge_gap + 1
+                    and merged_last - first_line < self.max_range_lines
+                ):
+                    current.append(member)
+                    last_line = merged_last
+                    continue
+                ranges.append(SnippetRange(component, first_line, last_line, current))
+                current = [member]
+                first_line = member.first_line
+                last_line = member.last_line
+            ranges.append(SnippetRange(component, first_line, last_line, current))
+
+        return ranges, unplanned
+
+    def fetch(self, session, snippet_range):
+        """Fetch source lines of the range, returns them or None on failure"""
+        params = {
+            "key": snippet_range.component,
+            "from": snippet_range.first_line,
+            "to": snippet_range.last_line,
+        }
+        if self.branch:
+            params["branch"] = self.branch
+
+        with self.lock:
+            self.requests += 1
+        response = session.get("/api/sources/lines", params=params)
+        if response.status_code != 200:
+            print_line(
+                f"Warning: Failed to fetch lines {snippet_range.first_line}-"
+                f"{snippet_range.last_line} of {snippet_range.component}, "
+                f"status: {response.status_code}"
+            )
+            return None
+        return response.json().get("sources", [])
+
+    @staticmethod
+    def apply(snippet_range, future, cache=None, failed_snippet_keys=None):
+        """
+        Set sources of all range members from a finished range request.
+        Keys of members whose request failed are added to `failed_snippet_keys`.
+        Returns list of (member, fetched) pairs
+        """
+        try:
+            lines = future.result()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching lines of {snippet_range.component}: {e}")
+            lines = None
+        except Exception as e:
+            print(f"Unexpected error for lines of {snippet_range.component}: {e}")
+            lines = None
+
+        results = []
+        for member in snippet_range.members:
+            if lines is None:
+                member.issue["sources"] = []
+                if failed_snippet_keys is not None:
+                    failed_snippet_keys.append(member.issue.get("key", ""))
+                results.append((member, False))
+                continue
+
+            sources = [
+                line
+                for line in lines
+                if member.first_line <= line.get("line", 0) <= member.last_line
+            ]
+            member.issue["sources"] = sources
+            if member.cache_key and cache:
+                cache.put(member.cache_key, sources)
+            results.append((member, True))
+        return results
+
+
+def snippet_cache_variant(snippet_strategy, range_planner=None, fields=None):
+    """
+    Return the SnippetCache variant of the snippet settings: the strategy,
+    the context lines of the lines strategy and the field profile
+    """
+    parts = [snippet_strategy]
+    if range_planner:
+        parts.append(f"context={range_planner.context}")
+    parts.append(fields.name if fields else "full")
+    return ":".join(parts)
+
+
+def open_shared_database(path, timeout=60):
+    """
+    Open SQLite database that may be shared by several batch worker processes
+    """
+    connection = sqlite3.connect(path, timeout=timeout)
+    # WAL lets readers proceed while another process writes
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class SnippetCache:
+    """
+    Persistent SQLite cache of issue snippets shared across runs and branches.
+
+    Entries are keyed by component, text range, the line hash SonarQube
+    computed for the issue and the date of the `analysis` that produced it.
+    The line hash covers only the flagged line, so a new analysis (which
+    may have seen edits of the context lines) starts new entries. The key
+    also includes `variant`, which names how snippets are fetched and
+    trimmed (see snippet_cache_variant), so runs with other settings do not
+    share entries. Entries older than `max_age_days` are dropped, and the
+    least recently used ones are evicted when the cache grows beyond
+    `max_size_mb`: at open, whenever a tenth of that size was written
+    since the last check, and at close
+    """
+
+    def __init__(self, path, max_size_mb=200, max_age_days=30, variant="", analysis=""):
+        self.variant = variant
+        self.analysis = analysis
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bytes written since the size was last checked
+        self.written = 0
+
+        self.connection = open_shared_database(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snippets (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS snippets_accessed ON snippets (accessed)"
+        )
+        self._evict_expired()
+        # An earlier run that did not close the cache may have left it too large
+        self._evict_least_recently_used()
+
+    def issue_cache_key(self, issue):
+        """Return cache key of the issue snippet or None if it cannot be cached"""
+        text_range = issue.get("textRange")
+        line_hash = issue.get("hash")
+        if not text_range or not line_hash:
+            return None
+
+        return "|".join(
+            [
+                self.variant,
+                self.analysis,
+                issue.get("component", ""),
+                "{}:{}-{}:{}".format(
+                    text_range.get("startLine", ""),
+                    text_range.get("startOffset", ""),
+                    text_range.get("endLine", ""),
+                    text_range.get("endOffset", ""),
+                ),
+                line_hash,
+            ]
+        )
+
+    def get(self, key):
+        """Return cached sources or None"""
+        row = self.connection.execute(
+            "SELECT data FROM snippets WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.connection.execute(
+            "UPDATE snippets SET accessed = ? WHERE key = ?", (time.time(), key)
+        )
+        return json.loads(row[0])
+
+    def put(self, key, sources):
+        data = json.dumps(sources, ensure_ascii=False)
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO snippets (key, data, size, created, accessed) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, data, len(data), now, now),
+        )
+        # Short write transactions keep the cache usable from batch workers
+        self.connection.commit()
+        self.written += len(data)
+        if self.written > self.max_size // 10:
+            self._evict_least_recently_used()
+
+    def _evict_expired(self):
+        if self.max_age <= 0:
+            return
+        cursor = self.connection.execute(
+            "DELETE FROM snippets WHERE created < ?", (time.time() - self.max_age,)
+        )
+        self.evictions += cursor.rowcount
+        self.connection.commit()
+
+    def _evict_least_recently_used(self):
+        self.written = 0
+        total_size = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM snippets"
+        ).fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        evicted_keys = []
+        for key, size in self.connection.execute(
+            "SELECT key, size FROM snippets ORDER BY accessed"
+        ):
+            if total_size <= self.max_size:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+
+        self.connection.executemany("DELETE FROM snippets WHERE key = ?", evicted_keys)
+        self.evictions += len(evicted_keys)
+        self.connection.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self._evict_least_recently_used()
+        self.connection.commit()
+        self.connection.close()
+
+
+class SnippetFetcher:
+    """
+    Sets the sources of issues. Snippets found in the optional SnippetCache
+    are not requested, the others are fetched one request per issue or,
+    with a SnippetRangePlanner, as merged line ranges planned on flush().
+
+    Requests run on `executor` within the AdaptiveConcurrency and the
+    `requests_per_second` rate, are timed as the snippets stage of the
+    optional PipelineMetrics and trimmed to the optional FieldProfile. A
+    finished request is put into `events` as ("snippets", request, future)
+    and must be passed to complete() by the consuming thread. Every issue
+    is passed to `issue_done(tag, issue)` once its sources are set, and keys
+    of issues whose request failed are added to `failed_snippet_keys`
+    """
+
+    def __init__(
+        self,
+        session,
+        executor,
+        events,
+        issue_done,
+        requests_per_second,
+        concurrency,
+        cache=None,
+        range_planner=None,
+        metrics=None,
+        fields=None,
+        failed_snippet_keys=None,
+    ):
+        self.session = session
+        self.executor = executor
+        self.events = events
+        self.issue_done = issue_done
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.concurrency = concurrency
+        self.cache = cache
+        self.range_planner = range_planner
+        self.metrics = metrics or PipelineMetrics()
+        self.fields = fields
+        self.failed_snippet_keys = failed_snippet_keys
+        # Issues waiting for the next flush to be planned into line ranges
+        self.range_entries = []
+        self.pending = 0
+        self.fetched = 0
+
+    def add(self, issue, tag=None):
+        """Set sources of a cached issue or queue its snippet request"""
+        issue_key = issue.get("key", "")
+        if not issue.get("textRange") or not issue_key:
+            # No textRange, no sources
+            issue["sources"] = []
+            self.issue_done(tag, issue)
+            return
+
+        cache_key = self.cache.issue_cache_key(issue) if self.cache else None
+        cached_sources = self.cache.get(cache_key) if cache_key else None
+        if cached_sources is not None:
+            issue["sources"] = cached_sources
+            self.fetched += 1
+            self.issue_done(tag, issue)
+            return
+
+        if self.range_planner:
+            self.range_entries.append((issue, cache_key, tag))
+            return
+        self._submit(
+            (issue, cache_key, tag), fetch_snippet_sources, issue_key, self.session
+        )
+
+    def flush(self):
+        """Request the merged line ranges of the issues added since the last flush"""
+        if not self.range_entries:
+            return
+        snippet_ranges, unplanned = self.range_planner.plan(self.range_entries)
+        self.range_entries = []
+        for member in unplanned:
+            member.issue["sources"] = []
+            self.issue_done(member.tag, member.issue)
+        for snippet_range in snippet_ranges:
+            self._submit(
+                snippet_range, self.range_planner.fetch, self.session, snippet_range
+            )
+
+    def _submit(self, request, function, *args):
+        self.pending += 1
+        future = self.executor.submit(self._fetch, function, *args)
+        future.add_done_callback(lambda f: self.events.put(("snippets", request, f)))
+
+    def _fetch(self, function, *args):
+        sources = limited_snippet_request(
+            self.concurrency, self.rate_limiter, self.metrics, function, *args
+        )
+        return self.fields.trim_sources(sources) if self.fields else sources
+
+    def complete(self, request, future):
+        """Set sources from a finished request"""
+        self.pending -= 1
+        if isinstance(request, SnippetRange):
+            for member, fetched in SnippetRangePlanner.apply(
+                request, future, self.cache, self.failed_snippet_keys
+            ):
+                if fetched:
+                    self.fetched += 1
+                self.issue_done(member.tag, member.issue)
+            return
+
+        issue, cache_key, tag = request
+        if apply_snippet_result(
+            issue, future, self.cache, cache_key, self.failed_snippet_keys
+        ):
+            self.fetched += 1
+        self.issue_done(tag, issue)
+
+
+def fetch_issue_snippets(
+    all_issues,
+    session,
+    workers=8,
+    requests_per_second=10,
+    cache=None,
+    on_issue_ready=None,
+    range_planner=None,
+    concurrency=None,
+    metrics=None,
+    fields=None,
+    failed_snippet_keys=None,
+):
+    """
+    Fetch source code snippets for issues that have textRange
+    and add them to the corresponding issue objects.
+
+    Requests are sent by a pool of `workers` threads, and the overall
+    request rate is limited by a token bucket to `requests_per_second`.
+    Snippets found in the optional SnippetCache are not requested.
+    With a SnippetRangePlanner the snippets are fetched as merged line
+    ranges per file instead of one request per issue. An AdaptiveConcurrency
+    limits how many of the workers send requests at the same time.
+    `on_issue_ready` is called with each issue as soon as its sources
+    are set, in completion order. Requests are timed as the snippets stage
+    of the optional PipelineMetrics, and source lines are trimmed to the
+    optional FieldProfile. Keys of issues whose snippet request failed are
+    added to the optional `failed_snippet_keys` list
+    """
+    print(
+        f"Fetching source code snippets for issues ({workers} workers, "
+        f"{requests_per_second or 'unlimited'} requests/s)..."
+    )
+
+    processed = 0
+    total_issues = len(all_issues)
+    events = queue.Queue()
+
+    def issue_done(tag, issue):
+        nonlocal processed
+        processed += 1
+        if on_issue_ready:
+            on_issue_ready(issue)
+        if processed % 50 == 0 or processed == total_issues:
+            print(
+                f"Processed {processed}/{total_issues} issues, fetched snippets for {snippets.fetched} issues"
+            )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        snippets = SnippetFetcher(
+            session,
+            executor,
+            events,
+            issue_done,
+            requests_per_second=requests_per_second,
+            concurrency=concurrency or AdaptiveConcurrency(workers),
+            cache=cache,
+            range_planner=range_planner,
+            metrics=metrics,
+            fields=fields,
+            failed_snippet_keys=failed_snippet_keys,
+        )
+        for issue in all_issues:
+            snippets.add(issue)
+        snippets.flush()
+        while snippets.pending:
+            _, request, future = events.get()
+            snippets.complete(request, future)
+
+    print(
+        f"Successfully fetched snippets for {snippets.fetched} out of {total_issues} issues"
+    )
+    return all_issues
+
+
+# Rule keys per /api/rules/search request, the API returns at most 500 rules
+RULES_BATCH_SIZE = 100
+RULE_CACHE_FILE = ".sonar_rules.sqlite"
+RULE_FIELDS = (
+    "name",
+    "htmlDesc",
+    "descriptionSections",
+    "severity",
+    "lang",
+    "langName",
+    "remFnType",
+    "remFnBaseEffort",
+    "defaultRemFnBaseEffort",
+    "sysTags",
+)
+
+
+def normalize_rule(rule):
+    """Return the fields of an /api/rules/search rule shown in the reports"""
+    description = rule.get("htmlDesc")
+    if not description:
+        # SonarQube 9.6+ splits the description into sections
+        description = "\n".join(
+            section.get("content", "")
+            for section in rule.get("descriptionSections", [])
+        )
+    return {
+        "key": rule.get("key", ""),
+        "name": rule.get("name", ""),
+        "type": rule.get("type", ""),
+        "severity": rule.get("severity", ""),
+        "language": rule.get("langName") or rule.get("lang", ""),
+        "remediation": rule.get("remFnBaseEffort")
+        or rule.get("defaultRemFnBaseEffort")
+        or "",
+        "tags": rule.get("sysTags", []),
+        "description": description,
+    }
+
+
+def fetch_rules(session, rule_keys):
+    """
+    Fetch metadata of `rule_keys` with a single /api/rules/search request,
+    returns normalized rules by rule key
+    """
+    response = session.get(
+        "/api/rules/search",
+        params={
+            "rule_keys": ",".join(rule_keys),
+            "f": ",".join(RULE_FIELDS),
+            "include_external": "true",
+            "ps": len(rule_keys),
+        },
+    )
+    response.raise_for_status()
+    return {
+        rule["key"]: normalize_rule(rule)
+        for rule in response.json().get("rules", [])
+        if rule.get("key")
+    }
+
+
+class RuleCache:
+    """
+    Persistent SQLite cache of rule metadata shared across runs and projects.
+
+    Entries are keyed by server URL and rule key. Entries older than
+    `max_age_days` are refetched, but are still served when rules cannot be
+    fetched (rendering from a dump)
+    """
+
+    def __init__(self, path, max_age_days=7):
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = open_shared_database(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rules (
+                server TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                fetched REAL NOT NULL,
+                PRIMARY KEY (server, key)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def get_many(self, server, rule_keys, include_expired=False):
+        """Return cached rules of `rule_keys` by rule key"""
+        cutoff = (
+            0 if include_expired or self.max_age <= 0 else time.time() - self.max_age
+        )
+        rules = {}
+        # Stay below the SQLite limit of query parameters
+        for start in range(0, len(rule_keys), 500):
+            chunk = rule_keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, data in self.connection.execute(
+                f"SELECT key, data FROM rules WHERE server = ? AND fetched >= ? "
+                f"AND key IN ({placeholders})",
+                (server, cutoff, *chunk),
+            ):
+                rules[key] = json.loads(data)
+        self.hits += len(rules)
+        self.misses += len(rule_keys) - len(rules)
+        return rules
+
+    def put_many(self, server, rules):
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO rules (server, key, data, fetched) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (server, rule["key"], json.dumps(rule, ensure_ascii=False), now)
+                for rule in rules
+            ],
+        )
+        self.connection.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+class RuleCatalog:
+    """
+    Metadata of the rules that issues refer to, looked up once per distinct
+    rule. prefetch() takes the rule keys of a batch of issues (e.g. a search
+    page) and resolves the unknown ones from the optional RuleCache, then
+    from /api/rules/search in requests of `batch_size` rules, so the cost
+    depends on the number of rules and not of issues. Without a session
+    only the cache is used. Requests are timed as the rules stage of the
+    optional PipelineMetrics. Not thread-safe, prefetch() is called from
+    the thread that consumes the issues
+    """
+
+    def __init__(
+        self,
+        session=None,
+        cache=None,
+        server="",
+        batch_size=RULES_BATCH_SIZE,
+        metrics=None,
+    ):
+        self.session = session
+        self.cache = cache
+        self.server = server
+        self.batch_size = max(1, batch_size)
+        self.metrics = metrics or PipelineMetrics()
+        # Rule key -> rule, None for rules that could not be resolved
+        self.rules = {}
+        self.requests = 0
+        self.unavailable = False
+
+    def prefetch(self, rule_keys):
+        """Resolve the rules of `rule_keys` that were not looked up yet"""
+        missing = sorted({key for key in rule_keys if key and key not in self.rules})
+        if not missing:
+            return
+
+        if self.cache:
+            cached = self.cache.get_many(
+                self.server, missing, include_expired=self.session is None
+            )
+            self.rules.update(cached)
+            missing = [key for key in missing if key not in cached]
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            fetched = {}
+            if self.session is not None and not self.unavailable:
+                try:
+                    self.requests += 1
+                    with self.metrics.stage("rules"):
+                        fetched = fetch_rules(self.session, batch)
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    # Reports fall back to rule keys, further requests would fail too
+                    print(f"Rule details are not available: {e}")
+                    self.unavailable = True
+                if fetched and self.cache:
+                    self.cache.put_many(self.server, fetched.values())
+            for key in batch:
+                self.rules[key] = fetched.get(key)
+
+    def get(self, rule_key, default=None):
+        """Return metadata of a prefetched rule or `default`"""
+        rule = self.rules.get(rule_key)
+        return default if rule is None else rule
+
+    def resolved(self):
+        """Return the resolved rules by rule key"""
+        return {key: rule for key, rule in self.rules.items() if rule is not None}
+
+
+def open_rule_cache(config):
+    """Return the RuleCache of the config, None if it is disabled"""
+    cache_path = config.get("rule_cache", RULE_CACHE_FILE)
+    if not cache_path:
+        return None
+    return RuleCache(
+        cache_path, max_age_days=float(config.get("rule_cache_max_age_days", 7))
+    )
+
+
+DUMP_COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "lzma": ".xz"}
+
+
+def dump_filename(base_name, dump_format="json", compression=None):
+    """Return dump file name for the format and compression"""
+    if dump_format == "json":
+        return f"{base_name}.json"
+    if compression not in DUMP_COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Unsupported dump compression: {compression}")
+    return f"{base_name}.ndjson{DUMP_COMPRESSION_EXTENSIONS[compression]}"
+
+
+def open_dump(path, mode="rt"):
+    """Open a dump file, compression is detected by the file extension"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    if path.endswith((".xz", ".lzma")):
+        return lzma.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class NdjsonDumpWriter:
+    """
+    Writes issues to a newline-delimited JSON dump, one issue per line, as
+    soon as they are ready. With `append` issues are added to an existing
+    dump; compressed dumps get a new compressed stream, which readers
+    handle transparently
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.count = 0
+        self.file = open_dump(path, "at" if append else "wt")
+
+    def write(self, issue):
+        self.file.write(
+            json.dumps(issue, ensure_ascii=False, default=compact_json_default)
+        )
+        self.file.write("\n")
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+def iter_dump(path):
+    """
+    Stream issues from a dump file without loading it at once. Both NDJSON
+    dumps and the legacy JSON array of response_output.json are accepted,
+    the latter is parsed as a whole
+    """
+    with open_dump(path) as dump_file:
+        first_line = dump_file.readline()
+        if first_line.lstrip().startswith("["):
+            dump_file.seek(0)
+            yield from json.load(dump_file)
+            return
+
+        line = first_line
+        while line:
+            if line.strip():
+                yield json.loads(line)
+            line = dump_file.readline()
+
+
+class IssueStore:
+    """
+    Persistent SQLite store of downloaded issues (with their snippets)
+    keyed by project, branch and issue key. Issues whose snippet request
+    failed are marked, so the next sync fetches their snippets again
+    """
+
+    def __init__(self, path):
+        self.connection = open_shared_database(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS issues (
+                project TEXT NOT NULL,
+                branch TEXT NOT NULL,
+                key TEXT NOT NULL,
+                update_date TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (project, branch, key)
+            )
+            """
+        )
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS failed_snippets (
+                project TEXT NOT NULL,
+                branch TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (project, branch, key)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def load(self, project, branch, compact=False):
+        """Return stored issues of the project branch as a dict keyed by issue key"""
+        rows = self.connection.execute(
+            "SELECT key, data FROM issues WHERE project = ? AND branch = ? ORDER BY rowid",
+            (project, branch),
+        )
+        if compact:
+            return {key: CompactRecord(json.loads(data)) for key, data in rows}
+        return {key: json.loads(data) for key, data in rows}
+
+    def load_failed_keys(self, project, branch):
+        """Return keys of stored issues whose snippet request failed"""
+        rows = self.connection.execute(
+            "SELECT key FROM failed_snippets WHERE project = ? AND branch = ?",
+            (project, branch),
+        )
+        return {key for (key,) in rows}
+
+    def save(self, project, branch, issues, failed_keys=()):
+        """
+        Insert new issues and replace changed ones. Issues in `failed_keys`
+        are marked as missing snippets, marks of the other issues are cleared
+        """
+        issues = list(issues)
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM failed_snippets WHERE project = ? AND branch = ? AND key = ?",
+                ((project, branch, issue.get("key")) for issue in issues),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO failed_snippets (project, branch, key) "
+                "VALUES (?, ?, ?)",
+                ((project, branch, key) for key in failed_keys),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO issues (project, branch, key, update_date, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        project,
+                        branch,
+                        issue.get("key"),
+                        issue.get("updateDate"),
+                        json.dumps(
+                            issue, ensure_ascii=False, default=compact_json_default
+                        ),
+                    )
+                    for issue in issues
+                ),
+            )
+
+    def replace_all(self, project, branch, issues, failed_keys=()):
+        """Replace all stored issues of the project branch"""
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM issues WHERE project = ? AND branch = ?",
+                (project, branch),
+            )
+            self.connection.execute(
+                "DELETE FROM failed_snippets WHERE project = ? AND branch = ?",
+                (project, branch),
+            )
+        self.save(project, branch, issues, failed_keys)
+
+    def close(self):
+        self.connection.close()
+
+
+def fetch_updated_issues(
+    session,
+    params,
+    stored_issues,
+    issues_per_page=500,
+    limit=SEARCH_RESULT_LIMIT,
+    compact=False,
+    fields=None,
+):
+    """
+    Page through issues sorted by update date, newest first, and stop at the
+    first issue that is already stored with the same updateDate. Changed
+    issues are trimmed to the optional FieldProfile.
+
+    Returns list of new or changed issues and the total number of issues
+    matching the query, or (None, total) if the changes do not fit under
+    the API result limit
+    """
+    changed_issues = []
+    total_issues = 0
+    page = 1
+
+    while True:
+        response_data = search_issues(
+            session,
+            {
+                **params,
+                "s": "UPDATE_DATE",
+                "asc": "false",
+                "ps": issues_per_page,
+                "p": page,
+            },
+        )
+        issues_on_page = response_data.get("issues", [])
+        if page == 1:
+            total_issues = response_data.get("total", 0)
+
+        for issue in issues_on_page:
+            stored_issue = stored_issues.get(issue.get("key"))
+            if stored_issue and stored_issue.get("updateDate") == issue.get(
+                "updateDate"
+            ):
+                # Everything after this issue was updated earlier and is unchanged
+                return changed_issues, total_issues
+            if fields:
+                issue = fields.trim_issue(issue)
+            changed_issues.append(CompactRecord(issue) if compact else issue)
+
+        print(f"Found {len(changed_issues)} new or changed issues up to page: {page}")
+
+        if not issues_on_page or page * issues_per_page >= total_issues:
+            return changed_issues, total_issues
+
+        if (page + 1) * issues_per_page > limit:
+            return None, total_issues
+
+        page += 1
+
+
+def sync_issues(
+    store,
+    session,
+    project,
+    branch,
+    params,
+    search_workers=4,
+    snippet_workers=8,
+    snippet_rate_limit=10,
+    snippet_cache=None,
+    compact=False,
+    on_issue_ready=None,
+    range_planner=None,
+    concurrency=None,
+    metrics=None,
+    fields=None,
+    rules=None,
+    failed_snippet_keys=None,
+):
+    """
+    Bring the local issue store up to date and return all issues of the
+    project branch. Snippets are fetched only for new or changed issues.
+    Falls back to a full download when the store is empty or out of sync.
+    Snippets that failed in an earlier sync are fetched again.
+    `on_issue_ready` is called with each issue once its sources are set
+    and the rules of all issues are prefetched into the optional RuleCatalog.
+    Keys of issues whose snippet request failed are added to the optional
+    `failed_snippet_keys` list
+    """
+    stored_issues = store.load(project, branch, compact=compact)
+    retry_keys = store.load_failed_keys(project, branch)
+    failed_keys = []
+    metrics = metrics or PipelineMetrics()
+
+    if stored_issues:
+        print(
+            f"Loaded {len(stored_issues)} issues from the issue store, syncing changes..."
+        )
+        with metrics.stage("pagination"):
+            changed_issues, total_issues = fetch_updated_issues(
+                session, params, stored_issues, compact=compact, fields=fields
+            )
+
+        # Issues that left the query (e.g. closed ones) can only be
+        # detected by a full download
+        if changed_issues is not None and total_issues == len(
+            stored_issues.keys() | {issue.get("key") for issue in changed_issues}
+        ):
+            changed_keys = {issue.get("key") for issue in changed_issues}
+            # Unchanged issues whose snippets failed last time are fetched again
+            for issue_key in retry_keys - changed_keys:
+                if issue_key in stored_issues:
+                    changed_issues.append(stored_issues[issue_key])
+                    changed_keys.add(issue_key)
+            if rules:
+                rules.prefetch(issue.get("rule") for issue in stored_issues.values())
+                rules.prefetch(issue.get("rule") for issue in changed_issues)
+            if on_issue_ready:
+                for issue_key, issue in stored_issues.items():
+                    if issue_key not in changed_keys:
+                        on_issue_ready(issue)
+
+            fetch_issue_snippets(
+                changed_issues,
+                session,
+                workers=snippet_workers,
+                requests_per_second=snippet_rate_limit,
+                cache=snippet_cache,
+                on_issue_ready=on_issue_ready,
+                range_planner=range_planner,
+                concurrency=concurrency,
+                metrics=metrics,
+                fields=fields,
+                failed_snippet_keys=failed_keys,
+            )
+            for issue in changed_issues:
+                stored_issues[issue.get("key")] = issue
+
+            store.save(project, branch, changed_issues, failed_keys)
+            if failed_snippet_keys is not None:
+                failed_snippet_keys.extend(failed_keys)
+            print(f"Synced {len(changed_issues)} new or changed issues")
+            return list(stored_issues.values())
+
+        print("Issue store is out of sync with SonarQube, downloading all issues")
+    else:
+        print("Issue store is empty, downloading all issues")
+
+    with metrics.stage("pagination"):
+        all_issues = fetch_all_issues(
+            session, params, workers=search_workers, compact=compact, fields=fields
+        )
+    if rules:
+        rules.prefetch(issue.get("rule") for issue in all_issues)
+
+    # Reuse stored snippets of issues that did not change
+    changed_issues = []
+    for issue in all_issues:
+        stored_issue = stored_issues.get(issue.get("key"))
+        if (
+            stored_issue
+            and stored_issue.get("updateDate") == issue.get("updateDate")
+            and issue.get("key") not in retry_keys
+        ):
+            issue["sources"] = stored_issue.get("sources", [])
+            if on_issue_ready:
+                on_issue_ready(issue)
+        else:
+            changed_issues.append(issue)
+
+    fetch_issue_snippets(
+        changed_issues,
+        session,
+        workers=snippet_workers,
+        requests_per_second=snippet_rate_limit,
+        cache=snippet_cache,
+        on_issue_ready=on_issue_ready,
+        range_planner=range_planner,
+        concurrency=concurrency,
+        metrics=metrics,
+        fields=fields,
+        failed_snippet_keys=failed_keys,
+    )
+    store.replace_all(project, branch, all_issues, failed_keys)
+    if failed_snippet_keys is not None:
+        failed_snippet_keys.extend(failed_keys)
+    return all_issues
+
+
+def run_issue_pipeline(
+    session,
+    params,
+    on_issue_ready,
+    search_workers=4,
+    snippet_workers=8,
+    snippet_rate_limit=10,
+    snippet_cache=None,
+    compact=False,
+    range_planner=None,
+    concurrency=None,
+    metrics=None,
+    fields=None,
+    rules=None,
+    failed_snippet_keys=None,
+):
+    """
+    Download issues and their snippets as an overlapped pipeline.
+
+    A producer thread pages through /api/issues/search (in parallel slices
+    above the result limit) and hands over every page as soon as it
+    arrives, so snippet requests for its issues start while later pages are
+    still downloading. Finished issues are passed to `on_issue_ready` in
+    download order from the calling thread, so dump and report writers
+    consume them while the download goes on. With a SnippetRangePlanner
+    snippets are fetched as merged line ranges per file, planned over all
+    pages of a slice once the slice is downloaded. An
+    AdaptiveConcurrency limits concurrent snippet requests. Paging and
+    snippet requests are timed as stages of the optional PipelineMetrics.
+    Issues and source lines are trimmed to the optional FieldProfile. Rules
+    of every page are prefetched into the optional RuleCatalog before its
+    issues are passed on. Keys of issues whose snippet request failed are
+    added to the optional `failed_snippet_keys` list.
+
+    Returns the number of issues
+    """
+    events = queue.Queue()
+    metrics = metrics or PipelineMetrics()
+
+    def on_page(issues):
+        events.put(("page", issues))
+
+    def fetch_pages(slice_params, label=""):
+        with metrics.stage("pagination"):
+            fetch_issue_pages(
+                session,
+                slice_params,
+                label=label,
+                compact=compact,
+                on_page=on_page,
+                fields=fields,
+            )
+        events.put(("slice_done", None))
+
+    def produce_pages():
+        try:
+            with metrics.stage("pagination"):
+                partitions = plan_issue_partitions(session, params)
+            events.put(("total", sum(total for _, total in partitions)))
+
+            if len(partitions) == 1:
+                fetch_pages(partitions[0][0])
+                return
+
+            with ThreadPoolExecutor(max_workers=max(1, search_workers)) as executor:
+                futures = [
+                    executor.submit(
+                        fetch_pages,
+                        slice_params,
+                        f" of slice {index + 1}/{len(partitions)}",
+                    )
+                    for index, (slice_params, _) in enumerate(partitions)
+                ]
+                for future in futures:
+                    future.result()
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            events.put(("pages_done", None))
+
+    print(
+        f"Downloading issues and snippets ({snippet_workers} snippet workers, "
+        f"{snippet_rate_limit or 'unlimited'} requests/s)..."
+    )
+    threading.Thread(target=produce_pages, name="issue-pages", daemon=True).start()
+
+    seen_keys = set()
+    # Issues finished out of order wait here until all earlier ones are done
+    finished = {}
+    next_sequence = 0
+    next_ready = 0
+    pages_done = False
+    processed = 0
+    total_issues = 0
+
+    def issue_done(sequence, issue):
+        nonlocal next_ready, processed
+        processed += 1
+        finished[sequence] = issue
+        while next_ready in finished:
+            on_issue_ready(finished.pop(next_ready))
+            next_ready += 1
+
+        if processed % 50 == 0:
+            print(
+                f"Processed {processed}/{total_issues} issues, fetched snippets for {snippets.fetched} issues"
+            )
+
+    with ThreadPoolExecutor(max_workers=max(1, snippet_workers)) as executor:
+        snippets = SnippetFetcher(
+            session,
+            executor,
+            events,
+            issue_done,
+            requests_per_second=snippet_rate_limit,
+            concurrency=concurrency or AdaptiveConcurrency(snippet_workers),
+            cache=snippet_cache,
+            range_planner=range_planner,
+            metrics=metrics,
+            fields=fields,
+            failed_snippet_keys=failed_snippet_keys,
+        )
+        while not pages_done or snippets.pending:
+            event = events.get()
+            kind = event[0]
+
+            if kind == "total":
+                total_issues = event[1]
+
+            elif kind == "page":
+                if rules:
+                    # New rules of the page are resolved in one batch
+                    rules.prefetch(issue.get("rule") for issue in event[1])
+                for issue in event[1]:
+                    issue_key = issue.get("key", "")
+                    # Slices may overlap, skip duplicates
+                    if issue_key in seen_keys:
+                        continue
+                    seen_keys.add(issue_key)
+                    snippets.add(issue, next_sequence)
+                    next_sequence += 1
+
+            elif kind == "slice_done":
+                # Line ranges are planned over all pages of the slice, so
+                # that windows in the same file are merged across pages
+                snippets.flush()
+
+            elif kind == "snippets":
+                snippets.complete(event[1], event[2])
+
+            elif kind == "error":
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise event[1]
+
+            elif kind == "pages_done":
+                pages_done = True
+
+    print(
+        f"Successfully fetched snippets for {snippets.fetched} out of {processed} issues"
+    )
+    return processed
+
+
+# Excel worksheet row limit, one row is taken by headers
+EXCEL_MAX_ROWS = 1048576
+
+EXCEL_HEADERS = [
+    "Key",
+    "External Rule Engine",
+    "File",
+    "Line",
+    "Language",
+    "Message",
+    "Status",
+    "Severity",
+    "Resolution",
+    "Comment",
+    "Comment Author",
+    "Code Author",
+]
+
+EXCEL_SHEETS = {
+    "VULNERABILITY": "VULNERABILITIES",
+    "BUG": "BUGS",
+    "CODE_SMELL": "CODE_SMELLS",
+}
+
+EXCEL_RULES_SHEET = "RULES"
+EXCEL_RULE_HEADERS = [
+    "Rule",
+    "Name",
+    "Type",
+    "Severity",
+    "Language",
+    "Remediation",
+    "Issues",
+    "Description",
+]
+# Excel cell text limit
+EXCEL_MAX_CELL_LENGTH = 32767
+
+
+def excel_rule_row(rule_key, rule, count):
+    """Return Excel row values of a rule with `count` issues"""
+    description = ""
+    if rule["description"]:
+        description = BeautifulSoup(rule["description"], "html.parser").get_text(
+            " ", strip=True
+        )
+    return [
+        rule_key,
+        rule["name"],
+        rule["type"],
+        rule["severity"],
+        rule["language"],
+        rule["remediation"],
+        count,
+        description[:EXCEL_MAX_CELL_LENGTH],
+    ]
+
+
+def excel_row(issue, info):
+    """Return Excel row values for an issue located in the component `info`"""
+    file_path = info.file_path
+
+    # Get comment information
+    comments = issue.get("comments", [])
+    comment_text = ""
+    comment_author = ""
+    if comments:
+        # Get the first comment
+        first_comment = comments[0]
+        comment_text = first_comment.get("htmlText", "")
+        comment_author = first_comment.get("login", "")
+
+    # Get start line information
+    line = issue.get("textRange", {})
+    start_line = line.get("startLine", "")
+
+    return [
+        issue.get("key", ""),
+        issue.get("externalRuleEngine", ""),
+        file_path,
+        start_line,
+        info.language,
+        issue.get("message", ""),
+        issue.get("status", ""),
+        issue.get("severity", ""),
+        issue.get("resolution", ""),
+        comment_text,
+        comment_author,
+        issue.get("author", ""),  # code author
+    ]
+
+
+class ExcelReportWriter:
+    """
+    Streaming Excel report writer with a sheet per issue type.
+
+    Issues can be added as they arrive. Rows are spooled to temporary files
+    while column widths are tracked, then written with openpyxl write-only
+    worksheets, so memory does not grow with the number of issues. Sheets
+    are split when a category exceeds the Excel row limit. With `rules`
+    (a RuleCatalog or a mapping of rule keys to metadata) a rules sheet
+    lists every rule of the issues once
+    """
+
+    def __init__(
+        self, output_filename, max_rows_per_sheet=EXCEL_MAX_ROWS - 1, rules=None
+    ):
+        self.output_filename = output_filename
+        self.max_rows_per_sheet = max_rows_per_sheet
+        self.rules = rules or {}
+        self.rule_counts = {}
+        self.spools = {
+            category: tempfile.TemporaryFile("w+", encoding="utf-8")
+            for category in EXCEL_SHEETS
+        }
+        self.row_counts = {category: 0 for category in EXCEL_SHEETS}
+        self.column_widths = {
+            category: [len(header) for header in EXCEL_HEADERS]
+            for category in EXCEL_SHEETS
+        }
+
+    def add_issue(self, issue, info):
+        """Spool the issue row into its category sheet"""
+        category = issue.get("type", "").upper()
+        if category not in self.spools:
+            return
+
+        rule_key = issue.get("rule", "")
+        self.rule_counts[rule_key] = self.rule_counts.get(rule_key, 0) + 1
+        row = excel_row(issue, info)
+        widths = self.column_widths[category]
+        for col, value in enumerate(row):
+            if value is not None:
+                length = len(str(value))
+                if length > widths[col]:
+                    widths[col] = length
+
+        self.spools[category].write(json.dumps(row, ensure_ascii=False))
+        self.spools[category].write("\n")
+        self.row_counts[category] += 1
+
+    def _sheet_titles(self, category):
+        sheet_count = max(1, -(-self.row_counts[category] // self.max_rows_per_sheet))
+        title = EXCEL_SHEETS[category]
+        return [title] + [f"{title}_{part}" for part in range(2, sheet_count + 1)]
+
+    def _write_rules_sheet(self, wb, header_cells):
+        """Add the rules sheet, ordered by the number of issues"""
+        rows = [
+            excel_rule_row(rule_key, self.rules.get(rule_key), count)
+            for rule_key, count in sorted(
+                self.rule_counts.items(), key=lambda item: (-item[1], item[0])
+            )
+            if self.rules.get(rule_key) is not None
+        ]
+        if not rows:
+            return
+
+        sheet = wb.create_sheet(EXCEL_RULES_SHEET)
+        for col, header in enumerate(EXCEL_RULE_HEADERS, 1):
+            width = max([len(header)] + [len(str(row[col - 1])) for row in rows])
+            sheet.column_dimensions[get_column_letter(col)].width = min(width + 2, 50)
+        sheet.append(header_cells(sheet, EXCEL_RULE_HEADERS))
+        for row in rows:
+            sheet.append(row)
+        last_column = get_column_letter(len(EXCEL_RULE_HEADERS))
+        sheet.auto_filter.ref = f"A1:{last_column}{len(rows) + 1}"
+
+    def close(self):
+        """Write the workbook and return number of issues per category"""
+        wb = Workbook(write_only=True)
+
+        # Define styles
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(
+            start_color="366092", end_color="366092", fill_type="solid"
+        )
+        last_column = get_column_letter(len(EXCEL_HEADERS))
+
+        def header_cells(sheet, headers):
+            cells = []
+            for header in headers:
+                cell = WriteOnlyCell(sheet, value=header)
+                cell.font = header_font
+                cell.fill = header_fill
+                cells.append(cell)
+            return cells
+
+        try:
+            for category, spool in self.spools.items():
+                spool.seek(0)
+                remaining = self.row_counts[category]
+
+                for title in self._sheet_titles(category):
+                    sheet = wb.create_sheet(title)
+                    sheet_rows = min(remaining, self.max_rows_per_sheet)
+                    remaining -= sheet_rows
+
+                    # Column widths must be set before the first row is written
+                    for col, width in enumerate(self.column_widths[category], 1):
+                        sheet.column_dimensions[get_column_letter(col)].width = min(
+                            width + 2, 50
+                        )
+
+                    sheet.append(header_cells(sheet, EXCEL_HEADERS))
+
+                    for _ in range(sheet_rows):
+                        sheet.append(json.loads(spool.readline()))
+
+                    # Auto-filter covering all headers and data rows
+                    sheet.auto_filter.ref = f"A1:{last_column}{sheet_rows + 1}"
+
+            self._write_rules_sheet(wb, header_cells)
+            wb.save(self.output_filename)
+        finally:
+            for spool in self.spools.values():
+                spool.close()
+
+        return {
+            "vulnerabilities": self.row_counts["VULNERABILITY"],
+            "bugs": self.row_counts["BUG"],
+            "code_smells": self.row_counts["CODE_SMELL"],
+            "excel_file": self.output_filename,
+        }
+
+
+def generate_excel_report(catalog, output_filename="sonarqube_report.xlsx"):
+    """
+    Generate Excel report with issues categorized by type.
+    `catalog` is an IssueCatalog or a list of issues
+    """
+    if not isinstance(catalog, IssueCatalog):
+        catalog = IssueCatalog(catalog)
+
+    writer = ExcelReportWriter(output_filename, rules=catalog.rules)
+    for issues in catalog.partitions.values():
+        for issue in issues:
+            writer.add_issue(issue, catalog.component_info(issue.get("component", "")))
+
+    report_stats = writer.close()
+    print_line(f"Excel report generated: {output_filename}")
+
+    return report_stats
+
+
+EXCEL_REPORT_FILE = "sonarqube_issues_report.xlsx"
+# Stage artifact with metadata of the rules in the catalog
+RULES_FILE = "rules.json"
+HTML_REPORT_FILE = "sonarqube_comprehensive_report.html"
+HTML_REPORT_DIR = "sonarqube_report"
+
+
+class ConfigError(Exception):
+    """Invalid or incomplete configuration"""
+
+
+def fingerprint(*parts):
+    """Return a stable digest of JSON-serializable stage inputs"""
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def file_digest(path):
+    """Return SHA-256 digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version():
+    """Digest of this script, so changing a template re-renders the reports"""
+    return file_digest(os.path.abspath(__file__))
+
+
+def save_catalog(catalog, path):
+    with open(path, "wb") as f:
+        pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_catalog(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def write_json_dump(issues, output_file):
+    """Save raw JSON response with sources included"""
+    with open(output_file, "w", encoding="utf-8") as outfile:
+        json.dump(
+            issues,
+            outfile,
+            indent=4,
+            ensure_ascii=False,
+            default=compact_json_default,
+        )
+    return output_file
+
+
+def save_rules(rules, path):
+    """Save rule metadata of the catalog next to the other stage artifacts"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rules, f, indent=4, ensure_ascii=False)
+
+
+def load_rules(rules_file, config, issues):
+    """
+    Return rule metadata for rendering without network access: the rules
+    saved by the last download, otherwise the rules of `issues` found in
+    the rule cache, expired ones included
+    """
+    if os.path.exists(rules_file):
+        with open(rules_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    cache = open_rule_cache(config)
+    if cache is None:
+        return {}
+    try:
+        rules = RuleCatalog(cache=cache, server=config.get("url", "").rstrip("/"))
+        rules.prefetch(issue.get("rule") for issue in issues)
+        return rules.resolved()
+    finally:
+        cache.close()
+
+
+def render_excel_from_catalog(catalog_file, output_filename):
+    """Render the xlsx report from a saved catalog, returns report summary"""
+    return generate_excel_report(load_catalog(catalog_file), output_filename)
 
-    # Define styles
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(
-        start_color="366092", end_color="366092", fill_type="solid"
+
+def render_html_from_catalog(catalog_file, project_name, project_version, options):
+    """Render the html report from a saved catalog, returns report summary"""
+    html_result = generate_html_report(
+        project_name, project_version, load_catalog(catalog_file), options
     )
+    if html_result is None:
+        raise RuntimeError("HTML report was not generated")
+    return html_result
 
-    # Helper function to write data to sheet
-    def write_issues_to_sheet(sheet, issues):
-        # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = sheet.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-
-        # Write issues
-        for row, issue in enumerate(issues, 2):
-            component = issue.get("component", "")
-            file_path = extract_filename(component)
 
-            # Get comment information
-            comments = issue.get("comments", [])
-            comment_text = ""
-            comment_author = ""
-            if comments:
-                # Get the first comment
-                first_comment = comments[0]
-                comment_text = first_comment.get("htmlText", "")
-                comment_author = first_comment.get("login", "")
-
-            # Get start line information
-            line = issue.get("textRange", {})
-            start_line = line.get("startLine", "")
-
-            # Prepare row data
-            row_data = [
-                issue.get("key", ""),
-                issue.get("externalRuleEngine", ""),
-                file_path,
-                start_line,
-                get_language_from_extension(file_path),
-                issue.get("message", ""),
-                issue.get("status", ""),
-                issue.get("severity", ""),
-                issue.get("resolution", ""),
-                comment_text,
-                comment_author,
-                issue.get("author", ""),  # code author
-            ]
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Stages timed by PipelineMetrics, any of them can be profiled
+METRICS_STAGES = (
+    "pagination",
+    "snippets",
+    "rules",
+    "dump",
+    "build_catalog",
+    "render_xlsx",
+    "render_html",
+)
+
+
+def max_rss_bytes():
+    """Return peak resident set size of this process, None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class EndpointMetrics:
+    """Requests, errors, bytes and latency distribution of one API path"""
+
+    def __init__(self):
+        self.latencies = array("d")
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statuses = {}
+        self.bytes = 0
+
+    def add(self, seconds, status, size):
+        self.latencies.append(seconds)
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.bytes += size
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(share):
+            return latencies[min(len(latencies) - 1, int(share * len(latencies)))]
+
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "requests": len(latencies),
+            "statuses": self.statuses,
+            "bytes": self.bytes,
+            "total_seconds": sum(latencies),
+            "min_seconds": latencies[0],
+            "p50_seconds": percentile(0.5),
+            "p90_seconds": percentile(0.9),
+            "p99_seconds": percentile(0.99),
+            "max_seconds": latencies[-1],
+            # Request counts by latency upper bound, not cumulative
+            "histogram": dict(zip(bounds, self.buckets)),
+        }
+
+
+class StageTimer:
+    """Times one piece of a stage in the current thread"""
+
+    __slots__ = ("metrics", "name", "profiler", "started", "cpu_started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.profiler = None
+        if self.name == self.metrics.profile_stage:
+            self.profiler = self.metrics.enable_profiler()
+        self.started = time.perf_counter()
+        self.cpu_started = time.thread_time()
+
+    def __exit__(self, *exc_info):
+        cpu_seconds = time.thread_time() - self.cpu_started
+        finished = time.perf_counter()
+        if self.profiler:
+            self.metrics.disable_profiler(self.profiler)
+        self.metrics.add_stage(self.name, self.started, finished, cpu_seconds)
+
+
+class PipelineMetrics:
+    """
+    Stage timings, per-endpoint request latencies, bytes downloaded, memory
+    peaks and cache statistics of one run, written as JSON to `path`.
+    Without `path` nothing is recorded.
+
+    Stages overlap (snippets download while pages arrive, reports are
+    written while snippets arrive), so a stage is timed in pieces from any
+    thread: its wall time spans the first start to the last end, its busy
+    time adds up the wall time of the pieces (across threads) and its CPU
+    time the thread CPU time of the pieces. Concurrent stages share
+    one heap, so with `trace_memory` tracemalloc peaks are taken per phase
+    (download, outputs) and per output task run in a worker process.
+    `profile_stage` collects a cProfile of that stage from all threads
+    """
+
+    def __init__(self, path=None, trace_memory=False, profile_stage=None):
+        self.path = path
+        self.enabled = path is not None
+        self.trace_memory = self.enabled and trace_memory
+        self.profile_stage = profile_stage if self.enabled else None
+        self.profile_path = None
+        if self.profile_stage:
+            self.profile_path = f"{os.path.splitext(path)[0]}.{self.profile_stage}.prof"
+
+        self.stages = {}
+        self.phases = {}
+        self.endpoints = {}
+        self.caches = {}
+        # Additional top-level entries of the report
+        self.extra = {}
+        self.profilers = []
+        self.local = threading.local()
+        # Since Python 3.12 a profiler sees all threads and only one can be
+        # active, so the profiled stage shares one while any piece of it runs
+        self.shared_profiler = None
+        self.profiled_pieces = 0
+        self.profiler_warned = False
+        self.lock = threading.Lock()
+
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def stage(self, name):
+        """Return context manager timing a piece of the stage"""
+        if not self.enabled:
+            return nullcontext()
+        return StageTimer(self, name)
 
-            # Write row data
-            for col, value in enumerate(row_data, 1):
-                sheet.cell(row=row, column=col, value=value)
+    def add_stage(self, name, started, finished, cpu_seconds, peak_traced_bytes=None):
+        with self.lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                entry = self.stages[name] = {
+                    "started": started,
+                    "finished": finished,
+                    "busy_seconds": 0.0,
+                    "cpu_seconds": 0.0,
+                    "pieces": 0,
+                }
+            entry["started"] = min(entry["started"], started)
+            entry["finished"] = max(entry["finished"], finished)
+            entry["busy_seconds"] += finished - started
+            entry["cpu_seconds"] += cpu_seconds
+            entry["pieces"] += 1
+            if peak_traced_bytes is not None:
+                entry["peak_traced_bytes"] = max(
+                    entry.get("peak_traced_bytes", 0), peak_traced_bytes
+                )
+
+    def add_task(self, name, measurement):
+        """Add a stage measured by measure_task, which finished just now"""
+        finished = time.perf_counter()
+        self.add_stage(
+            name,
+            finished - measurement["wall_seconds"],
+            finished,
+            measurement["cpu_seconds"],
+            measurement.get("peak_traced_bytes"),
+        )
+
+    @contextmanager
+    def phase(self, name):
+        """Time a sequential part of the run and take its memory peak"""
+        if not self.enabled:
+            yield
+            return
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield
+        finally:
+            entry = {
+                "wall_seconds": time.perf_counter() - started,
+                "cpu_seconds": time.process_time() - cpu_started,
+            }
+            if self.trace_memory:
+                entry["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+            entry["max_rss_bytes"] = max_rss_bytes()
+            self.phases[name] = entry
+
+    def thread_profiler(self):
+        """Return cProfile profiler of the current thread"""
+        profiler = getattr(self.local, "profiler", None)
+        if profiler is None:
+            profiler = self.local.profiler = cProfile.Profile()
+            with self.lock:
+                self.profilers.append(profiler)
+        return profiler
+
+    def enable_profiler(self):
+        """
+        Enable profiling for a piece of the profiled stage and return the
+        profiler, or None if another profiling tool is active. The
+        profiled work runs either way
+        """
+        if sys.version_info < (3, 12):
+            profiler = self.thread_profiler()
+            profiler.enable()
+            return profiler
 
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
+        with self.lock:
+            if self.profiled_pieces == 0:
+                if self.shared_profiler is None:
+                    self.shared_profiler = cProfile.Profile()
                 try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
-
-        # ADD AUTO-FILTER HERE - This is the key addition
-        # Set auto_filter to cover all headers and data (from row 1 to last row with data)
-        sheet.auto_filter.ref = f"A1:{sheet.cell(row=1, column=len(headers)).column_letter}{len(issues) + 1}"
-
-    # Write data to each sheet
-    write_issues_to_sheet(vuln_sheet, vulnerabilities)
-    write_issues_to_sheet(bug_sheet, bugs)
-    write_issues_to_sheet(smell_sheet, code_smells)
-
-    # Save workbook
-    wb.save(output_filename)
-    print(f"Excel report generated: {output_filename}")
+                    self.shared_profiler.enable()
+                except ValueError as e:
+                    if not self.profiler_warned:
+                        self.profiler_warned = True
+                        print_line(
+                            f"Warning: stage {self.profile_stage} is not profiled: {e}"
+                        )
+                    return None
+                if self.shared_profiler not in self.profilers:
+                    self.profilers.append(self.shared_profiler)
+            self.profiled_pieces += 1
+            return self.shared_profiler
+
+    def disable_profiler(self, profiler):
+        """Disable profiling after a piece of the profiled stage"""
+        if profiler is not self.shared_profiler:
+            profiler.disable()
+            return
+        with self.lock:
+            self.profiled_pieces -= 1
+            if self.profiled_pieces == 0:
+                profiler.disable()
+
+    def task_profile_file(self, name):
+        """Return file a measured output task profiles into, if it is profiled"""
+        if name != self.profile_stage:
+            return None
+        return f"{self.profile_path}.task"
+
+    def record_request(self, path, seconds, response):
+        """SonarQubeSession request listener"""
+        if response is None:
+            status, size = "error", 0
+        else:
+            status, size = str(response.status_code), len(response.content)
+        with self.lock:
+            endpoint = self.endpoints.get(path)
+            if endpoint is None:
+                endpoint = self.endpoints[path] = EndpointMetrics()
+            endpoint.add(seconds, status, size)
+
+    def attach(self, session):
+        if self.enabled:
+            session.request_listeners.append(self.record_request)
+
+    def detach(self, session):
+        if self.enabled:
+            session.request_listeners.remove(self.record_request)
+
+    def report(self):
+        stages = {}
+        for name, entry in self.stages.items():
+            stages[name] = {
+                "wall_seconds": entry["finished"] - entry["started"],
+                "busy_seconds": entry["busy_seconds"],
+                "cpu_seconds": entry["cpu_seconds"],
+                "pieces": entry["pieces"],
+            }
+            if "peak_traced_bytes" in entry:
+                stages[name]["peak_traced_bytes"] = entry["peak_traced_bytes"]
+
+        requests_by_endpoint = {
+            path: endpoint.summary() for path, endpoint in self.endpoints.items()
+        }
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": time.perf_counter() - self.started,
+            "cpu_seconds": time.process_time() - self.cpu_started,
+            "max_rss_bytes": max_rss_bytes(),
+            "phases": self.phases,
+            "stages": stages,
+            "requests": requests_by_endpoint,
+            "bytes_downloaded": sum(
+                endpoint["bytes"] for endpoint in requests_by_endpoint.values()
+            ),
+            "caches": self.caches,
+        }
+        if self.trace_memory:
+            report["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        report.update(self.extra)
+        return report
+
+    def write(self):
+        """Write the report and the profile of the profiled stage"""
+        report = self.report()
+        if self.trace_memory:
+            tracemalloc.stop()
+        with open(self.path, "w", encoding="utf-8") as outfile:
+            json.dump(report, outfile, indent=4)
+        print(f"Metrics saved to {self.path}")
+
+        if self.profile_stage:
+            sources = list(self.profilers)
+            task_file = self.task_profile_file(self.profile_stage)
+            if os.path.exists(task_file):
+                sources.append(task_file)
+            if sources:
+                pstats.Stats(*sources).dump_stats(self.profile_path)
+                print(
+                    f"Profile of stage {self.profile_stage} saved to {self.profile_path}"
+                )
+            elif not self.profiler_warned:
+                print(f"Stage {self.profile_stage} did not run, no profile saved")
+            if os.path.exists(task_file):
+                os.remove(task_file)
+        return report
+
+
+def measure_task(function, args, trace_memory=False, profile_file=None):
+    """
+    Run an output task and return (result, measurement) with its wall and
+    CPU time. `trace_memory` is only used in worker processes, which have a
+    heap of their own: the tracemalloc peak of the task is measured there.
+    With `profile_file` the task is profiled into that file
+    """
+    if trace_memory:
+        # Drop traces inherited from the parent process
+        tracemalloc.stop()
+        tracemalloc.start()
+    profiler = cProfile.Profile() if profile_file else None
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    if profiler:
+        profiler.enable()
+    try:
+        result = function(*args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+
+    measurement = {
+        "wall_seconds": time.perf_counter() - started,
+        "cpu_seconds": time.thread_time() - cpu_started,
+    }
+    if trace_memory:
+        measurement["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, measurement
+
+
+def run_report_tasks(
+    tasks, executor_class=ThreadPoolExecutor, workers=None, metrics=None
+):
+    """
+    Run independent output tasks concurrently. `tasks` maps a stage name to
+    a (function, args) tuple. Returns (results, failures); a failing task is
+    recorded in failures and does not stop the others. Tasks are timed as
+    stages of the optional PipelineMetrics
+    """
+    results = {}
+    failures = {}
+    if not tasks:
+        return results, failures
+
+    metrics = metrics or PipelineMetrics()
+    in_processes = executor_class is ProcessPoolExecutor
+    with executor_class(max_workers=workers or len(tasks)) as executor:
+        futures = {}
+        for name, (function, args) in tasks.items():
+            if metrics.enabled:
+                future = executor.submit(
+                    measure_task,
+                    function,
+                    args,
+                    metrics.trace_memory and in_processes,
+                    metrics.task_profile_file(name),
+                )
+            else:
+                future = executor.submit(function, *args)
+            futures[future] = name
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                if metrics.enabled:
+                    results[name], measurement = future.result()
+                    metrics.add_task(name, measurement)
+                else:
+                    results[name] = future.result()
+            except Exception as e:
+                failures[name] = f"{type(e).__name__}: {e}"
+                print(f"Error: stage {name} failed - {failures[name]}")
+
+    return results, failures
+
+
+class StageRunner:
+    """
+    Keeps a manifest of the stages that render from the dump (build_catalog,
+    render_xlsx, render_html) with the artifact each stage produced and a
+    fingerprint of the stage inputs, so a later --render-only run can skip
+    stages whose inputs did not change. Downloads are never skipped
+    """
+
+    def __init__(self, state_dir=".sonar_stages", force=False):
+        self.state_dir = state_dir
+        self.force = force
+        self.manifest_path = os.path.join(state_dir, "manifest.json")
+        self.executed = {}
+
+        os.makedirs(state_dir, exist_ok=True)
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.manifest = {}
 
+    def artifact_path(self, name):
+        return os.path.join(self.state_dir, name)
+
+    def is_current(self, stage, stage_fingerprint, artifact):
+        """Return True if the stage already produced the artifact from the same inputs"""
+        entry = self.manifest.get(stage)
+        current = (
+            not self.force
+            and entry is not None
+            and entry.get("fingerprint") == stage_fingerprint
+            and entry.get("artifact") == artifact
+            and os.path.exists(artifact)
+        )
+        if current:
+            print(f"Stage {stage} is up to date, reusing {artifact}")
+            self.executed[stage] = False
+        return current
+
+    def record(self, stage, stage_fingerprint, artifact):
+        """Record that the stage produced the artifact"""
+        self.executed[stage] = True
+        self.manifest[stage] = {
+            "fingerprint": stage_fingerprint,
+            "artifact": artifact,
+            "completed": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        temporary_path = self.manifest_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=4)
+        os.replace(temporary_path, self.manifest_path)
+
+
+def catalog_fingerprint(dump_path, compact, rules_path=None):
+    rules_digest = None
+    if rules_path and os.path.exists(rules_path):
+        rules_digest = file_digest(rules_path)
+    return fingerprint("build_catalog", file_digest(dump_path), compact, rules_digest)
+
+
+def xlsx_fingerprint(catalog_stage_fingerprint):
+    return fingerprint("render_xlsx", catalog_stage_fingerprint, code_version())
+
+
+def html_fingerprint(catalog_stage_fingerprint, project_name, project_version, options):
+    return fingerprint(
+        "render_html",
+        catalog_stage_fingerprint,
+        project_name,
+        project_version,
+        options,
+        code_version(),
+    )
+
+
+def session_options(config):
+    """Return SonarQubeSession options of the config"""
+    snippet_workers = int(config.get("snippet_workers", 8))
     return {
-        "vulnerabilities": len(vulnerabilities),
-        "bugs": len(bugs),
-        "code_smells": len(code_smells),
-        "excel_file": output_filename,
+        "pool_size": int(config.get("http_pool_size", max(10, snippet_workers))),
+        "timeout": float(config.get("http_timeout", 60)),
+        "max_retries": int(config.get("http_retries", 4)),
+        "backoff": float(config.get("http_backoff", 0.5)),
+        "max_backoff": float(config.get("http_max_backoff", 30)),
     }
 
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python script.py <config_file_path>")
-        sys.exit(1)
+FAILED_SNIPPETS_FILE = "failed_snippets.txt"
 
-    config_path = sys.argv[1]
 
-    try:
-        # Read configuration from JSON file
-        with open(config_path, "r") as config_file:
-            config = json.load(config_file)
+def print_request_report(session, concurrency, failed_snippet_keys):
+    """
+    Print retries, the adaptive snippet concurrency and issues whose
+    snippets could not be fetched. The full list of failed issue keys is
+    saved to FAILED_SNIPPETS_FILE. Returns request statistics
+    """
+    retry_stats = session.retry_stats()
+    by_reason = ", ".join(
+        f"{reason}: {count}"
+        for reason, count in sorted(retry_stats["retries_by_reason"].items())
+    )
+    print(
+        f"Request retries: {retry_stats['retries']}"
+        + (f" ({by_reason})" if by_reason else "")
+        + f", failed after retries: {retry_stats['failed_requests']}"
+    )
+    if concurrency:
+        print(
+            f"Snippet concurrency: {int(concurrency.limit)} at the end, "
+            f"lowest {int(concurrency.lowest)}, "
+            f"reduced {concurrency.decreases} times"
+        )
 
-        url = config.get("url")
-        project_id = config.get("project_id")
-        project_name = config.get("project_name")
-        project_version = config.get("project_version")
-        branch = config.get("branch")
-        jwt_session = config.get("JWT-SESSION")
+    retry_stats["failed_snippets"] = len(failed_snippet_keys)
+    if failed_snippet_keys:
+        with open(FAILED_SNIPPETS_FILE, "w", encoding="utf-8") as f:
+            f.write("\n".join(failed_snippet_keys) + "\n")
+        shown = ", ".join(failed_snippet_keys[:20])
+        more = " ..." if len(failed_snippet_keys) > 20 else ""
+        print(
+            f"Snippets could not be fetched for {len(failed_snippet_keys)} issues: "
+            f"{shown}{more} (all keys saved to {FAILED_SNIPPETS_FILE})"
+        )
+    elif os.path.exists(FAILED_SNIPPETS_FILE):
+        os.remove(FAILED_SNIPPETS_FILE)
 
-        if (
-            not url
-            or not project_id
-            or not project_name
-            or not project_version
-            or not jwt_session
-            or not branch
-        ):
-            print("Error: all fields must be provided in the config file.")
-            sys.exit(1)
+    return retry_stats
+
+
+def download_and_render(config, runner, session=None, metrics=None):
+    """
+    Run all stages with network access: download issues and snippets as an
+    overlapped pipeline that also feeds the dump and report writers, then
+    record the catalog and report artifacts for later --render-only runs.
+    Every stage runs, as the server data may have changed since the last
+    run. An existing `session` is reused and left open.
+    Stages, requests and caches are recorded in the optional PipelineMetrics
+    """
+    url = config.get("url")
+    project_id = config.get("project_id")
+    project_name = config.get("project_name")
+    project_version = config.get("project_version")
+    branch = config.get("branch")
+    jwt_session = config.get("JWT-SESSION")
 
-        # Set up headers and cookies
-        headers = {"Accept": "application/json"}
-        cookies = {"JWT-SESSION": jwt_session}
+    if (
+        not url
+        or not project_id
+        or not project_name
+        or not project_version
+        or not jwt_session
+        or not branch
+    ):
+        raise ConfigError("all fields must be provided in the config file.")
 
-        output_file = "response_output.json"
-        all_issues = []
-        total_issues = 0
-        issues_per_page = "500"
-        page = 1
+    snippet_workers = int(config.get("snippet_workers", 8))
+    html_options = html_report_options(config)
 
-        # Send GET request with SSL verification disabled
-        while True:
-            response = requests.get(
-                url=url
-                + "/api/issues/search?components="
-                + project_id
-                + "&branch="
-                + branch
-                + "&scopes=MAIN"
-                + "&impactSeverities=BLOCKER%2CHIGH%2CMEDIUM%2CINFO%2CLOW"
-                + "&impactSoftwareQualities=RELIABILITY%2CSECURITY"
-                + "&issueStatuses=CONFIRMED%2CFALSE_POSITIVE%2CFIXED%2COPEN"
-                + "&ps="
-                + issues_per_page
-                + "&p="
-                + str(page)
-                + "&additionalFields=_all",
-                headers=headers,
-                cookies=cookies,
-                verify=False,  # Disable SSL verification
+    owns_session = session is None
+    if owns_session:
+        # Set up pooled session with shared headers and cookies
+        session = SonarQubeSession(url, jwt_session, **session_options(config))
+    else:
+        # Retries are reported per project
+        session.reset_retry_stats()
+
+    dump_format = config.get("dump_format", "json")
+    output_file = dump_filename(
+        "response_output", dump_format, config.get("dump_compression")
+    )
+
+    fields = field_profile(config)
+    search_params = build_search_params(project_id, branch, fields.additional_fields)
+    search_workers = int(config.get("search_workers", 4))
+    snippet_rate_limit = float(config.get("snippet_rate_limit", 10))
+    snippet_strategy = config.get("snippet_strategy", "issue")
+    if snippet_strategy not in SNIPPET_STRATEGIES:
+        raise ConfigError(
+            f"snippet_strategy must be one of {', '.join(SNIPPET_STRATEGIES)}, "
+            f"got '{snippet_strategy}'"
+        )
+    range_planner = None
+    if snippet_strategy == "lines":
+        range_planner = SnippetRangePlanner(
+            context=int(config.get("snippet_context", 3)),
+            merge_gap=int(config.get("snippet_merge_gap", 10)),
+            branch=branch,
+        )
+    concurrency = None
+    if config.get("snippet_adaptive", True):
+        # Start at half of the workers and adapt to the server load
+        concurrency = AdaptiveConcurrency(
+            snippet_workers, initial=max(1, snippet_workers // 2)
+        )
+    # Keep issues as compact records with interned strings
+    compact = bool(config.get("compact_issues", True))
+
+    snippet_cache = None
+    if config.get("snippet_cache"):
+        # Cached snippets are valid only for the analysis they were taken from
+        analysis_date = fetch_analysis_date(session, project_id, branch)
+        if analysis_date:
+            snippet_cache = SnippetCache(
+                config["snippet_cache"],
+                max_size_mb=float(config.get("snippet_cache_max_mb", 200)),
+                max_age_days=float(config.get("snippet_cache_max_age_days", 30)),
+                variant=snippet_cache_variant(snippet_strategy, range_planner, fields),
+                analysis=analysis_date,
             )
-            # Check if request was successful
-            response.raise_for_status()
+        else:
+            print("Warning: snippet cache is not used without the last analysis date")
 
-            # Parse JSON response
-            response_data = response.json()
+    metrics = metrics or PipelineMetrics()
+    rules = None
+    rule_cache = None
+    rules_file = None
+    if config.get("rule_details", True):
+        # Rules are resolved per search page, before their issues are rendered
+        rule_cache = open_rule_cache(config)
+        rules = RuleCatalog(
+            session,
+            rule_cache,
+            server=url.rstrip("/"),
+            batch_size=int(config.get("rule_batch_size", RULES_BATCH_SIZE)),
+            metrics=metrics,
+        )
+        rules_file = runner.artifact_path(RULES_FILE)
 
-            # Extract issues from the current page
-            issues_on_page = response_data.get("issues", [])
-            print(f"Processing {len(issues_on_page)} issues from page: {page}")
+    # Finished issues flow into the catalog, the NDJSON dump and both
+    # report writers while the download is still running
+    catalog = IssueCatalog()
+    dump_writer = None
+    if dump_format == "ndjson":
+        dump_writer = NdjsonDumpWriter(output_file)
+    excel_writer = ExcelReportWriter(EXCEL_REPORT_FILE, rules=rules)
+    html_writer = create_html_writer(project_name, project_version, html_options, rules)
+    failed_snippet_keys = []
 
-            all_issues.extend(issues_on_page)
+    # Outputs that failed while issues were streamed into them
+    stream_failures = {}
 
-            # Update total issues from the first response
-            if page == 1:
-                total_issues = response_data.get("total", 0)
+    def stream_to(name, function, *args):
+        """Pass an issue to one output, an output that failed is skipped"""
+        if name in stream_failures:
+            return
+        with metrics.stage(name):
+            try:
+                function(*args)
+            except Exception as e:
+                stream_failures[name] = f"{type(e).__name__}: {e}"
+                print(f"Error: stage {name} failed - {stream_failures[name]}")
 
-            if not issues_on_page or page * int(issues_per_page) >= total_issues:
-                break  # Exit loop if no more issues are returned
+    def on_issue_ready(issue):
+        with metrics.stage("build_catalog"):
+            catalog.add(issue)
+            # Partition issues and derive per-file metadata once for all reporters
+            info = catalog.component_info(issue.get("component", ""))
+        if dump_writer:
+            stream_to("dump", dump_writer.write, issue)
+        stream_to("render_xlsx", excel_writer.add_issue, issue, info)
+        stream_to("render_html", html_writer.add_issue, issue, info)
 
-            if total_issues >= 10000:
-                print(
-                    f"Reached limit of 10000 issues from SonarQube API. Try to filter the issues to get less than 10000 issues."
+    if concurrency:
+        session.pushback_listeners.append(concurrency.on_pushback)
+    metrics.attach(session)
+    try:
+        with metrics.phase("download"):
+            if config.get("issue_store"):
+                # Incremental sync against the local issue store
+                store = IssueStore(config["issue_store"])
+                try:
+                    sync_issues(
+                        store,
+                        session,
+                        project_id,
+                        branch,
+                        search_params,
+                        search_workers=search_workers,
+                        snippet_workers=snippet_workers,
+                        snippet_rate_limit=snippet_rate_limit,
+                        snippet_cache=snippet_cache,
+                        compact=compact,
+                        on_issue_ready=on_issue_ready,
+                        range_planner=range_planner,
+                        concurrency=concurrency,
+                        metrics=metrics,
+                        fields=fields,
+                        rules=rules,
+                        failed_snippet_keys=failed_snippet_keys,
+                    )
+                finally:
+                    store.close()
+            else:
+                run_issue_pipeline(
+                    session,
+                    search_params,
+                    on_issue_ready,
+                    search_workers=search_workers,
+                    snippet_workers=snippet_workers,
+                    snippet_rate_limit=snippet_rate_limit,
+                    snippet_cache=snippet_cache,
+                    compact=compact,
+                    range_planner=range_planner,
+                    concurrency=concurrency,
+                    metrics=metrics,
+                    fields=fields,
+                    rules=rules,
+                    failed_snippet_keys=failed_snippet_keys,
                 )
-                sys.exit(1)
+    finally:
+        if concurrency:
+            session.pushback_listeners.remove(concurrency.on_pushback)
+        metrics.detach(session)
 
-            page += 1
+    if snippet_cache:
+        snippet_cache.close()
 
-        # Fetch source code snippets for issues with textRange
-        all_issues = fetch_issue_snippets(all_issues, url, cookies, headers)
+    if rules:
+        # The catalog keeps the rules for rendering from the dump
+        catalog.rules = rules.resolved()
+        save_rules(catalog.rules, rules_file)
+        print(
+            f"Rule details: {len(catalog.rules)} of {len(rules.rules)} rules "
+            f"resolved with {rules.requests} requests"
+        )
+    if rule_cache:
+        cache_stats = rule_cache.stats()
+        metrics.caches["rule_cache"] = cache_stats
+        print(
+            f"Rule cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate)"
+        )
+        rule_cache.close()
+
+    if range_planner:
+        print(f"Snippet line ranges requested: {range_planner.requests}")
+
+    connection_stats = session.connection_stats()
+    print(
+        f"HTTP connections: {connection_stats['new_connections']} new, "
+        f"{connection_stats['reused_connections']} reused "
+        f"for {connection_stats['requests']} requests"
+    )
+    retry_stats = print_request_report(session, concurrency, failed_snippet_keys)
+    metrics.caches["http_connections"] = connection_stats
+    metrics.extra["retries"] = retry_stats
+    if owns_session:
+        session.close()
 
-        # Save raw JSON response with sources included
-        with open(output_file, "w", encoding="utf-8") as outfile:
-            json.dump(all_issues, outfile, indent=4, ensure_ascii=False)
+    # The dump, the saved catalog and both reports are finished concurrently,
+    # outputs that failed during the download are not finished
+    catalog_file = runner.artifact_path("catalog.pickle")
+    print("Writing dump and reports...")
+    tasks = {
+        "dump": (
+            (dump_writer.close, ())
+            if dump_writer
+            else (write_json_dump, (catalog.issues, output_file))
+        ),
+        "build_catalog": (save_catalog, (catalog, catalog_file)),
+        "render_xlsx": (excel_writer.close, ()),
+        "render_html": (html_writer.close, (catalog,)),
+    }
+    with metrics.phase("outputs"):
+        results, failures = run_report_tasks(
+            {name: task for name, task in tasks.items() if name not in stream_failures},
+            workers=int(config.get("render_workers", 4)),
+            metrics=metrics,
+        )
+    failures.update(stream_failures)
 
+    if "dump" not in failures:
         print(f"Success! Response with sources saved to {output_file}")
 
-        # Generate Excel report
-        report_stats = generate_excel_report(all_issues, "sonarqube_issues_report.xlsx")
+    catalog_stage_fingerprint = catalog_fingerprint(output_file, compact, rules_file)
+    if not failures.keys() & {"dump", "build_catalog"}:
+        runner.record("build_catalog", catalog_stage_fingerprint, catalog_file)
+
+    report_stats = results.get("render_xlsx")
+    if report_stats:
+        runner.record(
+            "render_xlsx",
+            xlsx_fingerprint(catalog_stage_fingerprint),
+            EXCEL_REPORT_FILE,
+        )
+        print(f"Excel report generated: {report_stats['excel_file']}")
         print(f"Report summary: {report_stats}")
 
+    html_result = results.get("render_html")
+    if html_result:
+        runner.record(
+            "render_html",
+            html_fingerprint(
+                catalog_stage_fingerprint, project_name, project_version, html_options
+            ),
+            html_report_path(html_options),
+        )
+        print(
+            f"Enhanced HTML report with Highlight.js generated: {html_result['html_file']}"
+        )
+        print(f"HTML report summary: {html_result}")
+    else:
+        print("Failed to generate HTML report")
+
+    if snippet_cache:
+        cache_stats = snippet_cache.stats()
+        metrics.caches["snippet_cache"] = cache_stats
+        print(
+            f"Snippet cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['evictions']} evicted"
+        )
+
+    return {
+        "issues": len(catalog),
+        "excel": report_stats,
+        "html": html_result,
+        "failures": failures,
+        "requests": retry_stats,
+    }
+
+
+def render_from_dump(config, dump_path, runner, metrics=None):
+    """
+    Render reports from an existing dump without any network access.
+    Only the stages whose inputs changed since the last run are executed,
+    they are timed in the optional PipelineMetrics
+    """
+    project_name = config.get("project_name")
+    project_version = config.get("project_version")
+    if not project_name or not project_version:
+        raise ConfigError(
+            "project_name and project_version must be provided in the config file."
+        )
+    if not os.path.exists(dump_path):
+        raise ConfigError(f"dump file '{dump_path}' not found")
+
+    compact = bool(config.get("compact_issues", True))
+    catalog_file = runner.artifact_path("catalog.pickle")
+    rules_file = None
+    if config.get("rule_details", True):
+        rules_file = runner.artifact_path(RULES_FILE)
+    catalog_stage_fingerprint = catalog_fingerprint(dump_path, compact, rules_file)
+    metrics = metrics or PipelineMetrics()
+
+    tasks = {}
+    xlsx_stage_fingerprint = xlsx_fingerprint(catalog_stage_fingerprint)
+    if not runner.is_current("render_xlsx", xlsx_stage_fingerprint, EXCEL_REPORT_FILE):
+        tasks["render_xlsx"] = (
+            render_excel_from_catalog,
+            (catalog_file, EXCEL_REPORT_FILE),
+        )
+    html_options = html_report_options(config)
+    html_file = html_report_path(html_options)
+    html_stage_fingerprint = html_fingerprint(
+        catalog_stage_fingerprint, project_name, project_version, html_options
+    )
+    if not runner.is_current("render_html", html_stage_fingerprint, html_file):
+        # Rendering from the dump makes no network requests, highlight.js
+        # assets missing from the cache are loaded from the CDN instead
+        tasks["render_html"] = (
+            render_html_from_catalog,
+            (
+                catalog_file,
+                project_name,
+                project_version,
+                {**html_options, "offline": True},
+            ),
+        )
+
+    catalog = None
+    if tasks and not runner.is_current(
+        "build_catalog", catalog_stage_fingerprint, catalog_file
+    ):
+        print(f"Building issue catalog from {dump_path}...")
+        with metrics.phase("build_catalog"), metrics.stage("build_catalog"):
+            issues = iter_dump(dump_path)
+            catalog = IssueCatalog(
+                CompactRecord(issue) if compact else issue for issue in issues
+            )
+            if rules_file:
+                catalog.rules = load_rules(rules_file, config, catalog.issues)
+            save_catalog(catalog, catalog_file)
+        runner.record("build_catalog", catalog_stage_fingerprint, catalog_file)
+
+    # Report writers run in separate processes fed from the saved catalog
+    if "render_html" in tasks:
         print("Generating single HTML report with all issues...")
-        html_result = generate_single_html_report(
-            project_name,
-            project_version,
-            all_issues,
-            "sonarqube_comprehensive_report.html",
+    with metrics.phase("outputs"):
+        results, failures = run_report_tasks(
+            tasks,
+            executor_class=ProcessPoolExecutor,
+            workers=int(config.get("render_workers", 4)),
+            metrics=metrics,
         )
 
-        if html_result:
-            print(f"HTML report summary: {html_result}")
-        else:
-            print("Failed to generate HTML report")
+    report_stats = results.get("render_xlsx")
+    if report_stats:
+        runner.record("render_xlsx", xlsx_stage_fingerprint, EXCEL_REPORT_FILE)
+        print(f"Report summary: {report_stats}")
+
+    html_result = results.get("render_html")
+    if html_result:
+        runner.record("render_html", html_stage_fingerprint, html_file)
+        print(f"HTML report summary: {html_result}")
+    elif "render_html" in failures:
+        print("Failed to generate HTML report")
+
+    issue_count = None
+    if catalog is not None:
+        issue_count = len(catalog)
+    elif html_result:
+        issue_count = html_result["total_issues"]
+    elif report_stats:
+        issue_count = sum(
+            report_stats[key] for key in ("vulnerabilities", "bugs", "code_smells")
+        )
+
+    return {
+        "issues": issue_count,
+        "excel": report_stats,
+        "html": html_result,
+        "failures": failures,
+    }
+
+
+def run_project(config, render_only=None, force=False, session=None, metrics=None):
+    """
+    Run the report pipeline for one project configuration. With
+    `render_only` reports are rendered from that dump file (or the default
+    dump file if it is empty) without network access. The optional
+    PipelineMetrics is written once the run finishes. Returns run summary
+    """
+    runner = StageRunner(config.get("state_dir", ".sonar_stages"), force=force)
+    metrics = metrics or PipelineMetrics()
+    if render_only is not None:
+        dump_path = render_only or dump_filename(
+            "response_output",
+            config.get("dump_format", "json"),
+            config.get("dump_compression"),
+        )
+        summary = render_from_dump(config, dump_path, runner, metrics=metrics)
+    else:
+        summary = download_and_render(config, runner, session=session, metrics=metrics)
+
+    summary["stages"] = dict(runner.executed)
+    if metrics.enabled:
+        # Stages whose artifacts were reused count as stage cache hits
+        metrics.caches["stages"] = {
+            "reused": sorted(
+                stage for stage, ran in runner.executed.items() if not ran
+            ),
+            "executed": sorted(stage for stage, ran in runner.executed.items() if ran),
+        }
+        metrics.extra.update(
+            project_id=config.get("project_id"),
+            branch=config.get("branch"),
+            issues=summary["issues"],
+            failures=summary["failures"],
+        )
+        metrics.write()
+    return summary
+
+
+BATCH_SUMMARY_FILE = "batch_summary.json"
+# Batch keys that are not passed to the project configs
+BATCH_OPTIONS = ("projects", "workers", "requests_per_second", "output_dir")
+# Project paths resolved before workers switch to the project directory
+BATCH_SHARED_PATHS = (
+    "issue_store",
+    "snippet_cache",
+    "html_assets_cache",
+    "rule_cache",
+)
+
+# Sessions of the batch worker process, reused by all its projects
+_worker_sessions = {}
+
+
+def project_output_dir(output_dir, project_config):
+    """Return output directory of the batch project"""
+    name = "{}_{}".format(
+        project_config.get("project_id", ""), project_config.get("branch", "")
+    )
+    return os.path.join(output_dir, re.sub(r"[^\w.-]+", "_", name))
+
+
+def load_batch_config(batch_path):
+    """
+    Read batch file and return (project configs, options). Top-level keys
+    other than the batch options are defaults shared by all projects
+    """
+    try:
+        with open(batch_path, "r") as batch_file:
+            batch = json.load(batch_file)
+    except FileNotFoundError:
+        raise ConfigError(f"batch file '{batch_path}' not found")
+    except json.JSONDecodeError:
+        raise ConfigError("invalid JSON format in batch file")
+
+    projects = batch.get("projects")
+    if not isinstance(projects, list) or not projects:
+        raise ConfigError("batch file must contain a non-empty 'projects' list")
+
+    workers = int(batch.get("workers", min(4, len(projects))))
+    output_dir = os.path.abspath(batch.get("output_dir", "batch_reports"))
+    defaults = {key: value for key, value in batch.items() if key not in BATCH_OPTIONS}
+
+    project_configs = []
+    for project in projects:
+        project_config = dict(defaults, **project)
+        # Split the global snippet rate limit evenly across worker processes
+        if "requests_per_second" in batch:
+            project_config["snippet_rate_limit"] = (
+                float(batch["requests_per_second"]) / workers
+            )
+        for key in BATCH_SHARED_PATHS:
+            if project_config.get(key):
+                project_config[key] = os.path.abspath(project_config[key])
+        # Rule metadata does not depend on the project, all projects share it
+        project_config.setdefault(
+            "rule_cache", os.path.join(output_dir, RULE_CACHE_FILE)
+        )
+        project_configs.append(project_config)
+
+    return project_configs, {"workers": workers, "output_dir": output_dir}
+
+
+def _worker_session(config):
+    """Return session of this worker process for the config server"""
+    options = session_options(config)
+    key = (config.get("url"), config.get("JWT-SESSION"), tuple(sorted(options.items())))
+    if key not in _worker_sessions:
+        _worker_sessions[key] = SonarQubeSession(key[0], key[1], **options)
+    return _worker_sessions[key]
+
+
+def run_batch_project(
+    config, output_dir, render_only=None, force=False, metrics_options=None
+):
+    """
+    Run one batch project inside its output directory and return its summary
+    entry. Failures are reported in the entry instead of being raised.
+    `metrics_options` are PipelineMetrics arguments for metrics of the project
+    """
+    started = time.time()
+    entry = {
+        "project_id": config.get("project_id"),
+        "branch": config.get("branch"),
+        "output_dir": output_dir,
+    }
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        # Each worker process runs one project at a time
+        os.chdir(output_dir)
+        session = None
+        if render_only is None and config.get("url") and config.get("JWT-SESSION"):
+            session = _worker_session(config)
+        metrics = PipelineMetrics(**metrics_options) if metrics_options else None
+        summary = run_project(
+            config,
+            render_only=render_only,
+            force=force,
+            session=session,
+            metrics=metrics,
+        )
+        entry.update(
+            status="failed" if summary["failures"] else "ok",
+            issues=summary["issues"],
+            stages=summary["stages"],
+        )
+        if summary.get("requests"):
+            entry["retries"] = summary["requests"]["retries"]
+            entry["failed_snippets"] = summary["requests"]["failed_snippets"]
+        if summary["failures"]:
+            entry["error"] = "stages failed: " + ", ".join(summary["failures"])
+    except Exception as e:
+        entry.update(status="failed", error=f"{type(e).__name__}: {e}")
+    entry["seconds"] = round(time.time() - started, 3)
+    return entry
+
+
+def run_batch(batch_path, render_only=None, force=False, metrics_options=None):
+    """
+    Run all projects of the batch file in a pool of worker processes and
+    write the combined summary. With `metrics_options` every project writes
+    its metrics to its output directory. Returns the summary
+    """
+    project_configs, options = load_batch_config(batch_path)
+    if render_only:
+        # Every project renders from the dump in its own output directory
+        raise ConfigError("--render-only takes no dump path in batch mode")
+    output_dir = options["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    if metrics_options:
+        # Every project writes its metrics to its own output directory
+        metrics_options = dict(
+            metrics_options, path=os.path.basename(metrics_options["path"])
+        )
+
+    print(
+        f"Running {len(project_configs)} projects "
+        f"with {options['workers']} worker processes"
+    )
+    started = time.time()
+    results = [None] * len(project_configs)
+    with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+        futures = {
+            executor.submit(
+                run_batch_project,
+                project_config,
+                project_output_dir(output_dir, project_config),
+                render_only,
+                force,
+                metrics_options,
+            ): index
+            for index, project_config in enumerate(project_configs)
+        }
+        for future in as_completed(futures):
+            entry = future.result()
+            results[futures[future]] = entry
+            if entry["status"] == "ok" and entry["issues"] is None:
+                print(
+                    f"Project {entry['project_id']} ({entry['branch']}): "
+                    "reports are up to date"
+                )
+            elif entry["status"] == "ok":
+                print(
+                    f"Project {entry['project_id']} ({entry['branch']}): "
+                    f"{entry['issues']} issues in {entry['seconds']:.1f}s"
+                )
+            else:
+                print(
+                    f"Project {entry['project_id']} ({entry['branch']}) failed: "
+                    f"{entry['error']}"
+                )
+
+    summary = {
+        "projects": results,
+        "succeeded": sum(1 for entry in results if entry["status"] == "ok"),
+        "failed": sum(1 for entry in results if entry["status"] != "ok"),
+        "issues": sum(entry.get("issues") or 0 for entry in results),
+        "seconds": round(time.time() - started, 3),
+    }
+    summary_file = os.path.join(output_dir, BATCH_SUMMARY_FILE)
+    with open(summary_file, "w", encoding="utf-8") as outfile:
+        json.dump(summary, outfile, indent=4, ensure_ascii=False)
 
+    print(
+        f"Batch finished: {summary['succeeded']} succeeded, {summary['failed']} "
+        f"failed, {summary['issues']} issues in {summary['seconds']:.1f}s"
+    )
+    print(f"Batch summary saved to {summary_file}")
+    return summary
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(
+        description="Download SonarQube issues and generate xlsx and html reports"
+    )
+    argument_parser.add_argument(
+        "config", nargs="?", help="path to the JSON config file"
+    )
+    argument_parser.add_argument(
+        "--batch",
+        metavar="BATCH",
+        help="path to a JSON batch file with several projects to run in parallel",
+    )
+    argument_parser.add_argument(
+        "--render-only",
+        nargs="?",
+        const="",
+        metavar="DUMP",
+        help="render reports from an existing dump (default: the dump file of "
+        "the configured dump_format) without network access",
+    )
+    argument_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="run all stages even if their inputs did not change",
+    )
+    argument_parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="write stage timings, request latencies and cache statistics "
+        "as JSON (in batch mode to FILE in every project directory)",
+    )
+    argument_parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="add tracemalloc memory peaks to the metrics (slows the run down)",
+    )
+    argument_parser.add_argument(
+        "--profile-stage",
+        choices=METRICS_STAGES,
+        help="save a cProfile profile of the stage next to the metrics file",
+    )
+    args = argument_parser.parse_args()
+
+    metrics_options = None
+    if args.metrics:
+        metrics_options = {
+            "path": args.metrics,
+            "trace_memory": args.trace_memory,
+            "profile_stage": args.profile_stage,
+        }
+    elif args.trace_memory or args.profile_stage:
+        argument_parser.error("--trace-memory and --profile-stage need --metrics")
+
+    if args.batch:
+        try:
+            summary = run_batch(
+                args.batch,
+                render_only=args.render_only,
+                force=args.force,
+                metrics_options=metrics_options,
+            )
+        except ConfigError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if summary["failed"]:
+            sys.exit(1)
+        return
+    if not args.config:
+        argument_parser.error("either config or --batch is required")
+
+    config_path = args.config
+
+    try:
+        # Read configuration from JSON file
+        with open(config_path, "r") as config_file:
+            config = json.load(config_file)
     except FileNotFoundError:
         print(f"Error: Config file '{config_path}' not found")
         sys.exit(1)
     except json.JSONDecodeError:
         print("Error: Invalid JSON format in config file")
         sys.exit(1)
+
+    try:
+        metrics = PipelineMetrics(**metrics_options) if metrics_options else None
+        summary = run_project(
+            config, render_only=args.render_only, force=args.force, metrics=metrics
+        )
+    except ConfigError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     except requests.exceptions.RequestException as e:
         print(f"Error: Request failed - {e}")
         print(f"Check the connection and access to SonarQube - {e}")
@@ -1378,6 +6245,9 @@ def main():
         traceback.print_exc()
         sys.exit(1)
 
+    if summary["failures"]:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
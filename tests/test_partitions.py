@@ -0,0 +1,181 @@
+"""
+Tests of the issue query partitioning for the /api/issues/search result
+limit, run against an in-memory stand-in for the search API.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser as sonar_parser  # noqa: E402
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+FILTERS = {"rules": "rule", "severities": "severity", "types": "type"}
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class StubSession:
+    """
+    Serves /api/issues/search from a list of issues: createdAfter and
+    createdBefore, the rules, severities and types filters and facets
+    (facets list at most `facet_limit` values), CREATION_DATE sorting and
+    p/ps paging
+    """
+
+    def __init__(self, issues, facet_limit=None):
+        self.issues = issues
+        self.facet_limit = facet_limit
+
+    def matching(self, params):
+        issues = self.issues
+        if "createdAfter" in params:
+            after = datetime.strptime(
+                params["createdAfter"], sonar_parser.SONAR_DATE_FORMAT
+            )
+            issues = [issue for issue in issues if issue["created"] >= after]
+        if "createdBefore" in params:
+            before = datetime.strptime(
+                params["createdBefore"], sonar_parser.SONAR_DATE_FORMAT
+            )
+            issues = [issue for issue in issues if issue["created"] < before]
+        for name, field in FILTERS.items():
+            if name in params:
+                values = set(params[name].split(","))
+                issues = [issue for issue in issues if issue[field] in values]
+        return issues
+
+    def get(self, path, params=None):
+        assert path == "/api/issues/search"
+        issues = self.matching(params)
+        if params.get("s") == "CREATION_DATE":
+            issues = sorted(
+                issues,
+                key=lambda issue: issue["created"],
+                reverse=params.get("asc") == "false",
+            )
+
+        data = {"total": len(issues)}
+        facet_name = params.get("facets")
+        if facet_name:
+            counts = Counter(issue[FILTERS[facet_name]] for issue in issues)
+            data["facets"] = [
+                {
+                    "property": facet_name,
+                    "values": [
+                        {"val": value, "count": count}
+                        for value, count in counts.most_common(self.facet_limit)
+                    ],
+                }
+            ]
+
+        page, page_size = int(params.get("p", 1)), int(params.get("ps", 100))
+        data["issues"] = [
+            {
+                "key": issue["key"],
+                "creationDate": issue["created"].strftime(
+                    sonar_parser.SONAR_DATE_FORMAT
+                ),
+            }
+            for issue in issues[(page - 1) * page_size : page * page_size]
+        ]
+        return StubResponse(data)
+
+
+def make_issues(count, seconds=(0,), rules=4, severities=("MAJOR", "MINOR")):
+    """Return `count` issues spread over the given seconds after START"""
+    return [
+        {
+            "key": f"AX{index:06d}",
+            "created": START + timedelta(seconds=seconds[index % len(seconds)]),
+            "rule": f"java:S{index % rules}",
+            "severity": severities[index % len(severities)],
+            "type": "BUG",
+        }
+        for index in range(count)
+    ]
+
+
+def covered_keys(session, partitions, limit):
+    """Return keys of all issues the partitions download, checking their sizes"""
+    keys = []
+    for params, count in partitions:
+        matching = session.matching(params)
+        assert len(matching) == count
+        assert count <= limit
+        keys.extend(issue["key"] for issue in matching)
+    return keys
+
+
+def test_query_under_the_limit_is_not_split():
+    session = StubSession(make_issues(8, seconds=range(8)))
+
+    partitions = sonar_parser.plan_issue_partitions(session, {}, limit=10)
+
+    assert partitions == [({}, 8)]
+
+
+def test_empty_date_slices_are_skipped():
+    # Two bursts a day apart, bisection passes through empty date ranges
+    issues = make_issues(12, seconds=range(6)) + [
+        dict(issue, key=f"BX{index:06d}", created=issue["created"] + timedelta(days=1))
+        for index, issue in enumerate(make_issues(12, seconds=range(6)))
+    ]
+    session = StubSession(issues)
+
+    partitions = sonar_parser.plan_issue_partitions(session, {}, limit=10)
+
+    assert all(count > 0 for _, count in partitions)
+    keys = covered_keys(session, partitions, limit=10)
+    assert sorted(keys) == sorted(issue["key"] for issue in issues)
+
+
+def test_single_second_over_the_limit_is_split_by_rules():
+    issues = make_issues(25, rules=5)
+    session = StubSession(issues)
+
+    partitions = sonar_parser.plan_issue_partitions(session, {}, limit=10)
+
+    assert len(partitions) > 1
+    assert all("rules" in params for params, _ in partitions)
+    keys = covered_keys(session, partitions, limit=10)
+    assert sorted(keys) == sorted(issue["key"] for issue in issues)
+
+
+def test_incomplete_rules_facet_is_narrowed_by_severity():
+    # The facet lists only 2 of 4 rules, each severity has 2 of them
+    issues = make_issues(30, rules=4)
+    session = StubSession(issues, facet_limit=2)
+
+    partitions = sonar_parser.plan_issue_partitions(session, {}, limit=10)
+
+    assert all("severities" in params for params, _ in partitions)
+    keys = covered_keys(session, partitions, limit=10)
+    assert sorted(keys) == sorted(issue["key"] for issue in issues)
+
+
+def test_incomplete_facet_that_cannot_be_narrowed_warns(capsys):
+    # One severity and one type leave nothing to narrow by
+    issues = make_issues(30, rules=6, severities=("MAJOR",))
+    session = StubSession(issues, facet_limit=2)
+
+    partitions = sonar_parser.plan_issue_partitions(session, {}, limit=10)
+
+    assert "the rules facet lists only" in capsys.readouterr().out
+    keys = covered_keys(session, partitions, limit=10)
+    assert len(keys) == len(set(keys)) == 10